@@ -0,0 +1,386 @@
+# backup_store.py
+# Backups deduplicados y comprimidos (chunks direccionados por contenido) con retención
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import zlib
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from config import BACKUP_STORE_DIR, BACKUP_KEEP_HOURS, BACKUP_KEEP_DAYS
+
+# Tabla del gear hash (fija: los cortes tienen que ser los mismos entre ejecuciones)
+_GEAR_RNG = random.Random(0x1A5B)
+_GEAR = tuple(_GEAR_RNG.getrandbits(32) for _ in range(256))
+
+_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+_LEGACY_PATTERN = re.compile(r"^(strategy_state_backup|iqoption_strategy_log)_(\d{8}_\d{6})\.(json|log)$")
+_LEGACY_KINDS = {
+    "strategy_state_backup": ("state", "strategy_state.json"),
+    "iqoption_strategy_log": ("log", "iqoption_strategy.log"),
+}
+
+
+def chunk_data(data, min_size=2048, avg_size=8192, max_size=65536):
+    """
+    Partir datos en chunks definidos por contenido (gear hash)
+
+    El corte depende de los últimos bytes vistos y no de la posición, así una
+    inserción al principio de un archivo solo cambia los chunks cercanos y el
+    resto se sigue deduplicando contra los backups anteriores.
+    """
+    mask = (avg_size - 1) << (32 - (avg_size - 1).bit_length())
+    gear = _GEAR
+    length = len(data)
+    start = 0
+    while start < length:
+        end = min(start + max_size, length)
+        position = start + min_size
+        if position >= end:
+            yield data[start:end]
+            start = end
+            continue
+        hash_value = 0
+        while position < end:
+            hash_value = ((hash_value << 1) + gear[data[position]]) & 0xFFFFFFFF
+            position += 1
+            if not hash_value & mask:
+                break
+        yield data[start:position]
+        start = position
+
+
+def parse_timestamp(value):
+    """datetime desde ISO ('2025-07-31 08:30'), '20250731_083000' o el formato de los manifiestos"""
+    if isinstance(value, datetime):
+        return value
+    for fmt in ("%Y%m%d_%H%M%S", _TIMESTAMP_FORMAT, "%Y%m%dT%H%M%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value)
+
+
+class BackupStore:
+    """
+    Almacén de backups con deduplicación y compresión
+
+    Estructura bajo root:
+        objects/ab/abcdef...   chunk comprimido con zlib, nombrado por su sha256
+        manifests/<timestamp>-<kind>-<sha8>.json   lista de chunks de un backup
+
+    Un chunk idéntico (mismo contenido en otro backup o en otro archivo) se
+    guarda una sola vez. Los manifiestos se nombran por timestamp, así restaurar
+    "el backup vigente a tal hora" es una búsqueda binaria sobre los nombres sin
+    abrir ningún archivo. prune() aplica la retención y borra los chunks que
+    quedaron sin referencia.
+    """
+
+    def __init__(self, root, compress_level=6, logger=None):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifests_dir = os.path.join(root, "manifests")
+        self.compress_level = compress_level
+        self.logger = logger
+
+    # --- escritura ---
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _put_chunk(self, chunk):
+        """Guardar un chunk si no existe; retorna (digest, bytes escritos)"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(chunk, self.compress_level)
+        self._write_atomic(path, compressed)
+        return digest, len(compressed)
+
+    def put(self, data, kind, name, created=None):
+        """
+        Guardar un backup
+
+        Si el contenido es igual al último backup del mismo tipo no se crea
+        otro manifiesto (un checkpoint sin cambios no ocupa nada).
+
+        Args:
+            data: bytes del archivo
+            kind: Tipo de backup ("state", "log", ...)
+            name: Nombre del archivo original (para restaurar)
+            created: datetime del backup (por defecto, ahora)
+
+        Returns:
+            dict: Manifiesto (con 'stored_bytes' = bytes nuevos escritos)
+        """
+        created = created or datetime.now()
+        digest = hashlib.sha256(data).hexdigest()
+
+        latest = self.latest(kind, before=created)
+        if latest and latest["sha256"] == digest and latest["name"] == name:
+            latest["stored_bytes"] = 0
+            return latest
+
+        chunks = []
+        stored = 0
+        for chunk in chunk_data(data):
+            chunk_digest, written = self._put_chunk(chunk)
+            chunks.append(chunk_digest)
+            stored += written
+
+        manifest = {
+            "created": created.isoformat(),
+            "kind": kind,
+            "name": name,
+            "size": len(data),
+            "sha256": digest,
+            "chunks": chunks,
+        }
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        manifest_id = f"{created.strftime(_TIMESTAMP_FORMAT)}-{kind}-{digest[:8]}"
+        self._write_atomic(os.path.join(self.manifests_dir, f"{manifest_id}.json"),
+                           json.dumps(manifest).encode("utf-8"))
+        manifest["id"] = manifest_id
+        manifest["stored_bytes"] = stored
+        if self.logger:
+            self.logger.debug(f"🗄️ Backup {kind} {name}: {len(data)} bytes, {stored} nuevos ({len(chunks)} chunks)")
+        return manifest
+
+    def put_file(self, path, kind, name=None, created=None):
+        with open(path, "rb") as f:
+            data = f.read()
+        return self.put(data, kind, name or os.path.basename(path), created)
+
+    # --- lectura ---
+
+    def manifest_ids(self, kind=None):
+        """Ids de manifiestos ordenados por fecha (opcionalmente de un tipo)"""
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        ids = []
+        for filename in os.listdir(self.manifests_dir):
+            if not filename.endswith(".json"):
+                continue
+            manifest_id = filename[:-5]
+            if kind is None or manifest_id.split("-")[1] == kind:
+                ids.append(manifest_id)
+        ids.sort()
+        return ids
+
+    def load_manifest(self, manifest_id):
+        with open(os.path.join(self.manifests_dir, f"{manifest_id}.json"), "rb") as f:
+            manifest = json.loads(f.read().decode("utf-8"))
+        manifest["id"] = manifest_id
+        return manifest
+
+    def list(self, kind=None):
+        return [self.load_manifest(manifest_id) for manifest_id in self.manifest_ids(kind)]
+
+    def latest(self, kind, before=None):
+        """Último backup de un tipo, vigente a la fecha 'before' (por defecto, el más reciente)"""
+        ids = self.manifest_ids(kind)
+        if before is not None:
+            cutoff = parse_timestamp(before).strftime(_TIMESTAMP_FORMAT)
+            ids = ids[:bisect_right([manifest_id.split("-")[0] for manifest_id in ids], cutoff)]
+        return self.load_manifest(ids[-1]) if ids else None
+
+    def read(self, manifest):
+        """Contenido completo de un backup (verifica el sha256)"""
+        parts = []
+        for digest in manifest["chunks"]:
+            with open(self._object_path(digest), "rb") as f:
+                parts.append(zlib.decompress(f.read()))
+        data = b"".join(parts)
+        if hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+            raise ValueError(f"Backup {manifest['id']} dañado (sha256 no coincide)")
+        return data
+
+    def restore(self, kind, target_path, at=None):
+        """
+        Restaurar el backup de un tipo vigente a la fecha 'at' en target_path
+
+        Returns:
+            dict: Manifiesto restaurado
+        """
+        manifest = self.latest(kind, before=at)
+        if manifest is None:
+            raise FileNotFoundError(f"No hay backups de tipo {kind}" + (f" anteriores a {at}" if at else ""))
+        self._write_atomic(target_path, self.read(manifest))
+        return manifest
+
+    # --- retención ---
+
+    def prune(self, keep_hours=BACKUP_KEEP_HOURS, keep_days=BACKUP_KEEP_DAYS, now=None):
+        """
+        Aplicar la retención y borrar los chunks sin referencia
+
+        Se conservan todos los backups de las últimas keep_hours horas, luego
+        el último de cada día hasta keep_days días, y siempre el más reciente
+        de cada tipo.
+
+        Returns:
+            dict: manifiestos y objetos borrados, bytes liberados
+        """
+        now = now or datetime.now()
+        recent_cutoff = (now - timedelta(hours=keep_hours)).strftime(_TIMESTAMP_FORMAT)
+        daily_cutoff = (now - timedelta(days=keep_days)).strftime(_TIMESTAMP_FORMAT)
+
+        removed = 0
+        seen_kinds = set()
+        seen_days = set()
+        # Del más nuevo al más viejo: el primero de cada (tipo, día) es el último del día
+        for manifest_id in reversed(self.manifest_ids()):
+            timestamp, kind = manifest_id.split("-")[:2]
+            if kind not in seen_kinds:
+                seen_kinds.add(kind)
+                continue
+            if timestamp >= recent_cutoff:
+                continue
+            day_key = (kind, timestamp[:8])
+            if timestamp >= daily_cutoff and day_key not in seen_days:
+                seen_days.add(day_key)
+                continue
+            os.remove(os.path.join(self.manifests_dir, f"{manifest_id}.json"))
+            removed += 1
+
+        objects_removed, bytes_freed = self.gc()
+        if self.logger and (removed or objects_removed):
+            self.logger.info(f"🧹 Retención de backups: {removed} backups y {objects_removed} chunks borrados "
+                             f"({bytes_freed / 1024:.1f} KB liberados)")
+        return {"manifests_removed": removed, "objects_removed": objects_removed, "bytes_freed": bytes_freed}
+
+    def gc(self):
+        """Borrar chunks que ningún manifiesto referencia"""
+        referenced = set()
+        for manifest in self.list():
+            referenced.update(manifest["chunks"])
+
+        removed = freed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed, freed
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    path = os.path.join(prefix_dir, digest)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+    def stats(self):
+        """Backups, bytes lógicos y bytes realmente ocupados"""
+        manifests = self.list()
+        stored = objects = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for digest in os.listdir(prefix_dir):
+                    stored += os.path.getsize(os.path.join(prefix_dir, digest))
+                    objects += 1
+        return {
+            "backups": len(manifests),
+            "logical_bytes": sum(m["size"] for m in manifests),
+            "stored_bytes": stored,
+            "objects": objects,
+        }
+
+    # --- importación ---
+
+    def import_legacy(self, paths, delete=False):
+        """
+        Importar copias sueltas (backups/strategy_state_backup_*.json e
+        iqoption_strategy_log_*.log) con la fecha de su nombre
+
+        Returns:
+            list: (archivo, manifiesto) importados
+        """
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)))
+            else:
+                files.append(path)
+
+        imported = []
+        for path in files:
+            match = _LEGACY_PATTERN.match(os.path.basename(path))
+            if not match or not os.path.isfile(path):
+                continue
+            kind, name = _LEGACY_KINDS[match.group(1)]
+            manifest = self.put_file(path, kind, name, created=parse_timestamp(match.group(2)))
+            imported.append((path, manifest))
+            if delete:
+                os.remove(path)
+        return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backups deduplicados del estado y los logs")
+    parser.add_argument("--root", help=f"Directorio del almacén (por defecto, <datos>/{BACKUP_STORE_DIR})")
+    parser.add_argument("--user-id", help="Usuario (data/<user-id>/)")
+    parser.add_argument("--data-dir", metavar="DIR", help="Directorio de datos explícito")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Listar backups")
+    list_parser.add_argument("--kind", help="Solo este tipo (state, log)")
+
+    restore_parser = commands.add_parser("restore", help="Restaurar el backup vigente a una fecha")
+    restore_parser.add_argument("--kind", default="state", help="Tipo de backup (por defecto, state)")
+    restore_parser.add_argument("--at", help="Fecha/hora ('2025-07-31 08:30' o 20250731_083000); por defecto, el último")
+    restore_parser.add_argument("--to", required=True, help="Archivo de destino")
+
+    prune_parser = commands.add_parser("prune", help="Aplicar la retención y liberar chunks")
+    prune_parser.add_argument("--keep-hours", type=float, default=BACKUP_KEEP_HOURS)
+    prune_parser.add_argument("--keep-days", type=float, default=BACKUP_KEEP_DAYS)
+
+    import_parser = commands.add_parser("import-legacy", help="Importar copias sueltas de backups/")
+    import_parser.add_argument("paths", nargs="+", help="Archivos o directorios")
+    import_parser.add_argument("--delete", action="store_true", help="Borrar cada copia tras importarla")
+
+    commands.add_parser("stats", help="Espacio usado")
+    args = parser.parse_args()
+
+    root = args.root
+    if root is None:
+        from data_dir import UserDataDir
+        root = UserDataDir.resolve(args.user_id, args.data_dir).path(BACKUP_STORE_DIR)
+    store = BackupStore(root)
+
+    if args.command == "list":
+        for manifest in store.list(args.kind):
+            print(f"{manifest['created'][:19]}  {manifest['kind']:<6} {manifest['name']:<24} "
+                  f"{manifest['size']:>10} B  {len(manifest['chunks'])} chunks")
+    elif args.command == "restore":
+        manifest = store.restore(args.kind, args.to, at=args.at)
+        print(f"✅ {manifest['name']} del {manifest['created'][:19]} restaurado en {args.to}")
+    elif args.command == "prune":
+        result = store.prune(args.keep_hours, args.keep_days)
+        print(f"🧹 {result['manifests_removed']} backups y {result['objects_removed']} chunks borrados "
+              f"({result['bytes_freed'] / 1024:.1f} KB)")
+    elif args.command == "import-legacy":
+        imported = store.import_legacy(args.paths, delete=args.delete)
+        print(f"📥 {len(imported)} archivos importados")
+    stats = store.stats()
+    print(f"🗄️ {stats['backups']} backups: {stats['logical_bytes'] / 1024:.1f} KB lógicos, "
+          f"{stats['stored_bytes'] / 1024:.1f} KB en disco ({stats['objects']} chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark de process_asset con LOG_LEVEL INFO vs DEBUG
+
+Arma la estrategia contra el simulador local (sin red) y evalúa process_asset
+para todos los activos durante N rondas con una serie de Algebra Inversa
+sintética (misma serie para ambos niveles, con pasadas por sobreventa y
+sobrecompra para recorrer las ramas de has_valid_momentum). Las órdenes no se
+envían: solo se mide la evaluación. También mide el costo aislado de un
+mensaje debug deshabilitado: f-string con logger.debug vs HotLogger.
+
+Uso:
+    python benchmark_process_asset.py
+    python benchmark_process_asset.py --rounds 500
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import timeit
+
+from config import LOG_FILE
+from data_dir import UserDataDir
+from hot_log import HotLogger
+from iqoption_simulator import SimulatedIQOption
+from log_pipeline import configure_logging, shutdown_logging
+from strategy import MultiAssetRSIBinaryOptionsStrategy
+
+
+def build_feed(assets, rounds, seed=7):
+    """Serie de Algebra Inversa por activo: caminata aleatoria entre 15 y 85"""
+    rng = random.Random(seed)
+    feed = {}
+    for asset in assets:
+        value = rng.uniform(30, 70)
+        series = []
+        for _ in range(rounds):
+            value = min(85.0, max(15.0, value + rng.gauss(0, 6)))
+            series.append(value)
+        feed[asset] = series
+    return feed
+
+
+def evaluate(strategy, feed, rounds, level):
+    """Segundos por evaluación de process_asset con el nivel dado"""
+    strategy.logger.setLevel(level)
+    strategy.hot_log.refresh()
+    for asset in feed:
+        strategy.rsi_history[asset].clear()
+        strategy.last_signal_time.pop(asset, None)
+
+    position = {"round": 0}
+    strategy.get_rsi = lambda asset: feed[asset][position["round"]]
+
+    evaluations = 0
+    total = 0.0
+    for round_index in range(rounds):
+        position["round"] = round_index
+        for asset in feed:
+            total += timeit.timeit(lambda: strategy.process_asset(asset), number=1)
+            evaluations += 1
+    return total / evaluations
+
+
+def disabled_message_cost(number):
+    """Costo de un debug deshabilitado: f-string eager vs formato diferido"""
+    logger = logging.getLogger("benchmark.disabled")
+    logger.setLevel(logging.INFO)
+    hot = HotLogger(logger)
+    asset, total_drop, min_points = "EURUSD", 7.25, 10
+    eager = timeit.timeit(
+        lambda: logger.debug(f"📉 {asset} - Caída insuficiente: {total_drop:.1f} puntos (mínimo: {min_points})"),
+        number=number
+    ) / number
+    deferred = timeit.timeit(
+        lambda: hot.debug("📉 %s - Caída insuficiente: %.1f puntos (mínimo: %s)", asset, total_drop, min_points),
+        number=number
+    ) / number
+    return eager, deferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de process_asset por nivel de log")
+    parser.add_argument("--rounds", type=int, default=200, help="Rondas (una evaluación por activo)")
+    parser.add_argument("--number", type=int, default=200000, help="Repeticiones del micro-benchmark")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = UserDataDir(tmp)
+        # Sin consola: el benchmark mide encolar, no imprimir
+        configure_logging(data_dir.path(LOG_FILE), console=False)
+        strategy = MultiAssetRSIBinaryOptionsStrategy(
+            "benchmark", "benchmark", client_factory=lambda e, p: SimulatedIQOption(e, p, latency=0.0),
+            data_dir=data_dir
+        )
+        try:
+            strategy.min_time_between_signals = 0
+            strategy.create_binary_option = lambda *a, **k: None
+            feed = build_feed(strategy.valid_assets, args.rounds)
+
+            print(f"📊 process_asset: {len(feed)} activos × {args.rounds} rondas")
+            results = {}
+            for name, level in (("INFO", logging.INFO), ("DEBUG", logging.DEBUG)):
+                results[name] = evaluate(strategy, feed, args.rounds, level)
+                print(f"  {name:<6} {results[name] * 1e6:>8.1f} µs por evaluación")
+            print(f"  DEBUG/INFO: {results['DEBUG'] / results['INFO']:.2f}x")
+            log_metrics = strategy.log_pipeline.metrics()
+            print(f"  logs encolados: {log_metrics['enqueued']} | descartados: {log_metrics['dropped']}")
+        finally:
+            strategy.snapshot_writer.stop(5)
+            strategy.events.stop(5)
+            strategy.executor.shutdown(wait=False)
+            if strategy.order_book:
+                strategy.order_book.stop()
+            strategy.payout_cache.stop()
+            strategy.trade_ledger.close()
+            shutdown_logging()
+
+    eager, deferred = disabled_message_cost(args.number)
+    print("📊 debug deshabilitado (un mensaje):")
+    print(f"  f-string + logger.debug   {eager * 1e9:>8.0f} ns")
+    print(f"  HotLogger (no-op)         {deferred * 1e9:>8.0f} ns   ({eager / deferred:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los codecs del archivo de estado (JSON vs binario)
+
+Mide tiempo de codificación/decodificación y tamaño sobre un estado
+realista: un archivo de estado existente (--file) o uno sintético con
+historial RSI, órdenes activas y contadores para N activos.
+
+Uso:
+    python benchmark_state_codec.py
+    python benchmark_state_codec.py --assets 60 --orders 3
+    python benchmark_state_codec.py --file strategy_state.json
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from state_codec import CODECS, decode_state, get_codec, normalize_state
+
+
+def build_state(assets=40, orders=1, seed=7):
+    """Estado sintético con la forma del que guarda la estrategia"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    names = [f"ASSET{i:02d}/PAIR{i:02d}" for i in range(assets)]
+
+    active_options = {}
+    for i, asset in enumerate(names[:orders]):
+        entry = now - timedelta(seconds=rng.randint(0, 50))
+        active_options[asset] = [{
+            "id": 12000000000 + i,
+            "type": rng.choice(["CALL", "PUT"]),
+            "asset": asset,
+            "size": 250.0,
+            "entry_time": entry,
+            "expiry_time": entry + timedelta(minutes=1),
+            "rsi": round(rng.uniform(20, 80), 2),
+            "balance_before": 10425.0,
+            "asset_group": "PAIR",
+            "option_type": "turbo",
+            "strength": round(rng.uniform(60, 100), 1),
+            "signal_ts": entry.timestamp(),
+            "submit_ts": entry.timestamp() + 0.01,
+            "ack_ts": entry.timestamp() + 0.2,
+        }]
+
+    return {
+        "timestamp": now,
+        "strategy_mode": "CALL_PUT",
+        "active_options": active_options,
+        "last_signal_time": {
+            asset: (now - timedelta(minutes=rng.randint(1, 600))) if rng.random() < 0.5 else datetime.min
+            for asset in names
+        },
+        "consecutive_losses": {asset: rng.randint(0, 2) for asset in names},
+        "daily_lockouts": {},
+        "wins": {asset: rng.randint(0, 40) for asset in names},
+        "losses": {asset: rng.randint(0, 40) for asset in names},
+        "ties": {asset: rng.randint(0, 3) for asset in names},
+        "total_profit": rng.uniform(-2000, 2000),
+        "daily_profit": rng.uniform(-500, 500),
+        "monthly_profits": {f"2025-{m:02d}": rng.uniform(-3000, 3000) for m in range(1, 13)},
+        "monthly_starting_capital": {f"2025-{m:02d}": 10000 + m * 25 for m in range(1, 13)},
+        "monthly_stop_loss": False,
+        "stop_loss_triggered_month": None,
+        "absolute_stop_loss_activated": False,
+        "min_capital": 9904,
+        "last_date": now.date(),
+        "current_month": f"{now.year}-{now.month:02d}",
+        "daily_consecutive_wins": 1,
+        "daily_consecutive_losses": 0,
+        "daily_lock": False,
+        "daily_lock_time": None,
+        "daily_lock_reason": None,
+        "max_daily_consecutive": 2,
+        "recent_results": ["win"],
+        "day_start_balance": 10425,
+        "rsi_history": {asset: [round(rng.uniform(20, 80), 2) for _ in range(5)] for asset in names},
+        "aggressiveness_mode": "BALANCED",
+        "journal_seq": 1234,
+    }
+
+
+def benchmark(state, number):
+    results = []
+    for name in CODECS:
+        codec = get_codec(name)
+        encoded = codec.encode(state)
+        if normalize_state(codec.decode(encoded)) != state:
+            raise AssertionError(f"El codec {name} no reproduce el estado")
+
+        encode_time = timeit.timeit(lambda: codec.encode(state), number=number) / number
+        decode_time = timeit.timeit(lambda: normalize_state(codec.decode(encoded)), number=number) / number
+        results.append((name, len(encoded), encode_time, decode_time))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de codecs del archivo de estado")
+    parser.add_argument("--file", help="Archivo de estado real (JSON o binario)")
+    parser.add_argument("--assets", type=int, default=40, help="Activos del estado sintético")
+    parser.add_argument("--orders", type=int, default=1, help="Órdenes activas del estado sintético")
+    parser.add_argument("--number", type=int, default=2000, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            state = normalize_state(decode_state(f.read()))
+        source = args.file
+    else:
+        state = build_state(args.assets, args.orders)
+        source = f"sintético ({args.assets} activos, {args.orders} órdenes)"
+
+    print(f"📊 Estado: {source}")
+    print(f"{'codec':<8} {'tamaño':>10} {'encode':>12} {'decode':>12}")
+    results = benchmark(state, args.number)
+    base_size = results[0][1]
+    for name, size, encode_time, decode_time in results:
+        print(f"{name:<8} {size:>8} B {encode_time * 1e6:>9.1f} µs {decode_time * 1e6:>9.1f} µs"
+              f"   ({size / base_size * 100:.0f}% del JSON)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+# broker_recording.py
+# Grabación y reproducción del tráfico con IQ Option para benchmarks reproducibles
+
+import gzip
+import json
+import re
+import tempfile
+import threading
+import time
+import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+RECORDING_FORMAT = "iqrec"
+RECORDING_VERSION = 3  # 2: snapshots con número de lectura ("i"); 3: llamadas con thread que las pidió ("c")
+
+# Estructuras de iqoption.api que lee la estrategia directamente
+RECORDED_API_ATTRIBUTES = ("order_binary", "listinfodata")
+
+
+class ReplayExhausted(BaseException):
+    """
+    La grabación no tiene más respuestas para el método pedido
+
+    Hereda de BaseException (como KeyboardInterrupt) para que los 'except
+    Exception' de la estrategia (api_call_with_timeout, is_connected) no la
+    conviertan en un error de red: corta el ciclo en la llamada que la agotó
+    en vez de disparar reintentos y reconexiones contra una grabación vacía.
+    """
+
+
+def caller_role(thread=None):
+    """Nombre del thread sin el número de instancia ("api-worker-3" → "api-worker")"""
+    return re.sub(r"-\d+.*$", "", (thread or threading.current_thread()).name)
+
+
+def _encode(value):
+    """Convertir un valor a JSON preservando tuplas y claves no-string"""
+    if isinstance(value, tuple):
+        return {"__t": [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            if "__t" in value or "__d" in value:
+                return {"__d": [[k, _encode(v)] for k, v in value.items()]}
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__d": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+def _decode(value):
+    """Inverso de _encode"""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if "__t" in value and len(value) == 1:
+            return tuple(_decode(v) for v in value["__t"])
+        if "__d" in value and len(value) == 1:
+            return {_decode(k): _decode(v) for k, v in value["__d"]}
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+class TrafficRecorder:
+    """
+    Archivo de grabación compartido por todos los clientes de una sesión
+
+    Formato: JSON Lines comprimido con gzip. La primera línea es la cabecera y
+    cada línea siguiente un registro con claves cortas:
+        t: segundos desde el inicio de la grabación
+        m: método (o "api.<atributo>" para snapshots)
+        a/k: argumentos posicionales/nombrados
+        c: thread que pidió la llamada (caller_role: MainThread, order-arming...)
+        d: duración de la llamada en segundos
+        r: respuesta / e: error
+        i: número de lectura del atributo (solo snapshots, desde 1)
+    Los snapshots de api.order_binary/listinfodata solo se graban cuando cambian;
+    'i' indica en qué lectura apareció el valor para reproducirlo en la misma.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.start = time.time()
+        self._last_snapshots = {}
+        self._snapshot_reads = defaultdict(int)
+        self.write({"format": RECORDING_FORMAT, "version": RECORDING_VERSION, "started": self.start})
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def record_snapshot(self, name, value):
+        try:
+            encoded = json.dumps(_encode(value), separators=(",", ":"), sort_keys=True)
+        except Exception:
+            return
+        with self._lock:
+            self._snapshot_reads[name] += 1
+            read_index = self._snapshot_reads[name]
+            if self._last_snapshots.get(name) == encoded:
+                return
+            self._last_snapshots[name] = encoded
+        self.write({"t": round(time.time() - self.start, 6), "m": name, "i": read_index, "r": json.loads(encoded)})
+
+    def close(self):
+        """Cerrar el archivo de grabación"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class _RecordingAPIProxy:
+    """Proxy de iqoption.api que graba las estructuras leídas por la estrategia"""
+
+    def __init__(self, api, recorder):
+        self._api = api
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        value = getattr(self._api, name)
+        if name in RECORDED_API_ATTRIBUTES:
+            self._recorder.record_snapshot(f"api.{name}", value)
+        return value
+
+
+class RecordingIQOption:
+    """Envoltorio de IQ_Option que graba cada llamada y su respuesta en un TrafficRecorder"""
+
+    def __init__(self, client, recorder):
+        """
+        Args:
+            client: Cliente real (IQ_Option o SimulatedIQOption)
+            recorder: TrafficRecorder o ruta del archivo de grabación
+        """
+        self._client = client
+        self._recorder = recorder if isinstance(recorder, TrafficRecorder) else TrafficRecorder(recorder)
+
+    def _wrap(self, name, method):
+        recorder = self._recorder
+        # El método se obtiene en el thread que llama; la llamada puede correr en un worker
+        caller = caller_role()
+
+        def recorded(*args, **kwargs):
+            started = time.time()
+            record = {
+                "t": round(started - recorder.start, 6),
+                "m": name,
+                "c": caller,
+                "a": _encode(list(args)),
+                "k": _encode(kwargs),
+            }
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                record["d"] = round(time.time() - started, 6)
+                record["e"] = f"{type(e).__name__}: {e}"
+                recorder.write(record)
+                raise
+            record["d"] = round(time.time() - started, 6)
+            record["r"] = _encode(result)
+            recorder.write(record)
+            return result
+
+        recorded.__name__ = name
+        return recorded
+
+    def __getattr__(self, name):
+        value = getattr(self._client, name)
+        if name == "api":
+            return _RecordingAPIProxy(value, self._recorder)
+        if callable(value):
+            return self._wrap(name, value)
+        return value
+
+
+def load_recording(path):
+    """Leer una grabación y devolver (cabecera, registros)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != RECORDING_FORMAT:
+            raise ValueError(f"{path} no es una grabación {RECORDING_FORMAT}")
+        records = []
+        try:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            # Grabación cortada (proceso terminado sin cerrar el archivo)
+            pass
+    return header, records
+
+
+class _ReplayAPI:
+    """Equivalente de iqoption.api que devuelve cada snapshot en la lectura en que se grabó"""
+
+    def __init__(self, replay):
+        self._replay = replay
+
+    def __getattr__(self, name):
+        if name in RECORDED_API_ATTRIBUTES:
+            return self._replay._next_snapshot(f"api.{name}")
+        raise AttributeError(name)
+
+
+class ReplayIQOption:
+    """
+    Cliente que reproduce una grabación de forma determinista
+
+    Cada método devuelve sus respuestas grabadas en el mismo orden en que se
+    grabaron, con una cola por método y por thread que lo pidió (loop
+    principal, order-arming, payout-cache...): un refresco en segundo plano no
+    consume respuestas del loop ni al revés. Los snapshots de iqoption.api
+    cambian en el mismo número de lectura que en la grabación. Con
+    speed="recorded" cada llamada tarda lo mismo que en la grabación; con
+    speed="fast" responde de inmediato.
+
+    Los refrescos en segundo plano no corren en threads propios durante el
+    replay: replay_strategy los bombea entre ciclos cuando due() indica que su
+    próxima respuesta ya se había grabado en ese punto (ver as_caller).
+
+    Si se pide un método sin respuestas pendientes queda en 'exhausted' y se
+    lanza ReplayExhausted. Tras close() las llamadas devuelven None.
+    """
+
+    def __init__(self, path, speed="fast"):
+        if speed not in ("recorded", "fast"):
+            raise ValueError("speed debe ser 'recorded' o 'fast'")
+        self.path = path
+        self.speed = speed
+        self.header, records = load_recording(path)
+
+        self._calls = defaultdict(deque)
+        self._snapshots = defaultdict(deque)
+        self._current_snapshot = {}
+        self._snapshot_reads = defaultdict(int)
+        for record in records:
+            if record["m"].startswith("api."):
+                queue = self._snapshots[record["m"]]
+                # Grabaciones v1 sin 'i': el n-ésimo snapshot en la n-ésima lectura
+                queue.append((record.get("i", len(queue) + 1), record["r"]))
+            else:
+                # Grabaciones anteriores a v3 sin 'c': una sola cola por método
+                self._calls[(record["m"], record.get("c"))].append(record)
+        self._by_caller = any(caller is not None for _, caller in self._calls)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+        self.clock = 0.0  # 't' de la última respuesta servida
+        self.calls_served = defaultdict(int)
+        self.exhausted = set()
+        self.api = _ReplayAPI(self)
+
+    def remaining_calls(self):
+        """Respuestas pendientes por método"""
+        remaining = defaultdict(int)
+        with self._lock:
+            for (name, _), queue in self._calls.items():
+                if queue:
+                    remaining[name] += len(queue)
+        return dict(remaining)
+
+    @contextmanager
+    def as_caller(self, role):
+        """Servir las llamadas de este thread desde la cola de otro (para bombear refrescos)"""
+        self._local.role = role
+        try:
+            yield
+        finally:
+            self._local.role = None
+
+    def due(self, role):
+        """True si la próxima respuesta grabada para 'role' es anterior al punto actual del replay"""
+        with self._lock:
+            return any(queue and queue[0]["t"] <= self.clock
+                       for (_, caller), queue in self._calls.items() if caller == role)
+
+    def close(self):
+        """Dejar de servir la grabación (las llamadas del cierre de la estrategia devuelven None)"""
+        self._closed = True
+
+    def _caller(self):
+        if not self._by_caller:
+            return None
+        return getattr(self._local, "role", None) or caller_role()
+
+    def _next_snapshot(self, name):
+        with self._lock:
+            self._snapshot_reads[name] += 1
+            queue = self._snapshots[name]
+            while queue and queue[0][0] <= self._snapshot_reads[name]:
+                self._current_snapshot[name] = _decode(queue.popleft()[1])
+            return self._current_snapshot.get(name, {})
+
+    def _next_call(self, name, caller):
+        with self._lock:
+            queue = self._calls.get((name, caller))
+            if not queue:
+                self.exhausted.add(name)
+                raise ReplayExhausted(name if caller is None else f"{name} ({caller})")
+            self.calls_served[name] += 1
+            record = queue.popleft()
+            self.clock = max(self.clock, record.get("t", 0))
+            return record
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        # Como al grabar: el thread que pide el método decide la cola
+        caller = self._caller()
+
+        def replayed(*args, **kwargs):
+            if self._closed:
+                return None
+            record = self._next_call(name, caller)
+            if self.speed == "recorded" and record.get("d"):
+                time.sleep(record["d"])
+            if "e" in record:
+                raise RuntimeError(f"[replay] {record['e']}")
+            return _decode(record.get("r"))
+
+        replayed.__name__ = name
+        return replayed
+
+
+def _pump_refreshers(replay, refreshers):
+    """Correr los refrescos de segundo plano cuyas respuestas grabadas ya vencieron"""
+    for role, refresh in refreshers.items():
+        while replay.due(role):
+            served = sum(replay.calls_served.values())
+            with replay.as_caller(role):
+                refresh()
+            if sum(replay.calls_served.values()) == served:
+                break
+
+
+def replay_strategy(path, speed="fast", max_cycles=None, logger=None, **strategy_kwargs):
+    """
+    Reproducir una grabación contra MultiAssetRSIBinaryOptionsStrategy
+
+    La estrategia corre en un directorio temporal (nunca sobre el estado, el
+    ledger ni el log de un usuario real) y sin threads de refresco: el balance
+    de las órdenes pre-armadas y los payouts se refrescan entre ciclos, en el
+    punto de la grabación en que se habían pedido.
+
+    Args:
+        path: Archivo de grabación
+        speed: "recorded" (latencias y pausas entre ciclos reales) o "fast"
+        max_cycles: Límite de ciclos (None = hasta agotar la grabación: se corta al
+            pedir un método sin respuestas o tras un ciclo que no usó ninguna)
+        **strategy_kwargs: Parámetros adicionales para la estrategia (data_dir se ignora)
+
+    Returns:
+        dict: Ciclos completos, duración y llamadas servidas por método
+    """
+    from strategy import MultiAssetRSIBinaryOptionsStrategy
+    from data_dir import UserDataDir
+
+    logger = logger or logging.getLogger(__name__)
+    replay = ReplayIQOption(path, speed=speed)
+    strategy_kwargs.setdefault("email", "replay")
+    strategy_kwargs.setdefault("password", "replay")
+    # Siempre el mismo cliente: una reconexión no debe reiniciar la grabación
+    strategy_kwargs["client_factory"] = lambda email, password: replay
+    strategy_kwargs["standby_connection"] = False
+    strategy_kwargs["background_refresh"] = False
+
+    started = time.time()
+    cycles = 0
+    with tempfile.TemporaryDirectory(prefix="replay-") as scratch:
+        strategy_kwargs["data_dir"] = UserDataDir(scratch)
+        strategy = MultiAssetRSIBinaryOptionsStrategy(**strategy_kwargs)
+        refreshers = {"payout-cache": strategy.payout_cache.refresh}
+        if strategy.order_book:
+            refreshers["order-arming"] = strategy.order_book.refresh
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                cycles += 1
+                served_before = sum(replay.calls_served.values())
+                try:
+                    _pump_refreshers(replay, refreshers)
+                    sleep_time = strategy.run_cycle(cycles)
+                except ReplayExhausted as e:
+                    # El ciclo quedó cortado en la llamada que agotó la grabación: no cuenta
+                    logger.info(f"🔁 Grabación agotada en el ciclo {cycles}: {e}")
+                    cycles -= 1
+                    break
+                if not replay.remaining_calls():
+                    break
+                # Ningún método grabado usado en el ciclo: lo que queda (ej. un connect
+                # de reconexión) no se va a pedir nunca
+                if max_cycles is None and sum(replay.calls_served.values()) == served_before:
+                    break
+                if speed == "recorded":
+                    time.sleep(sleep_time)
+        finally:
+            replay.close()
+            strategy.shutdown()
+
+    elapsed = time.time() - started
+    logger.info(f"🔁 Replay completado: {cycles} ciclos en {elapsed:.2f}s")
+    return {
+        "cycles": cycles,
+        "elapsed_seconds": elapsed,
+        "calls_served": dict(replay.calls_served),
+        "remaining_calls": replay.remaining_calls(),
+        "exhausted": sorted(replay.exhausted),
+    }
@@ -286,10 +286,98 @@ STRATEGY_MODE = "CALL_PUT"
 # Configuración de logging
 LOG_LEVEL = "INFO"
 LOG_FILE = "iqoption_strategy.log"
+LOG_QUEUE_SIZE = 10000  # Registros en cola hacia el thread de escritura (llena: se descartan DEBUG/INFO)
+LOG_LEVELS = {          # Niveles por módulo (nombre del logger); el resto usa LOG_LEVEL
+    "iqoptionapi": "WARNING",
+    "websocket": "WARNING",
+}
+
+# Eventos estructurados (JSONL, uno por línea) junto al log legible
+EVENTS_FILE = "strategy_events.jsonl"
+EVENTS_MAX_BYTES = 50 * 1024 * 1024  # Al superarlo el archivo rota a .1 (se conserva una generación)
+EVENTS_BUFFER_SIZE = 1000            # Eventos y líneas de log recientes en memoria del proceso
+EVENTS_SOCKET_FILE = "strategy.sock"  # Socket Unix (en el directorio del usuario) que sirve ese buffer a la API
 
 # Configuración de caché y timeouts
 API_TIMEOUT = 15
-SAVE_STATE_INTERVAL = 30
+SAVE_STATE_INTERVAL = 240  # Ciclos entre checkpoints completos (los cambios van al journal)
+
+# Pool de workers para llamadas API
+API_WORKERS = 3                 # Workers disponibles en condiciones normales
+API_MAX_WORKERS = 8             # Máximo incluyendo reemplazos de llamadas colgadas
+STUCK_CALL_WARNING_SECONDS = 60 # Avisar si una llamada abandonada sigue colgada más de esto
+
+# Reconexión
+RECONNECT_BASE_DELAY = 1            # Segundos del primer reintento (crece exponencialmente)
+RECONNECT_MAX_DELAY = 60            # Tope del backoff entre reintentos
+RECONNECT_MAX_ATTEMPTS = 6          # Intentos antes de devolver el control al ciclo
+USE_STANDBY_CONNECTION = False      # Mantener una segunda sesión autenticada para failover rápido
+STANDBY_HEALTH_CHECK_INTERVAL = 30  # Segundos entre verificaciones de la sesión de reserva
+
+# Órdenes pre-armadas (balance y monto calculados antes de la señal)
+ORDER_FAST_PATH = True
+ORDER_ARMING_REFRESH_SECONDS = 10   # Refresco del balance en segundo plano
+ORDER_ARMING_MAX_AGE = 30           # Balance más viejo que esto -> camino normal
+
+# Índice de resultados de órdenes
+ORDER_INDEX_MAX_ENTRIES = 5000      # Órdenes retenidas en memoria
+ORDER_INDEX_MAX_AGE_SECONDS = 6 * 3600
+
+# Liquidación por eventos de cierre (option-closed / position-changed)
+SETTLEMENT_PUSH_LOSS_TIMEOUT = 600  # Segundos sin resultado antes de asumir pérdida (una vez que llegaron eventos en la conexión)
+
+# Liquidación por lote: una consulta de historial por ciclo (requiere USE_POSITION_HISTORY)
+SETTLEMENT_BATCH_HISTORY_LIMIT = 20      # Mínimo de opciones cerradas a pedir
+SETTLEMENT_BATCH_FALLBACK_SECONDS = 90   # Tras este tiempo sin resultado, consultar la orden individualmente
+
+# Modelo de retraso de liquidación (umbrales aprendidos por cuenta/tipo de opción/activo)
+SETTLEMENT_DELAYS_FILE = "settlement_delays.json"
+SETTLEMENT_DELAY_MIN_SAMPLES = 10   # Muestras mínimas antes de reemplazar los valores por defecto
+SETTLEMENT_DELAY_MAX_SAMPLES = 200  # Muestras retenidas por grupo
+SETTLEMENT_DEFAULT_WAITS = {        # Segundos desde la expiración
+    "first_check": 45,
+    "async_order": 20,
+    "balance_check": 90,
+    "assume_loss": 120,
+}
+SETTLEMENT_BALANCE_CHECK_MIN = 45   # El balance puede mostrar valores temporales ~40s tras expirar
+
+# Cola de liquidación pendiente: backoff por orden entre intentos sin resultado
+SETTLEMENT_RETRY_BASE_SECONDS = 5
+SETTLEMENT_RETRY_MAX_SECONDS = 60
+
+# Payouts (get_all_profit) cacheados en segundo plano
+PAYOUT_REFRESH_SECONDS = 300     # Refresco de la tabla de payouts
+PAYOUT_MAX_AGE_SECONDS = 1800    # Tabla más vieja se ignora (se usan los valores por defecto)
+MIN_PAYOUT_PERCENT = 0           # Saltar activos con payout menor (0 = desactivado)
+
+# Registro de operaciones liquidadas (SQLite, solo inserción)
+TRADE_LEDGER_FILE = "trades.db"
+
+# Conciliación del P&L del ledger contra el balance del broker
+RECONCILE_INTERVAL_SECONDS = 900     # Conciliar al menos cada 15 minutos
+RECONCILE_EVERY_N_SETTLEMENTS = 5    # ...o tras esta cantidad de liquidaciones
+RECONCILE_TOLERANCE = 1.0            # Diferencia ($) que se registra como discrepancia
+
+# Backups deduplicados y comprimidos (<datos>/backups/: objects/ + manifests/)
+BACKUP_STORE_DIR = "backups"
+BACKUP_INTERVAL_SECONDS = 3600       # Backup del checkpoint como máximo cada hora
+BACKUP_KEEP_HOURS = 48               # Se conservan todos los backups de las últimas 48 h...
+BACKUP_KEEP_DAYS = 30                # ...y luego el último de cada día hasta 30 días
+
+# Datos por usuario: con --user-id cada proceso usa DATA_ROOT/<user_id>/ para estado,
+# journal, ledger, retrasos de liquidación y log (sin --user-id, el directorio actual)
+DATA_ROOT = "data"
+# El simulador (--simulate) nunca usa el directorio actual ni DATA_ROOT: sus
+# operaciones y su balance ficticio quedarían en el estado y el ledger reales
+SIMULATOR_DATA_ROOT = "simulator_data"
+
+# Journal de cambios de estado (se aplica sobre el último checkpoint al cargar)
+STATE_JOURNAL_FILE = "strategy_state.journal"
+STATE_JOURNAL_FSYNC = False          # fsync por registro (sobrevive cortes de luz, más lento)
+STATE_CHECKPOINT_RECORDS = 2000      # Checkpoint anticipado si el journal acumula estos registros
+STATE_SNAPSHOT_GENERATIONS = 3       # Checkpoints anteriores conservados para rollback (.1, .2, .3)
+STATE_CODEC = "json"                 # "json" (legible) o "binary" (compacto); la carga detecta el formato
 
 # Archivo de estado
 STATE_FILE = "strategy_state.json"
@@ -0,0 +1,147 @@
+# data_dir.py
+# Directorio de datos por usuario (estado, journal, ledger, logs) con lock de proceso
+
+import fcntl
+import os
+import re
+
+from config import DATA_ROOT, SIMULATOR_DATA_ROOT
+
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.@-]{1,64}$")
+
+
+class DataDirLockedError(RuntimeError):
+    """Otro proceso ya está usando el directorio de datos"""
+
+
+def validate_user_id(user_id):
+    """user_id apto para usarse como nombre de directorio (sin separadores ni '..')"""
+    user_id = str(user_id)
+    if not _USER_ID_PATTERN.match(user_id) or user_id in (".", ".."):
+        raise ValueError(f"user_id inválido: {user_id!r}")
+    return user_id
+
+
+class UserDataDir:
+    """
+    Archivos de un usuario bajo un directorio propio
+
+    Cada proceso de estrategia escribe estado, journal, ledger, retrasos de
+    liquidación y log dentro de su directorio, así varios usuarios en el mismo
+    host no comparten (ni corrompen) archivos. Los nombres de archivo son los
+    de config; solo cambia el directorio base.
+
+    lock() toma un flock exclusivo sobre <dir>/.lock: un segundo proceso para
+    el mismo usuario falla con DataDirLockedError en vez de pisar el estado.
+    El lock lo libera el sistema operativo si el proceso muere.
+    """
+
+    LOCK_FILE = ".lock"
+
+    def __init__(self, base_dir=".", user_id=None):
+        self.base_dir = base_dir
+        self.user_id = user_id
+        self._lock_fd = None
+
+    @classmethod
+    def for_user(cls, user_id, root=None):
+        """Directorio DATA_ROOT/<user_id>/ (root reemplaza a DATA_ROOT)"""
+        user_id = validate_user_id(user_id)
+        return cls(os.path.join(root or DATA_ROOT, user_id), user_id=user_id)
+
+    @classmethod
+    def resolve(cls, user_id=None, data_dir=None):
+        """
+        Directorio según los argumentos de línea de comandos
+
+        data_dir explícito > DATA_ROOT/<user_id> > directorio actual (legado)
+        """
+        if data_dir:
+            return cls(data_dir, user_id=validate_user_id(user_id) if user_id else None)
+        if user_id:
+            return cls.for_user(user_id)
+        return cls()
+
+    @classmethod
+    def for_simulation(cls, user_id=None, data_dir=None):
+        """
+        Directorio para una ejecución simulada: nunca el de un bot real
+
+        data_dir explícito > SIMULATOR_DATA_ROOT/<user_id o "default">
+
+        Raises:
+            ValueError: Si data_dir es el directorio actual (legado) o está bajo DATA_ROOT
+        """
+        if data_dir:
+            real_dir = os.path.realpath(data_dir)
+            data_root = os.path.realpath(DATA_ROOT)
+            if real_dir == os.path.realpath(".") or real_dir == data_root or real_dir.startswith(data_root + os.sep):
+                raise ValueError(f"{data_dir} es un directorio de datos real; el simulador necesita uno propio")
+            return cls(data_dir, user_id=validate_user_id(user_id) if user_id else None)
+        user_id = validate_user_id(user_id) if user_id else None
+        return cls(os.path.join(SIMULATOR_DATA_ROOT, user_id or "default"), user_id=user_id)
+
+    def path(self, filename):
+        """Ruta de un archivo dentro del directorio del usuario"""
+        return os.path.join(self.base_dir, filename)
+
+    def ensure(self):
+        """Crear el directorio si no existe (solo accesible por el dueño)"""
+        os.makedirs(self.base_dir, mode=0o700, exist_ok=True)
+        return self
+
+    def lock(self):
+        """
+        Tomar el lock exclusivo del directorio (no bloqueante)
+
+        Raises:
+            DataDirLockedError: Si otro proceso lo tiene
+        """
+        if self._lock_fd is not None:
+            return self
+        self.ensure()
+        lock_path = self.path(self.LOCK_FILE)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            owner = os.read(fd, 32).decode("ascii", "replace").strip()
+            os.close(fd)
+            raise DataDirLockedError(
+                f"{self.base_dir} ya está en uso" + (f" por el proceso {owner}" if owner else "")
+            )
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+        self._lock_fd = fd
+        return self
+
+    def is_locked(self):
+        """True si otro proceso tiene el lock (una estrategia corriendo para este usuario)"""
+        if self._lock_fd is not None:
+            return False
+        lock_path = self.path(self.LOCK_FILE)
+        if not os.path.exists(lock_path):
+            return False
+        fd = os.open(lock_path, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def unlock(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def __enter__(self):
+        return self.lock()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.unlock()
+
+    def __repr__(self):
+        return f"UserDataDir({self.base_dir!r}, user_id={self.user_id!r})"
@@ -0,0 +1,140 @@
+# event_ipc.py
+# Eventos y líneas de log recientes en memoria, servidos por un socket Unix local
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from collections import deque
+
+from state_codec import json_default
+
+
+class RecentEvents:
+    """
+    Buffer circular de los eventos más recientes
+
+    Recibe los eventos estructurados (EventStream) y las líneas del log
+    (RecentEventsHandler, tipo "log"). Agregar es O(1) y nunca crece más allá
+    de maxlen.
+    """
+
+    def __init__(self, maxlen=500):
+        self._events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def append(self, event):
+        with self._lock:
+            self._events.append(event)
+
+    def snapshot(self, limit=50, types=None):
+        """Últimos 'limit' eventos (opcionalmente de ciertos tipos), del más viejo al más nuevo"""
+        with self._lock:
+            events = list(self._events)
+        if types:
+            types = set(types)
+            events = [event for event in events if event.get("type") in types]
+        return events[-limit:] if limit else events
+
+
+class RecentEventsHandler(logging.Handler):
+    """
+    Handler que copia cada línea del log al buffer como evento "log"
+
+    Va en el pipeline de logging (thread de escritura), no en el thread que loguea.
+    """
+
+    def __init__(self, recent):
+        super().__init__()
+        self.recent = recent
+
+    def emit(self, record):
+        self.recent.append({
+            "ts": round(record.created, 3),
+            "type": "log",
+            "level": record.levelname,
+            "message": record.getMessage(),
+        })
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    timeout = 2
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline(65536) or b"{}")
+        except ValueError:
+            request = {}
+        events = self.server.recent.snapshot(limit=int(request.get("limit") or 50), types=request.get("types"))
+        response = json.dumps({"events": events}, default=json_default, ensure_ascii=False)
+        self.wfile.write(response.encode("utf-8") + b"\n")
+
+
+class EventSocketServer:
+    """
+    Servidor del buffer de eventos en un socket Unix (solo accesible por el dueño)
+
+    Protocolo: una línea JSON de pedido ({"limit": 50, "types": ["log"]}) y
+    una línea JSON de respuesta ({"events": [...]}). Así la API responde sin
+    leer ni parsear archivos del disco.
+    """
+
+    def __init__(self, path, recent, logger=None):
+        self.path = path
+        self.recent = recent
+        self.logger = logger
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        try:
+            # Un socket viejo de un proceso que murió (el lock del directorio
+            # garantiza que no hay otro proceso vivo usándolo)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._server = socketserver.UnixStreamServer(self.path, _RequestHandler)
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            self._server = None
+            if self.logger:
+                self.logger.warning(f"⚠️ Socket de eventos no disponible ({self.path}): {str(e)}")
+            return self
+        self._server.recent = self.recent
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.5},
+                                        name="event-ipc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def fetch_recent_events(socket_path, limit=50, types=None, timeout=1.0):
+    """
+    Pedir los eventos recientes a un proceso de estrategia
+
+    Raises:
+        OSError: Si no hay proceso escuchando (o no respondió a tiempo)
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        request = json.dumps({"limit": limit, "types": list(types) if types else None})
+        sock.sendall(request.encode("utf-8") + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))["events"]
@@ -0,0 +1,161 @@
+# event_stream.py
+# Eventos tipados en JSONL (uno por línea) junto al log legible
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from state_codec import json_default
+
+# Tipos de evento y sus campos principales
+EVENT_TYPES = {
+    "cycle": ("cycle", "duration_ms", "assets", "active_orders"),
+    "rsi_reading": ("asset", "rsi", "oversold", "overbought", "zone", "history"),
+    "signal": ("asset", "direction", "rsi", "level", "strength"),
+    "order_placed": ("asset", "order_id", "direction", "size", "rsi", "strength", "balance",
+                     "expiry_ts", "signal_to_submit_ms", "submit_to_ack_ms"),
+    "order_settled": ("asset", "order_id", "direction", "size", "result", "profit", "payout_percent"),
+    "lock": ("reason", "consecutive", "daily_profit", "balance"),
+    "stop_loss": ("kind", "capital", "threshold"),
+    "error": ("level", "logger", "message"),
+}
+
+
+class _ErrorEventHandler(logging.Handler):
+    """Convierte los registros ERROR/CRITICAL del logger en eventos 'error'"""
+
+    def __init__(self, stream):
+        super().__init__(logging.ERROR)
+        self.stream = stream
+
+    def emit(self, record):
+        self.stream.emit("error", level=record.levelno, logger=record.name, message=record.getMessage())
+
+
+class EventStream:
+    """
+    Escribir eventos estructurados sin bloquear el loop de trading
+
+    emit() arma un dict y lo encola (cola acotada: si está llena el evento se
+    descarta y se cuenta); un thread "event-writer" los serializa en lotes y
+    los agrega al archivo, una línea JSON por evento con 'ts' (epoch) y
+    'type'. Al superar max_bytes el archivo pasa a path.1 (una generación).
+    Si se pasa 'recent' (event_ipc.RecentEvents), cada evento también queda
+    en ese buffer en memoria.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path, queue_size=10000, max_bytes=50 * 1024 * 1024, logger=None, recent=None):
+        self.path = path
+        self.recent = recent
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._write_loop, name="event-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def emit(self, event_type, **fields):
+        """Encolar un evento (nunca bloquea)"""
+        event = {"ts": round(time.time(), 3), "type": event_type}
+        event.update(fields)
+        if self.recent is not None:
+            self.recent.append(event)
+        try:
+            self.queue.put_nowait(event)
+            self.emitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def error_handler(self):
+        """Handler de logging que publica los errores del logger como eventos"""
+        return _ErrorEventHandler(self)
+
+    def stop(self, timeout=None):
+        """Escribir lo encolado y detener el thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _write_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(event is self._STOP for event in batch)
+            events = [event for event in batch if event is not self._STOP]
+            if events:
+                self._write(events)
+            if stop:
+                return
+
+    def _write(self, events):
+        try:
+            lines = "".join(
+                json.dumps(event, default=json_default, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for event in events
+            )
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                size = f.tell()
+            self.written += len(events)
+            if self.max_bytes and size >= self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ No se pudieron escribir {len(events)} eventos: {str(e)}")
+
+    def metrics(self):
+        return {
+            "emitted": self.emitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "depth": self.queue.qsize(),
+        }
+
+
+def read_events(path, types=None, since=None):
+    """
+    Leer eventos del archivo (y de su generación .1), del más viejo al más nuevo
+
+    Args:
+        types: Iterable de tipos a incluir (None = todos)
+        since: Epoch mínimo (None = todos)
+
+    Returns:
+        generator de dicts; las líneas incompletas o dañadas se saltan
+    """
+    types = set(types) if types else None
+    for file_path in (f"{path}.1", path):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if types is not None and event.get("type") not in types:
+                    continue
+                if since is not None and event.get("ts", 0) < since:
+                    continue
+                yield event
@@ -0,0 +1,41 @@
+# hot_log.py
+# Logging para caminos calientes: formato diferido y niveles deshabilitados sin costo
+
+import logging
+
+
+def _disabled(msg, *args, **kwargs):
+    """Nivel deshabilitado: no formatea ni crea registros"""
+
+
+class HotLogger:
+    """
+    Fachada de logging para código que corre por activo y por ciclo
+
+    Los mensajes usan formato %-style con argumentos ("%s - Caída: %.1f",
+    asset, drop): el string se arma recién cuando el registro se emite, no
+    en la llamada. Además, cada nivel se enlaza una sola vez: si está
+    deshabilitado, hot.debug es una función vacía y la llamada no pasa por
+    isEnabledFor ni crea un LogRecord. Para argumentos caros de calcular,
+    los flags debug_enabled/info_enabled permiten saltar el bloque completo.
+
+    Si el nivel del logger cambia en tiempo de ejecución, llamar a refresh().
+    """
+
+    LEVELS = (
+        ("debug", logging.DEBUG),
+        ("info", logging.INFO),
+        ("warning", logging.WARNING),
+        ("error", logging.ERROR),
+    )
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.refresh()
+
+    def refresh(self):
+        """Volver a enlazar cada nivel según el nivel efectivo actual del logger"""
+        for name, level in self.LEVELS:
+            enabled = self.logger.isEnabledFor(level)
+            setattr(self, f"{name}_enabled", enabled)
+            setattr(self, name, getattr(self.logger, name) if enabled else _disabled)
@@ -0,0 +1,418 @@
+# iqoption_simulator.py
+# Simulador local de IQ Option (mismos métodos de stable_api que usa la estrategia)
+
+import threading
+import time
+import heapq
+import inspect
+import json
+import math
+import random
+import itertools
+
+from config import TRADING_ASSETS
+
+DEFAULT_LATENCY = ("lognormal", math.log(0.08), 0.5)   # ~80ms mediana
+DEFAULT_SETTLEMENT_DELAY = ("uniform", 2.0, 20.0)      # Segundos tras la expiración
+
+
+def sample_distribution(spec, rng):
+    """
+    Obtener una muestra (en segundos) de una especificación de distribución
+
+    Formatos aceptados:
+        número                          -> constante
+        ("constant", valor)
+        ("uniform", mínimo, máximo)
+        ("normal", media, desviación)   -> truncada en 0
+        ("lognormal", mu, sigma)
+        ("exponential", media)
+        callable(rng)                   -> valor devuelto
+    """
+    if spec is None:
+        return 0.0
+    if callable(spec):
+        return max(0.0, float(spec(rng)))
+    if isinstance(spec, (int, float)):
+        return max(0.0, float(spec))
+
+    kind, *params = spec
+    if kind == "constant":
+        value = params[0]
+    elif kind == "uniform":
+        value = rng.uniform(params[0], params[1])
+    elif kind == "normal":
+        value = rng.gauss(params[0], params[1])
+    elif kind == "lognormal":
+        value = rng.lognormvariate(params[0], params[1])
+    elif kind == "exponential":
+        value = rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    else:
+        raise ValueError(f"Distribución desconocida: {kind}")
+    return max(0.0, float(value))
+
+
+class PricePath:
+    """Camino de precios sintético (movimiento browniano geométrico) para un activo"""
+
+    def __init__(self, seed, origin, start_price=100.0, volatility=0.0008, drift=0.0, tick_seconds=5):
+        self.rng = random.Random(seed)
+        self.origin = origin
+        self.tick_seconds = tick_seconds
+        self.volatility = volatility
+        self.drift = drift
+        self.prices = [start_price]
+
+    def _extend_to(self, index):
+        prices = self.prices
+        while len(prices) <= index:
+            shock = self.rng.gauss(self.drift, self.volatility)
+            prices.append(prices[-1] * math.exp(shock))
+
+    def price_at(self, timestamp):
+        """Precio vigente en un instante"""
+        index = max(0, int((timestamp - self.origin) // self.tick_seconds))
+        self._extend_to(index)
+        return self.prices[index]
+
+    def candle(self, start, size):
+        """Vela OHLC entre start y start + size"""
+        first = max(0, int((start - self.origin) // self.tick_seconds))
+        last = max(first, int((start + size - self.origin) // self.tick_seconds) - 1)
+        self._extend_to(last)
+        window = self.prices[first:last + 1]
+        return {
+            "open": window[0],
+            "close": window[-1],
+            "min": min(window),
+            "max": max(window),
+        }
+
+
+class _SimulatedWebSocketApp:
+    """Equivalente del WebSocketApp: solo el callback on_message"""
+
+    def __init__(self):
+        self.on_message = None
+
+    def dispatch(self, message):
+        """Entregar un mensaje como lo hace websocket-client"""
+        callback = self.on_message
+        if callback is None:
+            return
+        if inspect.ismethod(callback):
+            callback(message)
+        else:
+            callback(self, message)
+
+
+class _SimulatedWebSocketClient:
+    def __init__(self):
+        self.wss = _SimulatedWebSocketApp()
+
+
+class _SimulatedAPI:
+    """Equivalente del objeto iqoption.api con las estructuras que lee la estrategia"""
+
+    def __init__(self):
+        self.order_binary = {}
+        self.listinfodata = {"listInfoData": []}
+        self.websocket_client = _SimulatedWebSocketClient()
+
+
+class SimulatedIQOption:
+    """
+    Cliente simulado con la misma superficie que iqoptionapi.stable_api.IQ_Option
+
+    Los resultados se calculan con el camino de precios sintético: CALL gana si
+    el precio de expiración supera al de entrada y PUT si queda por debajo.
+    """
+
+    _order_ids = itertools.count(10_000_000)
+
+    def __init__(self, email=None, password=None, assets=None, balances=None, payouts=None,
+                 latency=DEFAULT_LATENCY, latency_by_method=None,
+                 settlement_delay=DEFAULT_SETTLEMENT_DELAY, volatility=0.0008,
+                 tick_seconds=5, history_seconds=2 * 24 * 3600, seed=42,
+                 login_ok=True, login_reason=None, closed_assets=None):
+        """
+        Args:
+            email, password: Ignorados (misma firma que IQ_Option)
+            assets: Nombres de activos en el broker (por defecto los de TRADING_ASSETS)
+            balances: {"PRACTICE": monto, "REAL": monto}
+            payouts: {"default": 0.85, "<activo>": 0.80} como fracción
+            latency: Distribución de latencia para todas las llamadas
+            latency_by_method: {"buy": distribución, ...} para sobrescribir por método
+            settlement_delay: Distribución del retraso entre expiración y resultado
+            volatility: Volatilidad por tick del camino de precios
+            tick_seconds: Resolución del camino de precios
+            history_seconds: Historial disponible hacia atrás para get_candles
+            seed: Semilla para latencias, precios y retrasos
+            login_ok, login_reason: Resultado de connect()
+            closed_assets: Activos que aparecen cerrados
+        """
+        self.email = email
+        self.password = password
+        self.assets = [a.upper() for a in (assets or TRADING_ASSETS)]
+        self.balances = dict(balances or {"PRACTICE": 10_000.0, "REAL": 1_000.0})
+        self.payouts = dict(payouts or {})
+        self.payouts.setdefault("default", 0.85)
+        self.latency = latency
+        self.latency_by_method = latency_by_method or {}
+        self.settlement_delay = settlement_delay
+        self.login_ok = login_ok
+        self.login_reason = login_reason
+        self.closed_assets = set(closed_assets or [])
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.active_balance = "PRACTICE"
+        self.connected = False
+        self.api = _SimulatedAPI()
+
+        origin = time.time() - history_seconds
+        self.price_paths = {
+            asset: PricePath(
+                seed=f"{seed}:{asset}",
+                origin=origin,
+                start_price=random.Random(f"{seed}:{asset}:start").uniform(20, 500),
+                volatility=volatility,
+                tick_seconds=tick_seconds
+            )
+            for asset in self.assets
+        }
+        self.opcodes = {asset: 1000 + i for i, asset in enumerate(self.assets)}
+
+        self.orders = {}
+        self._lock = threading.RLock()
+        self._pending = []  # heap (settle_at, order_id)
+        self._scheduler_wakeup = threading.Condition(self._lock)
+        self._scheduler = threading.Thread(target=self._settlement_loop, name="sim-settlement", daemon=True)
+        self._scheduler.start()
+
+    # ------------------------------------------------------------------ utilidades
+
+    def _latency(self, method):
+        spec = self.latency_by_method.get(method, self.latency)
+        with self._lock:
+            delay = sample_distribution(spec, self.rng)
+        if delay:
+            time.sleep(delay)
+
+    def payout_for(self, asset):
+        """Payout (fracción) de un activo"""
+        return self.payouts.get(asset, self.payouts["default"])
+
+    # ------------------------------------------------------------------ sesión
+
+    def connect(self):
+        self._latency("connect")
+        self.connected = self.login_ok
+        return self.login_ok, self.login_reason
+
+    def check_connect(self):
+        return self.connected
+
+    def change_balance(self, balance_mode):
+        self._latency("change_balance")
+        with self._lock:
+            self.balances.setdefault(balance_mode, 0.0)
+            self.active_balance = balance_mode
+
+    def get_balance(self):
+        self._latency("get_balance")
+        with self._lock:
+            return round(self.balances[self.active_balance], 2)
+
+    # ------------------------------------------------------------------ activos
+
+    def update_ACTIVES_OPCODE(self):
+        self._latency("update_ACTIVES_OPCODE")
+
+    def get_all_ACTIVES_OPCODE(self):
+        self._latency("get_all_ACTIVES_OPCODE")
+        return dict(self.opcodes)
+
+    def get_all_open_time(self):
+        self._latency("get_all_open_time")
+        status = {asset: {"open": asset not in self.closed_assets} for asset in self.assets}
+        return {
+            "turbo": {asset: dict(info) for asset, info in status.items()},
+            "binary": {asset: dict(info) for asset, info in status.items()},
+            "digital": {},
+        }
+
+    def get_all_profit(self):
+        self._latency("get_all_profit")
+        return {
+            asset: {"turbo": self.payout_for(asset), "binary": self.payout_for(asset)}
+            for asset in self.assets
+        }
+
+    def get_candles(self, asset, interval, count, endtime):
+        self._latency("get_candles")
+        path = self.price_paths.get(asset)
+        if path is None:
+            return []
+        end = int(min(endtime, time.time()))
+        last_start = end - end % interval
+        candles = []
+        with self._lock:
+            for i in range(count - 1, -1, -1):
+                start = last_start - i * interval
+                if start < path.origin:
+                    continue
+                ohlc = path.candle(start, interval)
+                candles.append({
+                    "id": start // interval,
+                    "from": start,
+                    "at": start * 1_000_000_000,
+                    "to": start + interval,
+                    "volume": 0,
+                    **ohlc
+                })
+        return candles
+
+    # ------------------------------------------------------------------ órdenes
+
+    def buy(self, price, ACTIVES, ACTION, expirations):
+        self._latency("buy")
+        with self._lock:
+            if ACTIVES not in self.price_paths or ACTIVES in self.closed_assets:
+                return False, f"{ACTIVES} not available"
+            if price > self.balances[self.active_balance]:
+                return False, "insufficient funds"
+
+            now = time.time()
+            order_id = next(self._order_ids)
+            expiry = now + expirations * 60
+            settle_at = expiry + sample_distribution(self.settlement_delay, self.rng)
+            self.balances[self.active_balance] -= price
+            self.orders[order_id] = {
+                "id": order_id,
+                "asset": ACTIVES,
+                "direction": ACTION.lower(),
+                "amount": price,
+                "balance": self.active_balance,
+                "created": now,
+                "expiry": expiry,
+                "open_price": self.price_paths[ACTIVES].price_at(now),
+                "profit_percent": int(round(self.payout_for(ACTIVES) * 100)),
+                "result": None,
+            }
+            heapq.heappush(self._pending, (settle_at, order_id))
+            self._scheduler_wakeup.notify()
+        return True, order_id
+
+    def get_async_order(self, buy_order_id):
+        self._latency("get_async_order")
+        with self._lock:
+            order = self.orders.get(buy_order_id)
+            if not order or order["result"] is None:
+                return {}
+            return {
+                "id": order["id"],
+                "win": order["result"],
+                "win_amount": order["win_amount"],
+                "amount": order["amount"],
+                "profit_percent": order["profit_percent"],
+            }
+
+    def get_optioninfo_v2(self, limit):
+        self._latency("get_optioninfo_v2")
+        with self._lock:
+            closed = [order for order in self.orders.values() if order["result"] is not None]
+            closed.sort(key=lambda order: order["settled_at"], reverse=True)
+            return {
+                "msg": {
+                    "closed_options": [
+                        {
+                            "id": [order["id"]],
+                            "active": order["asset"],
+                            "direction": order["direction"],
+                            "amount": order["amount"],
+                            "win": order["result"],
+                            "win_amount": order["win_amount"],
+                            "open_time": int(order["created"]),
+                            "expired": int(order["expiry"]),
+                        }
+                        for order in closed[:limit]
+                    ]
+                }
+            }
+
+    def _settle(self, order_id):
+        """
+        Resolver una orden (requiere self._lock)
+
+        Returns:
+            str: Mensaje "option-closed" para enviar por el websocket
+        """
+        order = self.orders[order_id]
+        path = self.price_paths[order["asset"]]
+        close_price = path.price_at(order["expiry"])
+        open_price = order["open_price"]
+
+        if close_price == open_price:
+            result = "equal"
+        elif (close_price > open_price) == (order["direction"] == "call"):
+            result = "win"
+        else:
+            result = "loose"
+
+        amount = order["amount"]
+        if result == "win":
+            win_amount = round(amount * (1 + order["profit_percent"] / 100), 2)
+        elif result == "equal":
+            win_amount = amount
+        else:
+            win_amount = 0.0
+
+        order.update(result=result, win_amount=win_amount, close_price=close_price, settled_at=time.time())
+        self.balances[order["balance"]] += win_amount
+
+        self.api.order_binary[order_id] = {
+            "id": order_id,
+            "result": result,
+            "profit_percent": order["profit_percent"],
+            "amount": amount,
+            "win_amount": win_amount,
+        }
+        self.api.listinfodata["listInfoData"].append({
+            "id": order_id,
+            "win": result,
+            "win_amount": win_amount,
+            "game_state": 1,
+        })
+        return json.dumps({
+            "name": "option-closed",
+            "msg": {
+                "option_id": order_id,
+                "result": result,
+                "amount": amount,
+                "profit_amount": win_amount,
+                "active": order["asset"],
+                "expiration_time": int(order["expiry"]),
+            },
+        })
+
+    def _settlement_loop(self):
+        while True:
+            with self._lock:
+                while True:
+                    if not self._pending:
+                        self._scheduler_wakeup.wait()
+                        continue
+                    settle_at, order_id = self._pending[0]
+                    wait = settle_at - time.time()
+                    if wait > 0:
+                        self._scheduler_wakeup.wait(wait)
+                        continue
+                    break
+                heapq.heappop(self._pending)
+                message = self._settle(order_id)
+            # Fuera del lock, como el thread del websocket real
+            try:
+                self.api.websocket_client.wss.dispatch(message)
+            except Exception:
+                pass
@@ -0,0 +1,223 @@
+# log_pipeline.py
+# Logging asíncrono: QueueHandler en el thread que loguea, escritura en un thread aparte
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s | %(levelname)s | %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler con cola acotada que nunca bloquea al que loguea
+
+    Si la cola está llena, los registros DEBUG/INFO nuevos se descartan; un
+    WARNING o superior desplaza al registro más viejo de la cola para entrar
+    (los errores no se pierden por una ráfaga de INFO).
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self.enqueued = 0
+        self.max_depth = 0
+
+    def prepare(self, record):
+        # Formatear solo el mensaje (args, excepción); fecha y nivel los pone el listener
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self._count_drop()
+                return
+            try:
+                self.queue.get_nowait()
+                self._count_drop()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self._count_drop()
+                return
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _count_drop(self):
+        with self._drop_lock:
+            self.dropped += 1
+
+
+class _ReportingListener(QueueListener):
+    """QueueListener que avisa en el log cuando se descartaron registros"""
+
+    def __init__(self, log_queue, queue_handler, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.reported_drops = 0
+
+    def handle(self, record):
+        super().handle(record)
+        dropped = self.queue_handler.dropped
+        if dropped > self.reported_drops:
+            notice = logging.LogRecord(
+                record.name, logging.WARNING, __file__, 0,
+                f"⚠️ Cola de logs llena: {dropped - self.reported_drops} registros descartados "
+                f"({dropped} en total)", None, None
+            )
+            self.reported_drops = dropped
+            super().handle(notice)
+
+
+class LogPipeline:
+    """
+    Handlers de archivo y consola detrás de una cola acotada
+
+    Los loggers reciben solo el QueueHandler (encolar es O(1) y no toca
+    disco); un thread "log-writer" formatea y escribe. Así la latencia de
+    escritura del log no aparece en el tiempo de ciclo.
+    """
+
+    def __init__(self, log_file, queue_size=10000, console=True):
+        self.log_file = log_file
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(self.queue)
+
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+        handlers = [logging.FileHandler(log_file, encoding='utf-8')]
+        if console:
+            handlers.append(logging.StreamHandler(sys.stdout))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        self.handlers = handlers
+
+        self.listener = _ReportingListener(self.queue, self.queue_handler, *handlers)
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            self.listener.start()
+            self.listener._thread.name = "log-writer"
+            self._started = True
+            atexit.register(self.stop)
+        return self
+
+    def add_handler(self, handler):
+        """Sumar un handler al thread de escritura (recibe los registros ya preparados)"""
+        self.listener.handlers = self.listener.handlers + (handler,)
+
+    def remove_handler(self, handler):
+        self.listener.handlers = tuple(h for h in self.listener.handlers if h is not handler)
+
+    def stop(self):
+        """Escribir lo encolado y cerrar los handlers"""
+        if self._started:
+            self._started = False
+            self.listener.stop()
+            for handler in self.handlers:
+                handler.close()
+
+    def metrics(self):
+        return {
+            "enqueued": self.queue_handler.enqueued,
+            "dropped": self.queue_handler.dropped,
+            "depth": self.queue.qsize(),
+            "max_depth": self.queue_handler.max_depth,
+        }
+
+
+def read_log_tail(log_file, limit=50, block_size=8192):
+    """
+    Últimas 'limit' líneas del log sin leer el archivo completo
+
+    Lee bloques desde el final hasta juntar suficientes saltos de línea.
+
+    Returns:
+        list de líneas (sin salto final), de la más vieja a la más nueva
+    """
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    if position > 0:
+        lines = lines[1:]  # La primera línea del bloque puede estar cortada
+    return lines[-limit:]
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging(log_file, level=logging.INFO, module_levels=None, queue_size=10000, console=True):
+    """
+    Configurar el logging del proceso (idempotente)
+
+    Un solo pipeline por proceso, colgado del logger raíz: los loggers de cada
+    módulo no tienen handlers propios y propagan, así cada evento se escribe
+    una sola vez aunque main y la estrategia configuren el logging. Llamarlo
+    de nuevo con el mismo archivo solo actualiza los niveles; con otro archivo
+    reemplaza el pipeline.
+
+    Args:
+        log_file: Archivo de log
+        level: Nivel global (logger raíz)
+        module_levels: {nombre de logger: nivel} para ajustar módulos puntuales
+
+    Returns:
+        LogPipeline: El pipeline del proceso
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None and os.path.abspath(_pipeline.log_file) != os.path.abspath(log_file):
+            _shutdown_locked()
+        root = logging.getLogger()
+        if _pipeline is None:
+            _pipeline = LogPipeline(log_file, queue_size, console).start()
+            root.addHandler(_pipeline.queue_handler)
+        root.setLevel(level)
+        for name, module_level in (module_levels or {}).items():
+            logging.getLogger(name).setLevel(module_level)
+        return _pipeline
+
+
+def get_pipeline():
+    """Pipeline del proceso (None si todavía no se configuró el logging)"""
+    return _pipeline
+
+
+def shutdown_logging():
+    """Escribir lo encolado, cerrar los handlers y desconectar el pipeline del logger raíz"""
+    with _pipeline_lock:
+        _shutdown_locked()
+
+
+def _shutdown_locked():
+    global _pipeline
+    if _pipeline is not None:
+        logging.getLogger().removeHandler(_pipeline.queue_handler)
+        _pipeline.stop()
+        _pipeline = None
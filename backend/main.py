@@ -9,6 +9,7 @@ from datetime import datetime
 from config import IQ_EMAIL, IQ_PASSWORD, ACCOUNT_TYPE, LOG_FILE
 from strategy import MultiAssetRSIBinaryOptionsStrategy
 from utils import setup_logger
+from data_dir import UserDataDir, DataDirLockedError
 
 def main():
     """Función principal para ejecutar la estrategia"""
@@ -38,6 +39,21 @@ def main():
                        help='Tamaño de posición para crypto en porcentaje (1-5)')
     parser.add_argument('--aggressiveness', choices=['conservador', 'balanceado', 'agresivo'],
                        help='Nivel de agresividad del algoritmo')
+    parser.add_argument('--standby-connection', action='store_true',
+                       help='Mantener una conexión de reserva para reconexión rápida')
+    parser.add_argument('--simulate', action='store_true',
+                       help='Usar el simulador local de IQ Option (sin red ni cuenta real)')
+    parser.add_argument('--record', type=str, metavar='ARCHIVO',
+                       help='Grabar todo el tráfico con el broker en ARCHIVO (.jsonl.gz)')
+    parser.add_argument('--replay', type=str, metavar='ARCHIVO',
+                       help='Reproducir una grabación contra la estrategia y salir')
+    parser.add_argument('--replay-speed', choices=['recorded', 'fast'], default='fast',
+                       help='Velocidad de reproducción: tiempos grabados o lo más rápido posible')
+    parser.add_argument('--user-id', type=str,
+                       help='Usuario dueño del proceso: estado, ledger y logs en data/<user-id>/')
+    parser.add_argument('--data-dir', type=str, metavar='DIR',
+                       help='Directorio de datos explícito (sobrescribe data/<user-id>/; con '
+                            '--simulate no puede ser el directorio actual ni estar bajo data/)')
     
     args = parser.parse_args()
     
@@ -46,14 +62,29 @@ def main():
     password = args.password or IQ_PASSWORD
     account_type = args.account
     
-    # Verificar credenciales
-    if not email or not password or email == "tu_email@example.com":
+    # Verificar credenciales (el simulador no las necesita)
+    if args.simulate or args.replay:
+        email = args.email or "simulador@localhost"
+        password = args.password or "simulador"
+    elif not email or not password or email == "tu_email@example.com":
         print("❌ ERROR: Por favor configura tus credenciales en config.py o pásalas como argumentos")
         print("Uso: python main.py --email tu_email@example.com --password tu_password")
         sys.exit(1)
     
+    # Directorio de datos del usuario: un solo proceso por directorio
+    try:
+        if args.simulate or args.replay:
+            # Simulador y replay nunca escriben en el estado, ledger ni log del bot real
+            # (el replay además corre la estrategia en un directorio temporal)
+            data_dir = UserDataDir.for_simulation(args.user_id, args.data_dir).lock()
+        else:
+            data_dir = UserDataDir.resolve(args.user_id, args.data_dir).lock()
+    except (ValueError, DataDirLockedError) as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    
     # Configurar logger principal
-    logger = setup_logger('main', LOG_FILE)
+    logger = setup_logger('main', data_dir.path(LOG_FILE))
     
     # Banner de inicio
     logger.info("=" * 60)
@@ -62,12 +93,15 @@ def main():
     logger.info("=" * 60)
     logger.info(f"📅 Fecha/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"📧 Usuario: {email[:3]}***{email[-10:]}")  # Ocultar parte del email
+    logger.info(f"📁 Datos: {data_dir.base_dir}")
     logger.info("=" * 60)
     logger.info("⚠️ IMPORTANTE: Esta estrategia usa lógica INVERTIDA")
     logger.info("   - PUT cuando Algebra Inversa ≤ 35 (sobreventa)")
     logger.info("   - CALL cuando Algebra Inversa ≥ 65 (sobrecompra)")
     logger.info("=" * 60)
     
+    recorder = None
+    
     try:
         # Crear e inicializar la estrategia
         logger.info("🚀 Inicializando estrategia...")
@@ -76,7 +110,8 @@ def main():
         strategy_params = {
             'email': email,
             'password': password,
-            'account_type': account_type
+            'account_type': account_type,
+            'data_dir': data_dir
         }
         
         # Agregar pares específicos si se proporcionaron
@@ -106,6 +141,36 @@ def main():
             logger.info(f"⚡ Nivel de agresividad: {args.aggressiveness}")
             strategy_params['aggressiveness'] = args.aggressiveness
         
+        if args.standby_connection:
+            logger.info("🔋 Conexión de reserva habilitada")
+            strategy_params['standby_connection'] = True
+        
+        if args.simulate:
+            from iqoption_simulator import SimulatedIQOption
+            logger.info("🧪 MODO SIMULADOR: sin conexión a IQ Option")
+            strategy_params['client_factory'] = SimulatedIQOption
+        
+        if args.replay:
+            from broker_recording import replay_strategy
+            logger.info(f"🔁 Reproduciendo {args.replay} (velocidad: {args.replay_speed})")
+            result = replay_strategy(args.replay, speed=args.replay_speed, logger=logger, **strategy_params)
+            logger.info(f"📊 Ciclos: {result['cycles']} | Duración: {result['elapsed_seconds']:.2f}s")
+            for method, count in sorted(result['calls_served'].items()):
+                logger.info(f"   {method}: {count} llamadas")
+            if result['exhausted']:
+                logger.info(f"   Grabación agotada en: {', '.join(result['exhausted'])}")
+            return
+        
+        if args.record:
+            from broker_recording import RecordingIQOption, TrafficRecorder
+            if 'client_factory' in strategy_params:
+                base_factory = strategy_params['client_factory']
+            else:
+                from iqoptionapi.stable_api import IQ_Option as base_factory
+            recorder = TrafficRecorder(args.record)
+            logger.info(f"⏺️ Grabando tráfico del broker en {args.record}")
+            strategy_params['client_factory'] = lambda e, p: RecordingIQOption(base_factory(e, p), recorder)
+        
         strategy = MultiAssetRSIBinaryOptionsStrategy(**strategy_params)
         
         # Si es modo debug de activos
@@ -159,6 +224,9 @@ def main():
         logger.error("Traceback completo:", exc_info=True)
         sys.exit(1)
     finally:
+        if recorder:
+            recorder.close()
+        data_dir.unlock()
         logger.info("👋 Programa finalizado")
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+# order_fast_path.py
+# Órdenes pre-armadas: balance, activo y monto listos antes de que llegue la señal
+
+import threading
+import time
+from collections import deque
+
+
+class OrderTicket:
+    """Datos listos para enviar una orden de un activo"""
+
+    __slots__ = ("asset", "asset_name", "option_type", "amount", "balance", "armed_at")
+
+    def __init__(self, asset, asset_name, option_type, amount, balance, armed_at):
+        self.asset = asset
+        self.asset_name = asset_name
+        self.option_type = option_type
+        self.amount = amount
+        self.balance = balance
+        self.armed_at = armed_at
+
+
+class PreArmedOrderBook:
+    """
+    Mantener un ticket pre-calculado por activo, refrescado en segundo plano
+
+    Un thread consulta el balance cada refresh_seconds y recalcula el monto de
+    cada activo, de modo que al decidir una señal la orden sale sin esperar
+    ninguna llamada de red previa. Si el balance cacheado es más viejo que
+    max_age_seconds, ticket() devuelve None y el llamador usa el camino normal.
+    """
+
+    def __init__(self, fetch_balance, resolve_asset, size_for_balance,
+                 refresh_seconds=10, max_age_seconds=30, logger=None):
+        """
+        Args:
+            fetch_balance: Callable () -> balance o None
+            resolve_asset: Callable (asset) -> (asset_name, option_type) o None
+            size_for_balance: Callable (asset, balance) -> monto de la orden
+            refresh_seconds: Intervalo de refresco del balance
+            max_age_seconds: Edad máxima del balance para considerar un ticket válido
+        """
+        self.fetch_balance = fetch_balance
+        self.resolve_asset = resolve_asset
+        self.size_for_balance = size_for_balance
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._tickets = {}
+        self._assets = []
+        self._balance = None
+        self._balance_at = 0.0
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, assets):
+        """Armar tickets para los activos y arrancar el refresco en segundo plano"""
+        self.set_assets(assets)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._refresh_loop, name="order-arming", daemon=True)
+            self._thread.start()
+
+    def set_assets(self, assets):
+        """Cambiar el conjunto de activos a mantener armados"""
+        with self._lock:
+            self._assets = list(assets)
+            balance = self._balance
+        if balance is not None:
+            self._arm_all(balance)
+
+    def refresh(self):
+        """Consultar el balance y re-armar todos los tickets (bloqueante)"""
+        balance = self.fetch_balance()
+        if balance is None:
+            return False
+        with self._lock:
+            self._balance = balance
+            self._balance_at = time.time()
+        self._arm_all(balance)
+        return True
+
+    def _arm_all(self, balance):
+        with self._lock:
+            assets = list(self._assets)
+        tickets = {}
+        now = time.time()
+        for asset in assets:
+            resolved = self.resolve_asset(asset)
+            if not resolved:
+                continue
+            asset_name, option_type = resolved
+            tickets[asset] = OrderTicket(asset, asset_name, option_type,
+                                         self.size_for_balance(asset, balance), balance, now)
+        with self._lock:
+            self._tickets = tickets
+
+    def rearm(self, asset):
+        """Re-armar un activo (ej: tras cambiar a una variante alternativa)"""
+        with self._lock:
+            balance = self._balance
+        resolved = self.resolve_asset(asset)
+        with self._lock:
+            if balance is None or not resolved:
+                self._tickets.pop(asset, None)
+                return
+            asset_name, option_type = resolved
+            self._tickets[asset] = OrderTicket(asset, asset_name, option_type,
+                                               self.size_for_balance(asset, balance), balance, time.time())
+
+    def ticket(self, asset):
+        """Ticket listo para el activo, o None si no hay datos frescos"""
+        with self._lock:
+            if self._balance is None or time.time() - self._balance_at > self.max_age_seconds:
+                return None
+            return self._tickets.get(asset)
+
+    def consume(self, amount):
+        """Descontar localmente una orden enviada y pedir un refresco"""
+        with self._lock:
+            if self._balance is not None:
+                self._balance -= amount
+            balance = self._balance
+        if balance is not None:
+            self._arm_all(balance)
+        self._wakeup.set()
+
+    def invalidate(self):
+        """Forzar un refresco pronto (ej: tras liquidar una orden)"""
+        self._wakeup.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"⚡ Error refrescando órdenes pre-armadas: {str(e)}")
+            self._wakeup.wait(self.refresh_seconds)
+            self._wakeup.clear()
+
+    def stop(self):
+        """Detener el refresco en segundo plano"""
+        self._stop.set()
+        self._wakeup.set()
+
+
+class OrderLatencyTracker:
+    """Registrar tiempos señal → envío → confirmación de cada orden"""
+
+    def __init__(self, maxlen=500):
+        self.samples = deque(maxlen=maxlen)
+
+    def record(self, order_id, signal_ts, submit_ts, ack_ts):
+        """Registrar los timestamps (epoch en segundos) de una orden"""
+        self.samples.append({
+            "order_id": order_id,
+            "signal_ts": signal_ts,
+            "submit_ts": submit_ts,
+            "ack_ts": ack_ts,
+            "signal_to_submit": submit_ts - signal_ts,
+            "submit_to_ack": ack_ts - submit_ts,
+            "signal_to_ack": ack_ts - signal_ts,
+        })
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """Percentiles (en milisegundos) de las órdenes registradas"""
+        result = {"orders": len(self.samples)}
+        for key in ("signal_to_submit", "submit_to_ack", "signal_to_ack"):
+            values = [sample[key] * 1000 for sample in self.samples]
+            result[key] = {
+                "p50": self._percentile(values, 50),
+                "p95": self._percentile(values, 95),
+                "max": max(values) if values else 0.0,
+            }
+        return result
@@ -0,0 +1,112 @@
+# order_index.py
+# Índice de resultados de órdenes por ID (evita recorrer listinfodata en cada consulta)
+
+import threading
+import time
+from collections import OrderedDict
+
+from settlement_engine import normalize_result
+
+
+class OrderResultIndex:
+    """
+    Resultados de órdenes indexados por ID con retención acotada
+
+    Se alimenta de listinfodata (una pasada por ingesta, por ID: se ven los
+    elementos nuevos y los actualizados en el lugar) y de cualquier otra
+    fuente con add(). La búsqueda es un acceso a dict.
+    """
+
+    def __init__(self, max_entries=5000, max_age_seconds=6 * 3600):
+        """
+        Args:
+            max_entries: Máximo de órdenes retenidas (se descartan las más viejas)
+            max_age_seconds: Antigüedad máxima de una entrada
+        """
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(order_id):
+        return str(order_id)
+
+    def add(self, order_id, data, source):
+        """
+        Registrar el resultado de una orden
+
+        Args:
+            order_id: ID de la orden
+            data: dict con los campos del broker (win, win_amount, ...)
+            source: Origen del dato (ej: "listinfodata")
+        """
+        key = self._key(order_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                "data": data,
+                "source": source,
+                "received_at": time.time(),
+            }
+            self._prune_locked()
+
+    def get(self, order_id):
+        """Entrada {data, source, received_at} de una orden o None"""
+        with self._lock:
+            return self._entries.get(self._key(order_id))
+
+    def pop(self, order_id):
+        """Quitar y devolver la entrada de una orden ya liquidada"""
+        with self._lock:
+            return self._entries.pop(self._key(order_id), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ingest_listinfodata(self, listinfodata):
+        """
+        Indexar los resultados de api.listinfodata ({clave: [items]})
+
+        Se recorren todos los elementos y se comparan por ID (no por posición):
+        el broker puede actualizar un elemento en el lugar o reemplazar la
+        lista. Solo se indexan los que ya traen un resultado (win normalizable,
+        como en parse_result_message); un elemento sin resultado no debe
+        cortar los respaldos de balance y get_async_order.
+
+        Returns:
+            int: Resultados nuevos o modificados indexados
+        """
+        if not isinstance(listinfodata, dict):
+            return 0
+
+        added = 0
+        for items in list(listinfodata.values()):
+            if not isinstance(items, list):
+                continue
+            for item in list(items):
+                if not isinstance(item, dict) or item.get("id") is None:
+                    continue
+                if not normalize_result(item.get("win")):
+                    continue
+                with self._lock:
+                    current = self._entries.get(self._key(item["id"]))
+                if (current is not None and current["source"] == "listinfodata"
+                        and current["data"] == item):
+                    continue
+                self.add(item["id"], dict(item), "listinfodata")
+                added += 1
+        return added
+
+    def _prune_locked(self):
+        """Aplicar los límites de retención (requiere self._lock)"""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        if self.max_age_seconds:
+            cutoff = time.time() - self.max_age_seconds
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if oldest["received_at"] >= cutoff:
+                    break
+                self._entries.popitem(last=False)
@@ -2,6 +2,9 @@
 # patch_strategy.py
 # Script para aplicar automáticamente los cambios necesarios a strategy.py
 
+# Nota: las esperas de liquidación ya no están fijas en strategy.py (ver settlement_delays.py);
+# los cambios de tiempos de este script no encuentran sus patrones y se omiten.
+
 import os
 import shutil
 from datetime import datetime
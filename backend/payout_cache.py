@@ -0,0 +1,101 @@
+# payout_cache.py
+# Tabla de payouts por activo y tipo de opción, refrescada en segundo plano
+
+import threading
+import time
+
+
+class PayoutCache:
+    """
+    Payouts del broker (get_all_profit) cacheados con TTL
+
+    Un thread refresca la tabla cada refresh_seconds; las consultas solo leen
+    el dict en memoria, así que liquidaciones y señales no hacen llamadas de
+    red. Si la tabla es más vieja que max_age_seconds se considera vencida y
+    get() devuelve None para que el llamador use su valor por defecto.
+    """
+
+    def __init__(self, fetch_profits, refresh_seconds=300, max_age_seconds=1800, logger=None):
+        """
+        Args:
+            fetch_profits: Callable () -> {activo: {"turbo": 0.85, "binary": 0.80}} o None
+            refresh_seconds: Intervalo de refresco
+            max_age_seconds: Edad máxima de la tabla para considerarla válida
+        """
+        self.fetch_profits = fetch_profits
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._payouts = {}
+        self._updated_at = 0.0
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _to_percent(value):
+        """El broker reporta fracciones (0.85); aceptar también porcentajes (85)"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if value <= 0:
+            return None
+        return value * 100 if value <= 1 else value
+
+    def start(self):
+        """Arrancar el refresco en segundo plano"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._refresh_loop, name="payout-cache", daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        """Consultar la tabla de payouts (bloqueante)"""
+        profits = self.fetch_profits()
+        if not isinstance(profits, dict) or not profits:
+            return False
+
+        payouts = {}
+        for asset_name, by_type in profits.items():
+            if not isinstance(by_type, dict):
+                continue
+            for option_type, value in by_type.items():
+                percent = self._to_percent(value)
+                if percent is not None:
+                    payouts[(asset_name, option_type)] = percent
+
+        with self._lock:
+            self._payouts = payouts
+            self._updated_at = time.time()
+        return True
+
+    def get(self, asset_name, option_type):
+        """Payout (en %) del activo para el tipo de opción, o None si no hay dato fresco"""
+        with self._lock:
+            if time.time() - self._updated_at > self.max_age_seconds:
+                return None
+            return self._payouts.get((asset_name, option_type))
+
+    def __len__(self):
+        return len(self._payouts)
+
+    def invalidate(self):
+        """Forzar un refresco pronto (ej: tras reconectar)"""
+        self._wakeup.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"💹 Error refrescando payouts: {str(e)}")
+            self._wakeup.wait(self.refresh_seconds)
+            self._wakeup.clear()
+
+    def stop(self):
+        """Detener el refresco en segundo plano"""
+        self._stop.set()
+        self._wakeup.set()
@@ -0,0 +1,102 @@
+# reconciliation.py
+# Conciliación periódica del P&L del ledger contra el balance del broker
+
+import time
+import logging
+from datetime import datetime
+
+
+class PnLReconciler:
+    """
+    Comparar el P&L del ledger con el balance real en una sola consulta
+
+    Corre cada interval_seconds o tras every_n_settlements liquidaciones (lo que
+    ocurra primero). El balance esperado es:
+
+        balance_inicio_día + profit_del_ledger(hoy) - montos_de_órdenes_abiertas
+
+    Si la diferencia supera la tolerancia se registra un evento en el ledger
+    (tabla reconciliation_events) y se loguea; los contadores no se
+    sobrescriben.
+    """
+
+    def __init__(self, ledger, fetch_balance, interval_seconds=900, every_n_settlements=5,
+                 tolerance=1.0, logger=None):
+        """
+        Args:
+            ledger: TradeLedger
+            fetch_balance: Callable () -> balance o None
+            interval_seconds: Intervalo máximo entre conciliaciones
+            every_n_settlements: Conciliar tras esta cantidad de liquidaciones
+            tolerance: Diferencia (en $) a partir de la cual se registra un evento
+        """
+        self.ledger = ledger
+        self.fetch_balance = fetch_balance
+        self.interval_seconds = interval_seconds
+        self.every_n_settlements = every_n_settlements
+        self.tolerance = tolerance
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.settlements_since = 0
+        self.last_run = time.time()
+        self.last_result = None
+        self.runs = 0
+        self.discrepancies = 0
+
+    def note_settlement(self):
+        """Contar una orden liquidada (sin llamadas de red)"""
+        self.settlements_since += 1
+
+    def due(self):
+        """Verificar si toca conciliar"""
+        if self.every_n_settlements and self.settlements_since >= self.every_n_settlements:
+            return True
+        return time.time() - self.last_run >= self.interval_seconds
+
+    def reconcile(self, day_start_balance, counter_profit, open_exposure, day=None):
+        """
+        Conciliar el día contra el balance del broker
+
+        Args:
+            day_start_balance: Balance al inicio del día
+            counter_profit: daily_profit calculado por la estrategia
+            open_exposure: Suma de montos de órdenes aún abiertas
+            day: Día a conciliar (YYYY-MM-DD, por defecto hoy)
+
+        Returns:
+            dict: Resultado de la conciliación (None si no se pudo obtener el balance)
+        """
+        self.last_run = time.time()
+        balance = self.fetch_balance()
+        if balance is None:
+            return None
+
+        self.settlements_since = 0
+        self.runs += 1
+        day = day or datetime.now().date().isoformat()
+        ledger_profit = self.ledger.summary(day=day)["profit"]
+        expected_balance = day_start_balance + ledger_profit - open_exposure
+        difference = balance - expected_balance
+
+        result = {
+            "day": day,
+            "broker_balance": balance,
+            "expected_balance": expected_balance,
+            "ledger_profit": ledger_profit,
+            "counter_profit": counter_profit,
+            "open_exposure": open_exposure,
+            "difference": difference,
+            "ok": abs(difference) <= self.tolerance and abs(counter_profit - ledger_profit) <= self.tolerance,
+        }
+        self.last_result = result
+
+        if result["ok"]:
+            self.logger.debug(f"🧾 Conciliación OK: balance ${balance:,.2f} (diferencia ${difference:+,.2f})")
+            return result
+
+        self.discrepancies += 1
+        self.ledger.record_reconciliation(result)
+        self.logger.warning("⚠️ Discrepancia en la conciliación de P&L (registrada, sin ajustar contadores)")
+        self.logger.warning(f"   Balance broker: ${balance:,.2f} | Esperado: ${expected_balance:,.2f} | Diferencia: ${difference:+,.2f}")
+        self.logger.warning(f"   Profit ledger: ${ledger_profit:,.2f} | Profit calculado: ${counter_profit:,.2f}")
+        return result
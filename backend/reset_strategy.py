@@ -5,24 +5,35 @@ Borra todas las estadísticas acumuladas y permite empezar de cero
 """
 
 import os
-import json
-import shutil
-from datetime import datetime
+import sys
+import argparse
 from pathlib import Path
 
+from state_journal import StateJournal
+from state_codec import JsonStateCodec, decode_state
+from data_dir import UserDataDir, DataDirLockedError
+from backup_store import BackupStore
+
 # Configuración
 STATE_FILE = "strategy_state.json"
+STATE_JOURNAL_FILE = "strategy_state.journal"
 LOG_FILE = "iqoption_strategy.log"
-BACKUP_DIR = "backups"
+BACKUP_DIR = "backups"  # Almacén de backups deduplicados (ver backup_store.py)
 
-def load_current_state():
-    """Cargar el estado actual si existe"""
-    if not os.path.exists(STATE_FILE):
+def load_current_state(data_dir):
+    """Cargar el estado actual si existe (checkpoint + cambios del journal)"""
+    state_file = data_dir.path(STATE_FILE)
+    journal_file = data_dir.path(STATE_JOURNAL_FILE)
+    if not os.path.exists(state_file) and not os.path.exists(journal_file):
         return None
     
     try:
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
+        state = {}
+        if os.path.exists(state_file):
+            with open(state_file, 'rb') as f:
+                state = decode_state(f.read())
+        StateJournal(journal_file).replay(state)
+        return state or None
     except Exception as e:
         print(f"❌ Error leyendo estado: {e}")
         return None
@@ -75,47 +86,46 @@ def show_current_statistics(state):
     print(f"\n📅 Última actualización: {timestamp}")
     print("=" * 50)
 
-def create_backup(state):
-    """Crear backup del estado actual"""
+def create_backup(state, data_dir):
+    """Crear backup del estado actual (en el almacén deduplicado)"""
     if not state:
         return None
     
-    # Crear directorio de backups si no existe
-    Path(BACKUP_DIR).mkdir(exist_ok=True)
-    
-    # Nombre del archivo de backup
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = f"{BACKUP_DIR}/strategy_state_backup_{timestamp}.json"
-    
     # Guardar backup
     try:
-        with open(backup_file, 'w') as f:
-            json.dump(state, f, indent=4)
-        print(f"\n💾 Backup creado: {backup_file}")
-        return backup_file
+        store = BackupStore(data_dir.path(BACKUP_DIR))
+        manifest = store.put(JsonStateCodec().encode(state), "state", STATE_FILE)
+        print(f"\n💾 Backup creado: {manifest['id']} ({manifest['stored_bytes']} bytes nuevos en disco)")
+        return manifest
     except Exception as e:
         print(f"❌ Error creando backup: {e}")
         return None
 
-def reset_strategy():
+def reset_strategy(data_dir):
     """Reiniciar la estrategia"""
     print("\n🔄 REINICIANDO ESTRATEGIA...")
     
     # Eliminar archivo de estado
-    if os.path.exists(STATE_FILE):
-        os.remove(STATE_FILE)
-        print(f"✅ Archivo {STATE_FILE} eliminado")
+    for filename in (STATE_FILE, STATE_JOURNAL_FILE):
+        path = data_dir.path(filename)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"✅ Archivo {path} eliminado")
+    for generation_file in sorted(Path(data_dir.base_dir).glob(f"{STATE_FILE}.*")):
+        generation_file.unlink()
+        print(f"✅ Checkpoint anterior {generation_file} eliminado")
     
     # Opcional: Limpiar log
     response = input("\n¿Deseas también limpiar el archivo de log? (s/N): ").lower()
     if response == 's':
-        if os.path.exists(LOG_FILE):
-            # Hacer backup del log
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            log_backup = f"{BACKUP_DIR}/iqoption_strategy_log_{timestamp}.log"
-            Path(BACKUP_DIR).mkdir(exist_ok=True)
-            shutil.move(LOG_FILE, log_backup)
-            print(f"✅ Log movido a: {log_backup}")
+        log_file = data_dir.path(LOG_FILE)
+        if os.path.exists(log_file):
+            # Hacer backup del log (comprimido; las partes repetidas no se vuelven a guardar)
+            store = BackupStore(data_dir.path(BACKUP_DIR))
+            manifest = store.put_file(log_file, "log", LOG_FILE)
+            os.remove(log_file)
+            print(f"✅ Log guardado en backups: {manifest['id']}")
+            store.prune()
         else:
             print("📄 No se encontró archivo de log")
     
@@ -127,6 +137,18 @@ def reset_strategy():
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description='Reiniciar las estadísticas de la estrategia')
+    parser.add_argument('--user-id', type=str, help='Usuario a reiniciar (data/<user-id>/)')
+    parser.add_argument('--data-dir', type=str, metavar='DIR', help='Directorio de datos explícito')
+    args = parser.parse_args()
+    
+    # No reiniciar mientras una estrategia usa el mismo directorio
+    try:
+        data_dir = UserDataDir.resolve(args.user_id, args.data_dir).lock()
+    except (ValueError, DataDirLockedError) as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    
     print("🔄 SCRIPT DE REINICIO DE ESTRATEGIA")
     print("=" * 50)
     print("Este script borrará todas las estadísticas acumuladas:")
@@ -135,10 +157,11 @@ def main():
     print("- Beneficios acumulados")
     print("- Estados de stop loss")
     print("- Historial de operaciones")
+    print(f"📁 Datos: {data_dir.base_dir}")
     print("=" * 50)
     
     # Cargar estado actual
-    current_state = load_current_state()
+    current_state = load_current_state(data_dir)
     
     # Mostrar estadísticas actuales
     show_current_statistics(current_state)
@@ -153,13 +176,15 @@ def main():
     
     # Crear backup si hay estado
     if current_state:
-        backup_file = create_backup(current_state)
-        if backup_file:
-            print(f"💡 Puedes restaurar el estado anterior copiando:")
-            print(f"   cp {backup_file} {STATE_FILE}")
+        manifest = create_backup(current_state, data_dir)
+        if manifest:
+            print(f"💡 Puedes restaurar el estado anterior con:")
+            print(f"   python backup_store.py --root {data_dir.path(BACKUP_DIR)} restore --kind state "
+                  f"--at {manifest['created']} "
+                  f"--to {data_dir.path(STATE_FILE)}")
     
     # Reiniciar estrategia
-    reset_strategy()
+    reset_strategy(data_dir)
     
     print("\n✅ Proceso completado")
     print("🚀 Puedes ejecutar 'python main.py' para empezar de nuevo")
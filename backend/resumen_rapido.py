@@ -3,22 +3,34 @@
 Script de Resumen Rápido para monitoreo durante el día
 """
 
-import json
 import os
-from datetime import datetime
+import argparse
+from datetime import datetime, timedelta
 from collections import defaultdict
 
-def quick_summary():
+from config import TRADE_LEDGER_FILE, STATE_FILE, STATE_JOURNAL_FILE, EVENTS_FILE
+from trade_ledger import TradeLedger
+from state_journal import StateJournal
+from state_codec import decode_state
+from data_dir import UserDataDir
+from event_stream import read_events
+
+def quick_summary(data_dir=None):
     """Generar un resumen rápido del estado actual"""
+    data_dir = data_dir or UserDataDir()
+    state_file = data_dir.path(STATE_FILE)
+    ledger_file = data_dir.path(TRADE_LEDGER_FILE)
+    events_file = data_dir.path(EVENTS_FILE)
     
     print("\n" + "="*60)
     print(f"📊 RESUMEN RÁPIDO - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60)
     
-    # 1. Leer estado actual
-    if os.path.exists('strategy_state.json'):
-        with open('strategy_state.json', 'r') as f:
-            state = json.load(f)
+    # 1. Leer estado actual (checkpoint + cambios del journal)
+    if os.path.exists(state_file):
+        with open(state_file, 'rb') as f:
+            state = decode_state(f.read())
+        StateJournal(data_dir.path(STATE_JOURNAL_FILE)).replay(state)
         
         print("\n💰 ESTADO FINANCIERO:")
         print(f"  Profit del día: ${state.get('daily_profit', 0):.2f}")
@@ -69,46 +81,73 @@ def quick_summary():
                         
                         print(f"    {asset}: {rsi:.1f} {status}")
     
-    # 2. Últimas señales del log
+    # 2. Historial de operaciones (consultas indexadas al ledger)
+    if os.path.exists(ledger_file):
+        ledger = TradeLedger(ledger_file, readonly=True)
+        try:
+            today = datetime.now().date().isoformat()
+            day_summary = ledger.summary(day=today)
+            print(f"\n📚 OPERACIONES DE HOY ({today}):")
+            if day_summary['total']:
+                print(f"  Total: {day_summary['total']} | Victorias: {day_summary['wins']} | "
+                      f"Derrotas: {day_summary['losses']} | Empates: {day_summary['ties']}")
+                print(f"  Tasa de éxito (sin empates): {day_summary['win_rate']:.1f}%")
+                print(f"  Profit: ${day_summary['profit']:.2f}")
+                
+                print("\n  Por activo:")
+                for row in ledger.by_asset(day=today):
+                    print(f"    {row['asset']}: {row['total']} ops ({row['wins']}W/{row['losses']}L/{row['ties']}T) "
+                          f"${row['profit']:+.2f}")
+                
+                print("\n  Últimas operaciones:")
+                for trade in ledger.recent(limit=5, day=today):
+                    print(f"    {trade['settle_time'][11:19]} {trade['asset']} {trade['direction']} "
+                          f"{trade['result'].upper()} ${trade['profit']:+.2f}")
+            else:
+                print("  Sin operaciones liquidadas")
+        finally:
+            ledger.close()
+    
+    # 3. Últimas señales (eventos estructurados, sin parsear el log)
     print("\n🔔 ÚLTIMAS ACTIVIDADES (últimos 20 min):")
     
-    if os.path.exists('iqoption_strategy.log'):
-        from datetime import datetime, timedelta
-        cutoff_time = datetime.now() - timedelta(minutes=20)
+    if os.path.exists(events_file):
+        cutoff_ts = (datetime.now() - timedelta(minutes=20)).timestamp()
         
         signals = []
-        stale_signals = []
+        in_zone = {}
+        errors = 0
         
-        with open('iqoption_strategy.log', 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    # Extraer timestamp
-                    time_str = line[:19]
-                    line_time = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-                    
-                    if line_time < cutoff_time:
-                        continue
-                    
-                    # Buscar eventos importantes
-                    if "Momentum" in line and "confirmado" in line:
-                        signals.append(f"  {time_str} - {line.strip()}")
-                    elif "sin cruce fresco" in line:
-                        asset = line.split()[3]
-                        if asset not in stale_signals:
-                            stale_signals.append(asset)
-                except:
-                    continue
+        for event in read_events(events_file, types=("signal", "rsi_reading", "error"), since=cutoff_ts):
+            if event["type"] == "signal":
+                signals.append(event)
+                in_zone.pop(event["asset"], None)
+            elif event["type"] == "rsi_reading":
+                if event.get("zone"):
+                    in_zone[event["asset"]] = event["rsi"]
+                else:
+                    in_zone.pop(event["asset"], None)
+            else:
+                errors += 1
         
         if signals:
             print("\n  ✅ Señales válidas:")
             for signal in signals[-5:]:  # Últimas 5
-                print(f"    {signal}")
+                strength = f" | fuerza {signal['strength']:.0f}%" if signal.get("strength") is not None else ""
+                print(f"    {datetime.fromtimestamp(signal['ts']).strftime('%H:%M:%S')} {signal['asset']} "
+                      f"{signal['direction']} (Algebra {signal['rsi']:.2f}){strength}")
+        
+        if in_zone:
+            zone_assets = [f"{asset} ({rsi:.1f})" for asset, rsi in list(in_zone.items())[-10:]]
+            print(f"\n  ⏭️ Activos en zona extrema sin señal: {', '.join(zone_assets)}")
         
-        if stale_signals:
-            print(f"\n  ⏭️ Activos en zona extrema sin cruce: {', '.join(stale_signals[-10:])}")
+        if errors:
+            print(f"\n  ❌ Errores: {errors}")
         
-        if not signals and not stale_signals:
+        if not signals and not in_zone and not errors:
             print("  Sin actividad relevante")
+    else:
+        print("  Sin eventos registrados")
     
     print("\n" + "="*60)
 
@@ -142,4 +181,8 @@ def get_levels_for_group(group):
     return levels.get(group, (35, 65))
 
 if __name__ == "__main__":
-    quick_summary()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Resumen rápido del estado de la estrategia')
+    parser.add_argument('--user-id', type=str, help='Usuario a resumir (data/<user-id>/)')
+    parser.add_argument('--data-dir', type=str, metavar='DIR', help='Directorio de datos explícito')
+    args = parser.parse_args()
+    quick_summary(UserDataDir.resolve(args.user_id, args.data_dir))
\ No newline at end of file
@@ -0,0 +1,239 @@
+# session_manager.py
+# Gestión de la sesión con IQ Option: reconexión con backoff y conexión de reserva
+
+import threading
+import time
+import random
+import logging
+
+from iqoptionapi.stable_api import IQ_Option
+
+from config import (
+    RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY, RECONNECT_MAX_ATTEMPTS,
+    STANDBY_HEALTH_CHECK_INTERVAL
+)
+from utils import format_currency
+
+
+class SessionManager:
+    """
+    Mantener una sesión con IQ Option usando las credenciales del arranque
+
+    - Reconecta con backoff exponencial y jitter
+    - Vuelve a seleccionar el balance (PRACTICE/REAL) y avisa a los hooks de
+      reconexión (ej: la estrategia re-engancha y re-suscribe la liquidación)
+    - Opcionalmente mantiene una conexión de reserva ya autenticada para que
+      el failover sea un cambio de referencia y no un login completo
+    """
+
+    def __init__(self, email, password, account_type="PRACTICE", logger=None,
+                 client_factory=IQ_Option, use_standby=False):
+        """
+        Args:
+            email: Email de IQ Option
+            password: Contraseña de IQ Option
+            account_type: Tipo de cuenta ("PRACTICE" o "REAL")
+            logger: Logger a usar (por defecto el del módulo)
+            client_factory: Callable (email, password) -> cliente con la API de IQ_Option
+            use_standby: Mantener una conexión de reserva pre-calentada
+        """
+        self.email = email
+        self.password = password
+        self.account_type = account_type
+        self.logger = logger or logging.getLogger(__name__)
+        self.client_factory = client_factory
+        self.use_standby = use_standby
+
+        self.client = None
+        self._standby = None
+        self._lock = threading.Lock()
+        self._standby_thread = None
+        self._stop = threading.Event()
+        self._standby_wakeup = threading.Event()
+
+        self._reconnect_hooks = []  # callbacks(client) tras reconectar
+
+        self.reconnect_count = 0
+        self.failover_count = 0
+        self.last_reconnect_seconds = None
+
+    def _login(self):
+        """Crear un cliente nuevo, autenticarlo y seleccionar el balance"""
+        client = self.client_factory(self.email, self.password)
+        login_status, login_reason = client.connect()
+        if not login_status:
+            raise ConnectionError(login_reason)
+        client.change_balance(self.account_type)
+        return client
+
+    def connect(self):
+        """Conexión inicial (lanza excepción si el login falla)"""
+        self.logger.info("🔗 Conectando a IQ Option...")
+        try:
+            client = self._login()
+        except ConnectionError as e:
+            login_reason = str(e)
+            self.logger.error(f"❌ Error al conectar: {login_reason}")
+            if "2FA" in login_reason.upper():
+                self.logger.info("🔑 Se requiere autenticación de dos factores (2FA)")
+            raise Exception(f"Error al conectar a IQ Option: {login_reason}")
+
+        self.client = client
+        self.logger.info("✅ Conexión exitosa")
+        balance = client.get_balance()
+        self.logger.info(f"💰 Balance actual: {format_currency(balance)}")
+
+        if self.use_standby:
+            self._start_standby_thread()
+        return client
+
+    def is_connected(self):
+        """Verificar la conexión principal"""
+        try:
+            return bool(self.client) and bool(self.client.check_connect())
+        except Exception:
+            return False
+
+    def add_reconnect_hook(self, callback):
+        """Registrar un callback(client) que se ejecuta tras cada reconexión"""
+        self._reconnect_hooks.append(callback)
+
+    def _backoff_delay(self, attempt):
+        """Backoff exponencial con jitter completo"""
+        ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _take_standby(self):
+        """Tomar la conexión de reserva si sigue viva"""
+        with self._lock:
+            standby, self._standby = self._standby, None
+        # Preparar la siguiente reserva cuanto antes
+        self._standby_wakeup.set()
+        if standby is None:
+            return None
+        try:
+            if standby.check_connect():
+                return standby
+        except Exception:
+            pass
+        self._close_client(standby)
+        return None
+
+    def reconnect(self):
+        """
+        Recuperar la sesión principal
+
+        Returns:
+            bool: True si hay una sesión válida al terminar
+        """
+        start = time.time()
+        old_client = self.client
+
+        client = self._take_standby() if self.use_standby else None
+        if client is not None:
+            self.failover_count += 1
+            self.logger.info("⚡ Failover a conexión de reserva")
+        else:
+            for attempt in range(RECONNECT_MAX_ATTEMPTS):
+                try:
+                    client = self._login()
+                    break
+                except Exception as e:
+                    delay = self._backoff_delay(attempt)
+                    self.logger.warning(f"🔌 Reconexión fallida ({attempt + 1}/{RECONNECT_MAX_ATTEMPTS}): {str(e)} - "
+                                        f"reintentando en {delay:.1f}s")
+                    if self._stop.wait(delay):
+                        return False
+            else:
+                self.logger.error(f"❌ No se pudo reconectar después de {RECONNECT_MAX_ATTEMPTS} intentos")
+                return False
+
+        self.client = client
+        self._close_client(old_client)
+        self._rebind(client)
+
+        self.reconnect_count += 1
+        self.last_reconnect_seconds = time.time() - start
+        self.logger.info(f"✅ Reconectado en {self.last_reconnect_seconds:.2f}s")
+
+        if self.use_standby:
+            self._start_standby_thread()
+        return True
+
+    def _rebind(self, client):
+        """Re-seleccionar balance y notificar a los hooks (que re-suscriben lo suyo)"""
+        try:
+            client.change_balance(self.account_type)
+        except Exception as e:
+            self.logger.error(f"❌ Error seleccionando balance {self.account_type}: {str(e)}")
+
+        for callback in self._reconnect_hooks:
+            try:
+                callback(client)
+            except Exception as e:
+                self.logger.error(f"❌ Error en hook de reconexión: {str(e)}")
+
+    def _start_standby_thread(self):
+        """Arrancar (si no corre ya) el thread que mantiene la conexión de reserva"""
+        if self._standby_thread and self._standby_thread.is_alive():
+            return
+        self._standby_thread = threading.Thread(target=self._standby_loop, name="iq-standby", daemon=True)
+        self._standby_thread.start()
+
+    def _standby_loop(self):
+        """Mantener una conexión de reserva autenticada y sana"""
+        attempt = 0
+        while not self._stop.is_set():
+            with self._lock:
+                standby = self._standby
+
+            healthy = False
+            if standby is not None:
+                try:
+                    healthy = bool(standby.check_connect())
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    with self._lock:
+                        if self._standby is standby:
+                            self._standby = None
+                    self._close_client(standby)
+
+            if not healthy:
+                try:
+                    new_standby = self._login()
+                    with self._lock:
+                        self._standby = new_standby
+                    attempt = 0
+                    self.logger.debug("🔋 Conexión de reserva lista")
+                except Exception as e:
+                    delay = self._backoff_delay(attempt)
+                    attempt += 1
+                    self.logger.debug(f"🔋 Error preparando conexión de reserva: {str(e)}")
+                    self._stop.wait(delay)
+                    continue
+
+            self._standby_wakeup.wait(STANDBY_HEALTH_CHECK_INTERVAL)
+            self._standby_wakeup.clear()
+
+    def _close_client(self, client):
+        """Cerrar un cliente en segundo plano (el cierre puede colgarse si el socket murió)"""
+        if client is None:
+            return
+
+        def _close():
+            try:
+                if hasattr(client, "api") and hasattr(client.api, "close"):
+                    client.api.close()
+            except Exception:
+                pass
+
+        threading.Thread(target=_close, name="iq-close", daemon=True).start()
+
+    def close(self):
+        """Detener la conexión de reserva"""
+        self._stop.set()
+        self._standby_wakeup.set()
+        with self._lock:
+            standby, self._standby = self._standby, None
+        self._close_client(standby)
@@ -0,0 +1,140 @@
+# settlement_delays.py
+# Modelo aprendido del retraso de liquidación (reemplaza las esperas fijas de 45/90/120s)
+
+import json
+import os
+import threading
+from collections import defaultdict, deque
+
+
+class SettlementDelayModel:
+    """
+    Registrar cuánto tarda el broker en publicar cada resultado tras la expiración
+
+    Las muestras se agrupan por (tipo de cuenta, tipo de opción, activo). Los
+    umbrales se calculan con cuantiles del grupo más específico que tenga
+    suficientes muestras (activo → tipo de opción → cuenta) y, si no hay
+    datos, se usan los valores por defecto. Las muestras se guardan en un
+    archivo JSON para conservarlas entre reinicios.
+
+    Umbrales (segundos desde la expiración):
+        first_check: empezar a consultar al broker por la orden
+        async_order: consultar get_async_order
+        balance_check: verificar el resultado por diferencia de balance
+        assume_loss: dar la orden por perdida si no hay resultado
+    """
+
+    def __init__(self, path, defaults, min_samples=10, max_samples=200, balance_check_min=45, logger=None):
+        """
+        Args:
+            path: Archivo JSON donde persistir las muestras (None = solo memoria)
+            defaults: dict con los umbrales por defecto
+            min_samples: Muestras necesarias para usar los cuantiles de un grupo
+            max_samples: Muestras retenidas por grupo (las más recientes)
+            balance_check_min: Mínimo para verificar por balance (el balance puede
+                mostrar valores temporales durante ~40s tras la expiración)
+        """
+        self.path = path
+        self.defaults = dict(defaults)
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.balance_check_min = balance_check_min
+        self.logger = logger
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _keys(account_type, option_type, asset):
+        """Claves de la más específica a la más general"""
+        return (
+            f"{account_type}|{option_type}|{asset}",
+            f"{account_type}|{option_type}|*",
+            f"{account_type}|*|*",
+        )
+
+    def record(self, account_type, option_type, asset, delay_seconds):
+        """Registrar el retraso observado de una orden"""
+        delay = max(0.0, float(delay_seconds))
+        with self._lock:
+            for key in self._keys(account_type, option_type, asset):
+                self._samples[key].append(round(delay, 3))
+        self.save()
+
+    @staticmethod
+    def _quantile(ordered, q):
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def thresholds(self, account_type, option_type, asset):
+        """
+        Umbrales de espera para una orden
+
+        Returns:
+            dict: first_check, async_order, balance_check, assume_loss y
+                "source" (grupo usado o "default")
+        """
+        with self._lock:
+            for key in self._keys(account_type, option_type, asset):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= self.min_samples:
+                    ordered = sorted(samples)
+                    break
+            else:
+                return dict(self.defaults, source="default")
+
+        p90 = self._quantile(ordered, 0.90)
+        p99 = self._quantile(ordered, 0.99)
+        defaults = self.defaults
+
+        # Consultar al broker cuando el 90% de las órdenes ya suele estar liquidado
+        first_check = min(defaults["first_check"], max(5.0, p90 + 2.0))
+        # El balance puede mostrar valores temporales: solo tras el peor caso observado
+        balance_check = min(defaults["balance_check"], max(first_check, self.balance_check_min, p99 * 2.0))
+        # Nunca asumir pérdida antes de que haya margen sobre el peor caso observado
+        assume_loss = min(600.0, max(60.0, p99 * 3.0, balance_check + 30.0))
+
+        return {
+            "first_check": first_check,
+            "async_order": first_check,
+            "balance_check": balance_check,
+            "assume_loss": assume_loss,
+            "source": key,
+        }
+
+    def stats(self):
+        """Cantidad de muestras y mediana por grupo"""
+        with self._lock:
+            return {
+                key: {"samples": len(samples), "p50": self._quantile(sorted(samples), 0.5)}
+                for key, samples in self._samples.items() if samples
+            }
+
+    def load(self):
+        """Cargar las muestras guardadas"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            with self._lock:
+                for key, samples in data.get("samples", {}).items():
+                    self._samples[key].extend(float(s) for s in samples)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ No se pudo cargar {self.path}: {str(e)}")
+
+    def save(self):
+        """Guardar las muestras (escritura atómica)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {"version": 1, "samples": {key: list(samples) for key, samples in self._samples.items()}}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ No se pudo guardar {self.path}: {str(e)}")
@@ -0,0 +1,241 @@
+# settlement_engine.py
+# Liquidación por eventos: resultados de órdenes empujados por el websocket del broker
+
+import inspect
+import json
+import threading
+import time
+import logging
+
+# Mensajes del broker que traen el resultado de una opción
+RESULT_MESSAGES = ("option-closed", "position-changed", "listInfoData")
+
+# Resultado del broker -> valor que entiende process_expired_order
+RESULT_ALIASES = {
+    "win": "win",
+    "loose": "loose",
+    "lose": "loose",
+    "loss": "loose",
+    "equal": "equal",
+    "tie": "equal",
+}
+
+
+def normalize_result(value):
+    if value is None:
+        return None
+    return RESULT_ALIASES.get(str(value).lower())
+
+
+def parse_result_message(message):
+    """
+    Extraer resultados de un mensaje del broker
+
+    Args:
+        message: Mensaje crudo (str JSON) o ya decodificado (dict)
+
+    Returns:
+        list: [(order_id, {"id", "win", "win_amount"}, nombre_mensaje)]
+    """
+    if isinstance(message, (str, bytes)):
+        try:
+            message = json.loads(message)
+        except (TypeError, ValueError):
+            return []
+    if not isinstance(message, dict):
+        return []
+
+    name = message.get("name")
+    if name not in RESULT_MESSAGES:
+        return []
+    msg = message.get("msg")
+
+    results = []
+    if name == "option-closed" and isinstance(msg, dict):
+        order_id = msg.get("option_id", msg.get("id"))
+        result = normalize_result(msg.get("result", msg.get("win")))
+        if order_id is not None and result:
+            win_amount = msg.get("win_amount", msg.get("profit_amount", 0))
+            results.append((order_id, {"id": order_id, "win": result, "win_amount": win_amount}, name))
+
+    elif name == "position-changed" and isinstance(msg, dict):
+        if msg.get("status") == "closed":
+            raw_event = msg.get("raw_event") or {}
+            order_id = raw_event.get("option_id", msg.get("external_id", msg.get("id")))
+            # close_reason puede ser "expired": el resultado real viene en raw_event
+            result = normalize_result(raw_event.get("result")) or normalize_result(msg.get("close_reason"))
+            if order_id is not None and result:
+                win_amount = raw_event.get("profit_amount", msg.get("close_profit", 0))
+                results.append((order_id, {"id": order_id, "win": result, "win_amount": win_amount}, name))
+
+    elif name == "listInfoData" and isinstance(msg, list):
+        for item in msg:
+            if isinstance(item, dict) and item.get("id") is not None and normalize_result(item.get("win")):
+                results.append((item["id"], item, name))
+
+    return results
+
+
+def parse_option_history(response):
+    """
+    Extraer resultados de la respuesta de get_optioninfo_v2 (historial de opciones)
+
+    Args:
+        response: {"msg": {"closed_options": [...]}} o la lista closed_options
+
+    Returns:
+        list: [(order_id, {"id", "win", "win_amount", "amount"}, "option_history")]
+    """
+    if isinstance(response, dict):
+        msg = response.get("msg", response)
+        closed_options = msg.get("closed_options", []) if isinstance(msg, dict) else []
+    elif isinstance(response, list):
+        closed_options = response
+    else:
+        return []
+
+    results = []
+    for option in closed_options:
+        if not isinstance(option, dict):
+            continue
+        order_id = option.get("id")
+        # El historial devuelve el id como lista de un elemento
+        if isinstance(order_id, (list, tuple)):
+            order_id = order_id[0] if order_id else None
+        result = normalize_result(option.get("win"))
+        if order_id is None or not result:
+            continue
+        results.append((order_id, {
+            "id": order_id,
+            "win": result,
+            "win_amount": option.get("win_amount", 0),
+            "amount": option.get("amount"),
+        }, "option_history"))
+    return results
+
+
+class SettlementEngine:
+    """
+    Escuchar los eventos de cierre del broker y publicar resultados en el índice
+
+    Se engancha al callback on_message del WebSocketApp del cliente y pide al
+    broker los eventos position-changed del balance (option-closed y
+    listInfoData llegan sin suscripción). Cada
+    resultado se guarda en el OrderResultIndex y despierta al ciclo de trading
+    (wait()) para liquidar la orden sin esperar al siguiente ciclo. Si el
+    cliente no expone el websocket, attach() devuelve False y la liquidación
+    sigue por polling.
+    """
+
+    def __init__(self, order_index, logger=None):
+        self.order_index = order_index
+        self.logger = logger or logging.getLogger(__name__)
+        self._results_ready = threading.Event()
+        self.push_results = 0
+        self.session_results = 0    # Resultados recibidos por push en la sesión actual
+        self.subscribed = False
+        self.last_result_at = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Registrar callback(order_id) que se llama al llegar cada resultado"""
+        self._listeners.append(callback)
+
+    def attach(self, client):
+        """
+        Engancharse al websocket de un cliente y suscribir position-changed
+
+        Se llama de nuevo con el cliente nuevo tras cada reconexión (el hook y
+        la suscripción pertenecen a la conexión anterior).
+
+        Returns:
+            bool: True si los resultados llegarán por push
+        """
+        try:
+            wss = client.api.websocket_client.wss
+        except AttributeError:
+            return False
+        if wss is None:
+            return False
+        if getattr(wss, "_settlement_engine_hooked", False):
+            return True
+
+        original = wss.on_message
+        # websocket-client pasa (ws, message) a funciones y solo (message) a métodos
+        original_is_method = inspect.ismethod(original)
+
+        def on_message(*args):
+            if original is not None:
+                if original_is_method:
+                    original(args[-1])
+                else:
+                    original(*args)
+            try:
+                self.handle_message(args[-1])
+            except Exception as e:
+                self.logger.debug(f"📡 Error procesando evento de cierre: {str(e)}")
+
+        wss.on_message = on_message
+        wss._settlement_engine_hooked = True
+        self.session_results = 0
+        self.subscribed = self._subscribe(client)
+        return True
+
+    def _subscribe(self, client):
+        """Suscribir portfolio.position-changed para el balance actual (stable_api)"""
+        subscribe = getattr(client, "position_change_all", None)
+        get_balance_id = getattr(client, "get_balance_id", None)
+        if not callable(subscribe) or not callable(get_balance_id):
+            return False
+        try:
+            balance_id = get_balance_id()
+            if balance_id is None:
+                return False
+            subscribe("subscribeMessage", balance_id)
+            return True
+        except Exception as e:
+            self.logger.warning(f"📡 No se pudo suscribir position-changed: {str(e)}")
+            return False
+
+    @property
+    def confirmed(self):
+        """True si ya llegaron resultados por push en la conexión actual"""
+        return self.session_results > 0
+
+    def handle_message(self, message):
+        """Procesar un mensaje del broker (thread del websocket)"""
+        results = parse_result_message(message)
+        for order_id, data, source in results:
+            self.order_index.add(order_id, data, source)
+            for callback in self._listeners:
+                callback(order_id)
+        if results:
+            self.push_results += len(results)
+            self.session_results += len(results)
+            self.last_result_at = time.time()
+            self._results_ready.set()
+        return len(results)
+
+    def ingest_option_history(self, response):
+        """
+        Indexar los resultados de una consulta de historial (liquidación por lote)
+
+        Returns:
+            int: Resultados indexados
+        """
+        results = parse_option_history(response)
+        for order_id, data, source in results:
+            self.order_index.add(order_id, data, source)
+        return len(results)
+
+    def wait(self, timeout):
+        """
+        Esperar hasta timeout segundos o hasta que llegue un resultado
+
+        Returns:
+            bool: True si llegó algún resultado
+        """
+        if self._results_ready.wait(timeout):
+            self._results_ready.clear()
+            return True
+        return False
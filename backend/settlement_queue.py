@@ -0,0 +1,138 @@
+# settlement_queue.py
+# Cola de órdenes pendientes de liquidar, ordenada por próximo intento
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class PendingSettlementQueue:
+    """
+    Órdenes abiertas con su próximo intento de liquidación y estado de backoff
+
+    Cada orden entra con su hora de expiración como primer intento. Tras un
+    intento sin resultado, reschedule() la aplaza con backoff exponencial
+    (base, 2x base, 4x base... hasta max_backoff). due() devuelve solo las
+    órdenes cuyo turno ya llegó, en orden de vencimiento. expedite() adelanta
+    una orden cuyo resultado llegó por otra vía (ej: evento del websocket).
+    """
+
+    def __init__(self, base_backoff=5.0, max_backoff=60.0):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._entries = {}          # str(order_id) -> {"asset", "order", "next_at", "attempts", "seq"}
+        self._heap = []             # (next_at, seq, clave); entradas viejas se descartan por seq
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(order_id):
+        return str(order_id)
+
+    def _push_locked(self, key, next_at):
+        entry = self._entries[key]
+        entry["next_at"] = next_at
+        entry["seq"] = next(self._seq)
+        heapq.heappush(self._heap, (next_at, entry["seq"], key))
+
+    def add(self, asset, order, next_at=None):
+        """Agregar una orden (primer intento por defecto a su expiración)"""
+        if next_at is None:
+            next_at = order["expiry_time"].timestamp()
+        key = self._key(order["id"])
+        with self._lock:
+            self._entries[key] = {"asset": asset, "order": order, "attempts": 0}
+            self._push_locked(key, next_at)
+
+    def remove(self, order_id):
+        """Quitar una orden liquidada"""
+        with self._lock:
+            self._entries.pop(self._key(order_id), None)
+
+    def due(self, now=None):
+        """
+        Órdenes cuyo próximo intento ya venció, de la más atrasada a la más reciente
+
+        Returns:
+            list: [(asset, order, attempts)]
+        """
+        now = time.time() if now is None else now
+        result = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                next_at, seq, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None or entry["seq"] != seq:
+                    continue
+                result.append((entry["asset"], entry["order"], entry["attempts"]))
+        return result
+
+    def reschedule(self, order_id, now=None, not_after=None):
+        """
+        Aplazar una orden sin resultado con backoff exponencial
+
+        Args:
+            not_after: Límite para el próximo intento (ej: umbral de espera o
+                timeout de pérdida) para no pasarlo de largo
+
+        Returns:
+            float: Segundos hasta el próximo intento (None si la orden no está)
+        """
+        now = time.time() if now is None else now
+        key = self._key(order_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            delay = min(self.max_backoff, self.base_backoff * (2 ** entry["attempts"]))
+            entry["attempts"] += 1
+            next_at = now + delay
+            if not_after is not None and now < not_after < next_at:
+                next_at = not_after
+            self._push_locked(key, next_at)
+            return next_at - now
+
+    def defer(self, order_id, next_at):
+        """Fijar el próximo intento sin contarlo como intento fallido"""
+        key = self._key(order_id)
+        with self._lock:
+            if key in self._entries:
+                self._push_locked(key, next_at)
+
+    def expedite(self, order_id):
+        """Adelantar una orden para el próximo ciclo (su resultado ya llegó)"""
+        self.defer(order_id, 0.0)
+
+    def attempts(self, order_id):
+        with self._lock:
+            entry = self._entries.get(self._key(order_id))
+            return entry["attempts"] if entry else 0
+
+    def next_due_in(self, now=None):
+        """Segundos hasta el próximo intento (None si la cola está vacía)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap:
+                next_at, seq, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is None or entry["seq"] != seq:
+                    heapq.heappop(self._heap)
+                    continue
+                return max(0.0, next_at - now)
+        return None
+
+    def rebuild(self, active_options):
+        """Reconstruir la cola desde active_options ({asset: [orders]}), ej: tras cargar estado"""
+        with self._lock:
+            self._entries.clear()
+            self._heap = []
+        for asset, orders in active_options.items():
+            for order in orders:
+                self.add(asset, order)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, order_id):
+        return self._key(order_id) in self._entries
@@ -0,0 +1,323 @@
+# state_codec.py
+# Codecs del archivo de estado: JSON (por defecto) y binario compacto
+
+import argparse
+import io
+import json
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+
+BINARY_MAGIC = b"IQSB"
+BINARY_VERSION = 1
+DATETIME_MIN_SENTINEL = "datetime.min"
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def json_default(value):
+    """Serializar fechas a ISO (datetime.min como centinela) para JSON"""
+    if isinstance(value, datetime):
+        return DATETIME_MIN_SENTINEL if value == datetime.min else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def to_datetime(value):
+    """datetime desde el valor guardado (datetime nativo, ISO o centinela)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if value == DATETIME_MIN_SENTINEL:
+        return datetime.min
+    return datetime.fromisoformat(value)
+
+
+def to_date(value):
+    """date desde el valor guardado (date/datetime nativo o ISO)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value).date()
+
+
+def normalize_state(state):
+    """
+    Convertir a tipos nativos los campos de fecha del estado (in-place)
+
+    Acepta tanto valores ya nativos (codec binario) como strings ISO (codec
+    JSON o registros del journal), así el resto del estado no depende del
+    formato del archivo.
+    """
+    if state.get("timestamp") is not None:
+        state["timestamp"] = to_datetime(state["timestamp"])
+    for orders in state.get("active_options", {}).values():
+        for order in orders:
+            order["entry_time"] = to_datetime(order["entry_time"])
+            order["expiry_time"] = to_datetime(order["expiry_time"])
+    last_signal_time = state.get("last_signal_time", {})
+    for asset, value in last_signal_time.items():
+        last_signal_time[asset] = to_datetime(value)
+    state["daily_lock_time"] = to_datetime(state.get("daily_lock_time"))
+    state["last_date"] = to_date(state.get("last_date"))
+    return state
+
+
+class StateCodec:
+    """Interfaz de un codec del archivo de estado"""
+
+    name = None
+
+    def encode(self, state):
+        """dict de estado (con datetime/date nativos) → bytes"""
+        raise NotImplementedError
+
+    def decode(self, data):
+        """bytes → dict de estado"""
+        raise NotImplementedError
+
+
+class JsonStateCodec(StateCodec):
+    """JSON legible (formato histórico de strategy_state.json)"""
+
+    name = "json"
+
+    def __init__(self, indent=4):
+        self.indent = indent
+
+    def encode(self, state):
+        return json.dumps(state, indent=self.indent, default=json_default).encode("utf-8")
+
+    def decode(self, data):
+        return json.loads(data.decode("utf-8"))
+
+
+class BinaryStateCodec(StateCodec):
+    """
+    Formato binario compacto con encabezado de versión
+
+    Encabezado: b"IQSB" + versión (uint16). Cada valor lleva un tag de un
+    byte; enteros y longitudes van como varint, fechas como enteros nativos
+    (microsegundos / días desde datetime.min, así datetime.min no necesita
+    centinela) y las listas de floats (historial RSI) como arreglos de doubles.
+    """
+
+    name = "binary"
+
+    # Tags
+    NONE, TRUE, FALSE = b"N", b"T", b"F"
+    INT, NEG_INT, FLOAT, STR = b"i", b"n", b"d", b"s"
+    LIST, FLOAT_ARRAY, DICT = b"l", b"a", b"m"
+    DATETIME, DATE = b"t", b"D"
+
+    def encode(self, state):
+        out = io.BytesIO()
+        out.write(BINARY_MAGIC)
+        out.write(struct.pack("<H", BINARY_VERSION))
+        self._write_value(out, state)
+        return out.getvalue()
+
+    def decode(self, data):
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("No es un archivo de estado binario")
+        (version,) = struct.unpack_from("<H", data, 4)
+        if version > BINARY_VERSION:
+            raise ValueError(f"Versión de estado binario no soportada: {version}")
+        value, offset = self._read_value(bytes(data), 6)
+        if offset != len(data):
+            raise ValueError("Datos sobrantes al final del estado binario")
+        return value
+
+    # --- escritura ---
+
+    @staticmethod
+    def _write_varint(out, value):
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            if value:
+                out.write(bytes((byte | 0x80,)))
+            else:
+                out.write(bytes((byte,)))
+                return
+
+    def _write_str(self, out, value):
+        raw = value.encode("utf-8")
+        self._write_varint(out, len(raw))
+        out.write(raw)
+
+    def _write_value(self, out, value):
+        if value is None:
+            out.write(self.NONE)
+        elif value is True:
+            out.write(self.TRUE)
+        elif value is False:
+            out.write(self.FALSE)
+        elif isinstance(value, int):
+            out.write(self.INT if value >= 0 else self.NEG_INT)
+            self._write_varint(out, abs(value))
+        elif isinstance(value, float):
+            out.write(self.FLOAT)
+            out.write(struct.pack("<d", value))
+        elif isinstance(value, str):
+            out.write(self.STR)
+            self._write_str(out, value)
+        elif isinstance(value, datetime):
+            if value.tzinfo is not None:
+                raise TypeError("datetime con zona horaria no soportado en el estado")
+            out.write(self.DATETIME)
+            self._write_varint(out, (value - datetime.min) // _MICROSECOND)
+        elif isinstance(value, date):
+            out.write(self.DATE)
+            self._write_varint(out, value.toordinal())
+        elif isinstance(value, dict):
+            out.write(self.DICT)
+            self._write_varint(out, len(value))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise TypeError(f"Clave no soportada en el estado: {key!r}")
+                self._write_str(out, key)
+                self._write_value(out, item)
+        elif isinstance(value, (list, tuple)):
+            if value and all(type(item) is float for item in value):
+                out.write(self.FLOAT_ARRAY)
+                self._write_varint(out, len(value))
+                packed = array("d", value)
+                if sys.byteorder != "little":
+                    packed.byteswap()
+                out.write(packed.tobytes())
+            else:
+                out.write(self.LIST)
+                self._write_varint(out, len(value))
+                for item in value:
+                    self._write_value(out, item)
+        else:
+            raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+    # --- lectura ---
+
+    @staticmethod
+    def _read_varint(data, offset):
+        byte = data[offset]
+        if byte < 0x80:
+            return byte, offset + 1
+        result = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result, offset
+            shift += 7
+
+    def _read_str(self, data, offset):
+        length, offset = self._read_varint(data, offset)
+        return data[offset:offset + length].decode("utf-8"), offset + length
+
+    def _read_value(self, data, offset):
+        tag = data[offset:offset + 1]
+        offset += 1
+        if tag == self.NONE:
+            return None, offset
+        if tag == self.TRUE:
+            return True, offset
+        if tag == self.FALSE:
+            return False, offset
+        if tag == self.INT:
+            return self._read_varint(data, offset)
+        if tag == self.NEG_INT:
+            value, offset = self._read_varint(data, offset)
+            return -value, offset
+        if tag == self.FLOAT:
+            return struct.unpack_from("<d", data, offset)[0], offset + 8
+        if tag == self.STR:
+            return self._read_str(data, offset)
+        if tag == self.DATETIME:
+            value, offset = self._read_varint(data, offset)
+            return datetime.min + value * _MICROSECOND, offset
+        if tag == self.DATE:
+            value, offset = self._read_varint(data, offset)
+            return date.fromordinal(value), offset
+        if tag == self.DICT:
+            count, offset = self._read_varint(data, offset)
+            result = {}
+            for _ in range(count):
+                key, offset = self._read_str(data, offset)
+                result[key], offset = self._read_value(data, offset)
+            return result, offset
+        if tag == self.FLOAT_ARRAY:
+            count, offset = self._read_varint(data, offset)
+            end = offset + count * 8
+            values = array("d", data[offset:end])
+            if sys.byteorder != "little":
+                values.byteswap()
+            return values.tolist(), end
+        if tag == self.LIST:
+            count, offset = self._read_varint(data, offset)
+            result = []
+            for _ in range(count):
+                item, offset = self._read_value(data, offset)
+                result.append(item)
+            return result, offset
+        raise ValueError(f"Tag desconocido en estado binario: {tag!r} (posición {offset - 1})")
+
+
+CODECS = {codec.name: codec for codec in (JsonStateCodec, BinaryStateCodec)}
+
+
+def get_codec(name):
+    """Instancia del codec por nombre ("json" o "binary")"""
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError(f"Codec de estado desconocido: {name} (opciones: {', '.join(CODECS)})")
+
+
+def detect_codec(data):
+    """Codec con el que fue escrito un archivo de estado (por su encabezado)"""
+    return BinaryStateCodec() if data[:4] == BINARY_MAGIC else JsonStateCodec()
+
+
+def decode_state(data):
+    """Decodificar un archivo de estado en cualquiera de los formatos"""
+    return detect_codec(data).decode(data)
+
+
+def migrate(source_path, target_path, codec_name):
+    """
+    Convertir un archivo de estado al formato indicado y verificar que no se pierde nada
+
+    Returns:
+        tuple: (bytes originales, bytes nuevos)
+    """
+    with open(source_path, "rb") as f:
+        source = f.read()
+    state = normalize_state(decode_state(source))
+
+    codec = get_codec(codec_name)
+    encoded = codec.encode(state)
+    if normalize_state(codec.decode(encoded)) != state:
+        raise ValueError("La conversión no es reversible, no se escribe el archivo")
+
+    with open(target_path, "wb") as f:
+        f.write(encoded)
+    return len(source), len(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertir el archivo de estado entre JSON y binario")
+    parser.add_argument("source", help="Archivo de estado de origen (JSON o binario)")
+    parser.add_argument("target", nargs="?", help="Archivo de destino (por defecto, el mismo)")
+    parser.add_argument("--to", choices=sorted(CODECS), required=True, help="Formato de destino")
+    args = parser.parse_args()
+
+    source_size, target_size = migrate(args.source, args.target or args.source, args.to)
+    print(f"✅ {args.source} → {args.target or args.source} ({args.to}): {source_size} → {target_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# state_hydration.py
+# Carga del estado en dos partes: caliente (para operar) y fría (estadísticas, historiales)
+
+import threading
+import time
+
+
+class ColdField:
+    """
+    Atributo del estado que se hidrata recién al primer acceso
+
+    Descriptor sin __set__: una vez hidratado, el valor queda en el __dict__
+    de la instancia y los accesos siguientes no pasan por acá.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        instance.state_hydrator.hydrate("access")
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+
+class StateHydrator:
+    """
+    Leer el estado en segundo plano y separar la hidratación caliente/fría
+
+    start_read() lee checkpoint + journal en un thread mientras la estrategia
+    se conecta al broker. hot_state() espera esa lectura para aplicar lo
+    necesario para operar (bloqueos, órdenes activas, stop loss). La parte
+    fría se hidrata con hydrate(): en segundo plano (start_cold) o en el
+    primer acceso a un ColdField, lo que ocurra primero.
+    """
+
+    def __init__(self, read_state, hydrate_cold, logger=None):
+        """
+        Args:
+            read_state: Callable () -> estado leído (cualquier valor)
+            hydrate_cold: Callable (cold_state) que asigna los campos fríos; debe
+                tolerar un dict vacío (estado nuevo o carga fallida)
+        """
+        self.read_state = read_state
+        self.hydrate_cold = hydrate_cold
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._read_thread = None
+        self._read_result = None
+        self._read_error = None
+        self._cold_state = {}
+        self.hydrated = False
+
+        self.read_seconds = None
+        self.cold_seconds = None
+        self.cold_trigger = None
+
+    def start_read(self):
+        """Empezar a leer el estado en segundo plano"""
+        self._read_thread = threading.Thread(target=self._read, name="state-read", daemon=True)
+        self._read_thread.start()
+
+    def _read(self):
+        started = time.perf_counter()
+        try:
+            self._read_result = self.read_state()
+        except Exception as e:
+            self._read_error = e
+        self.read_seconds = time.perf_counter() - started
+
+    def hot_state(self):
+        """Resultado de la lectura (espera si todavía no terminó; relanza su error)"""
+        if self._read_thread is None:
+            self._read()
+        else:
+            self._read_thread.join()
+        if self._read_error is not None:
+            raise self._read_error
+        return self._read_result
+
+    def set_cold_state(self, cold_state):
+        """Datos pendientes de hidratar (el dict de estado leído)"""
+        self._cold_state = cold_state or {}
+
+    def start_cold(self):
+        """Hidratar la parte fría en segundo plano"""
+        threading.Thread(target=self.hydrate, args=("background",), name="state-hydration", daemon=True).start()
+
+    def hydrate(self, trigger="access"):
+        """Hidratar la parte fría si todavía no se hizo (una sola vez)"""
+        if self.hydrated:
+            return
+        with self._lock:
+            if self.hydrated:
+                return
+            started = time.perf_counter()
+            try:
+                self.hydrate_cold(self._cold_state)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"❌ Error hidratando estado: {str(e)}")
+                self.hydrate_cold({})
+            self._cold_state = None
+            self.cold_seconds = time.perf_counter() - started
+            self.cold_trigger = trigger
+            self.hydrated = True
+
+    def metrics(self):
+        return {
+            "read_ms": self.read_seconds * 1000 if self.read_seconds is not None else None,
+            "cold_ms": self.cold_seconds * 1000 if self.cold_seconds is not None else None,
+            "cold_trigger": self.cold_trigger,
+        }
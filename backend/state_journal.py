@@ -0,0 +1,171 @@
+# state_journal.py
+# Journal de escritura anticipada (append-only) para el estado de la estrategia
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from state_codec import json_default
+
+
+class StateJournal:
+    """
+    Registrar cambios de estado como registros delta en un archivo JSONL
+
+    Cada cambio (orden abierta/liquidada, bloqueo, lectura RSI, contadores)
+    agrega una línea con un número de secuencia creciente, así una escritura
+    cuesta O(cambio) en lugar de reescribir todo el estado. Periódicamente la
+    estrategia guarda un checkpoint completo con el último seq incluido; una
+    vez en disco, compact() descarta los registros que ya no hacen falta. Al
+    cargar se aplica checkpoint + registros posteriores.
+
+    Formato de cada registro (fechas en ISO, ver state_codec.json_default):
+        seq, ts, kind: identificación del cambio
+        set: {campo: valor}                 reemplaza el campo completo
+        merge: {campo: {clave: valor}}      actualiza claves de un dict por activo
+        asset + add_order / remove_order:   agrega o quita una orden activa
+    """
+
+    def __init__(self, path, fsync=False, logger=None):
+        """
+        Args:
+            path: Archivo JSONL del journal
+            fsync: Forzar a disco en cada registro (sobrevive cortes de luz, más lento)
+        """
+        self.path = path
+        self.fsync = fsync
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._file = None
+
+        self.seq = 0
+        self.checkpoint_seq = 0   # Último seq incluido en un checkpoint
+        self.appended = 0
+        self.bytes_written = 0
+        self.compactions = 0
+
+        for record in self.records():
+            self.seq = max(self.seq, record["seq"])
+
+    @property
+    def pending(self):
+        """Registros desde el último checkpoint"""
+        return self.seq - self.checkpoint_seq
+
+    def _open_locked(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def append(self, kind, set=None, merge=None, **extra):
+        """
+        Agregar un registro delta
+
+        Returns:
+            int: seq del registro
+        """
+        with self._lock:
+            self.seq += 1
+            record = {"seq": self.seq, "ts": datetime.now().isoformat(), "kind": kind}
+            if set:
+                record["set"] = set
+            if merge:
+                record["merge"] = merge
+            record.update(extra)
+            line = json.dumps(record, separators=(",", ":"), default=json_default) + "\n"
+
+            f = self._open_locked()
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+            self.appended += 1
+            self.bytes_written += len(line)
+            return self.seq
+
+    def records(self, after_seq=0):
+        """Registros con seq > after_seq (una línea final incompleta se descarta)"""
+        if not os.path.exists(self.path):
+            return []
+        result = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if self.logger:
+                        self.logger.warning(f"⚠️ Registro incompleto en {self.path} (línea {line_number}), se descarta")
+                    continue
+                if record.get("seq", 0) > after_seq:
+                    result.append(record)
+        return result
+
+    @staticmethod
+    def apply(state, record):
+        """Aplicar un registro sobre un estado serializado (dict del checkpoint)"""
+        for name, value in record.get("set", {}).items():
+            state[name] = value
+        for name, values in record.get("merge", {}).items():
+            target = state.get(name)
+            if not isinstance(target, dict):
+                target = state[name] = {}
+            target.update(values)
+
+        asset = record.get("asset")
+        if "add_order" in record:
+            orders = state.setdefault("active_options", {}).setdefault(asset, [])
+            order_id = record["add_order"].get("id")
+            if not any(o.get("id") == order_id for o in orders):
+                orders.append(record["add_order"])
+        if "remove_order" in record:
+            orders = state.get("active_options", {}).get(asset)
+            if orders:
+                orders[:] = [o for o in orders if o.get("id") != record["remove_order"]]
+
+    def replay(self, state):
+        """
+        Aplicar al estado los registros posteriores a su checkpoint
+
+        Returns:
+            int: Cantidad de registros aplicados
+        """
+        checkpoint_seq = state.get("journal_seq", 0)
+        records = self.records(after_seq=checkpoint_seq)
+        for record in records:
+            self.apply(state, record)
+        with self._lock:
+            self.seq = max(self.seq, checkpoint_seq)
+            self.checkpoint_seq = checkpoint_seq
+        return len(records)
+
+    def mark_checkpoint(self, seq):
+        """Registrar que se tomó un checkpoint hasta seq (pending vuelve a contar desde ahí)"""
+        with self._lock:
+            self.checkpoint_seq = max(self.checkpoint_seq, seq)
+
+    def compact(self, upto_seq):
+        """Descartar los registros con seq <= upto_seq (ya incluidos en un checkpoint durable)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            keep = self.records(after_seq=upto_seq)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in keep:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.compactions += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,230 @@
+# state_snapshots.py
+# Checkpoints del estado escritos en segundo plano (tmp + fsync + rename, con generaciones)
+
+import os
+import threading
+import time
+from collections import deque
+
+from state_codec import JsonStateCodec, decode_state
+
+
+class SnapshotWriter:
+    """
+    Escribir checkpoints del estado sin bloquear el loop de trading
+
+    submit() recibe una copia ya serializable del estado (dicts/listas nuevos,
+    la estrategia no los vuelve a tocar) y retorna de inmediato. Un thread la
+    escribe en un archivo temporal, hace fsync y lo renombra atómicamente
+    sobre el archivo de estado; el checkpoint anterior pasa a ser la
+    generación .1, el de antes la .2, etc. Si llegan varios checkpoints
+    mientras uno se escribe, solo se escribe el más reciente.
+
+    Tras cada escritura durable se llama on_durable(seq) con el seq de journal
+    de la generación más vieja que se conserva: los registros hasta ese seq ya
+    no hacen falta ni siquiera para volver a una generación anterior.
+
+    Con backup_store, además, cada backup_interval segundos el checkpoint
+    recién escrito se guarda en el almacén de backups (y se aplica la retención),
+    desde el mismo thread.
+    """
+
+    def __init__(self, path, generations=3, on_durable=None, codec=None, logger=None,
+                 backup_store=None, backup_interval=3600):
+        """
+        Args:
+            path: Archivo de estado
+            generations: Checkpoints anteriores que se conservan (path.1 ... path.N)
+            on_durable: Callable (seq) tras cada checkpoint escrito en disco
+            codec: StateCodec para escribir (la lectura detecta el formato de cada archivo)
+            backup_store: BackupStore para backups periódicos del checkpoint (None = sin backups)
+            backup_interval: Segundos mínimos entre backups
+        """
+        self.path = path
+        self.codec = codec or JsonStateCodec()
+        self.generations = generations
+        self.on_durable = on_durable
+        self.logger = logger
+        self.backup_store = backup_store
+        self.backup_interval = backup_interval
+        self._last_backup = None
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stop = threading.Event()
+        self._thread = None
+        # seq de journal de cada generación conservada (la actual primero)
+        self._generation_seqs = deque(maxlen=generations + 1)
+
+        self.writes = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_size = 0
+        self.backups = 0
+
+    def generation_path(self, generation):
+        return self.path if generation == 0 else f"{self.path}.{generation}"
+
+    def load(self):
+        """
+        Cargar el checkpoint más reciente que se pueda leer
+
+        Si el archivo actual está dañado se vuelve a la generación anterior.
+
+        Returns:
+            tuple: (state dict o None, generación usada o None)
+        """
+        loaded = None
+        seqs = []
+        for generation in range(self.generations + 1):
+            path = self.generation_path(generation)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    state = decode_state(f.read())
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"❌ Checkpoint dañado {path}: {str(e)}")
+                continue
+            seqs.append(state.get("journal_seq", 0))
+            if loaded is None:
+                loaded = (state, generation)
+                if generation and self.logger:
+                    self.logger.warning(f"⚠️ Usando checkpoint anterior {path} (generación {generation})")
+
+        self._generation_seqs.clear()
+        self._generation_seqs.extend(seqs)
+        return loaded or (None, None)
+
+    def start(self):
+        """Arrancar el thread de escritura"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._write_loop, name="state-snapshots", daemon=True)
+            self._thread.start()
+
+    def submit(self, state):
+        """Encolar un checkpoint (reemplaza al pendiente si todavía no se escribió)"""
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = state
+            self._idle.clear()
+        self._wakeup.set()
+
+    def flush(self, timeout=None):
+        """Esperar a que el último checkpoint encolado esté en disco"""
+        if self._thread is None or not self._thread.is_alive():
+            self._write_pending()
+            return True
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout=None):
+        """Escribir lo pendiente y detener el thread"""
+        self.flush(timeout)
+        self._stop.set()
+        self._wakeup.set()
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._lock:
+            state, self._pending = self._pending, None
+        if state is not None:
+            self._write(state)
+        with self._lock:
+            if self._pending is None:
+                self._idle.set()
+
+    def _rotate(self):
+        """path → path.1 → path.2 ... (la más vieja se descarta)"""
+        for generation in range(self.generations, 0, -1):
+            source = self.generation_path(generation - 1)
+            if os.path.exists(source):
+                os.replace(source, self.generation_path(generation))
+
+    def _fsync_dir(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _write(self, state):
+        started = time.perf_counter()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            data = self.codec.encode(state)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if self.generations:
+                self._rotate()
+            os.replace(tmp_path, self.path)
+            self._fsync_dir()
+        except Exception as e:
+            self.failures += 1
+            if self.logger:
+                self.logger.error(f"❌ Error escribiendo checkpoint de estado: {str(e)}")
+            return
+
+        latency = time.perf_counter() - started
+        self.writes += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+        self.last_size = len(data)
+        self._generation_seqs.appendleft(state.get("journal_seq", 0))
+
+        if self.logger:
+            self.logger.debug(f"💾 Checkpoint escrito: {self.last_size / 1024:.1f} KB en {latency * 1000:.1f} ms")
+        if self.on_durable:
+            try:
+                self.on_durable(min(self._generation_seqs))
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"❌ Error compactando journal tras checkpoint: {str(e)}")
+        if self.backup_store and (self._last_backup is None
+                                  or time.monotonic() - self._last_backup >= self.backup_interval):
+            self._backup(data)
+
+    def _backup(self, data):
+        """Guardar el checkpoint en el almacén de backups y aplicar la retención"""
+        self._last_backup = time.monotonic()
+        try:
+            self.backup_store.put(data, "state", os.path.basename(self.path))
+            self.backup_store.prune()
+            self.backups += 1
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"❌ Error guardando backup del checkpoint: {str(e)}")
+
+    def metrics(self):
+        """Latencia y tamaño de las escrituras de checkpoints"""
+        return {
+            "writes": self.writes,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": (self.total_latency / self.writes * 1000) if self.writes else 0.0,
+            "max_latency_ms": self.max_latency * 1000,
+            "last_size_bytes": self.last_size,
+            "backups": self.backups,
+        }
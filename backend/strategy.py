@@ -8,24 +8,32 @@ import threading
 threading.excepthook = lambda args: None
 
 import time
-import json
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
-import logging
 import pytz
 import traceback
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
-
-from iqoptionapi.stable_api import IQ_Option
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from config import (
     IQ_EMAIL, IQ_PASSWORD, ACCOUNT_TYPE, TRADING_ASSETS, ASSET_IQ_MAPPING,
     RSI_PERIOD, OVERSOLD_LEVEL, OVERBOUGHT_LEVEL, EXPIRY_MINUTES, CANDLE_TIMEFRAME,
     ABSOLUTE_STOP_LOSS_PERCENT, MONTHLY_STOP_LOSS_PERCENT, POSITION_SIZE_PERCENT,
     MIN_POSITION_SIZE, MIN_TIME_BETWEEN_SIGNALS, MAX_CONSECUTIVE_LOSSES,
-    ALLOWED_ASSET_SUFFIXES, PRIORITY_SUFFIX, STRATEGY_MODE, LOG_LEVEL, LOG_FILE,
+    ALLOWED_ASSET_SUFFIXES, PRIORITY_SUFFIX, STRATEGY_MODE, LOG_FILE,
     API_TIMEOUT, SAVE_STATE_INTERVAL, STATE_FILE, USE_POSITION_HISTORY,
+    API_WORKERS, API_MAX_WORKERS, STUCK_CALL_WARNING_SECONDS, USE_STANDBY_CONNECTION,
+    ORDER_FAST_PATH, ORDER_ARMING_REFRESH_SECONDS, ORDER_ARMING_MAX_AGE,
+    ORDER_INDEX_MAX_ENTRIES, ORDER_INDEX_MAX_AGE_SECONDS, SETTLEMENT_PUSH_LOSS_TIMEOUT,
+    SETTLEMENT_BATCH_HISTORY_LIMIT, SETTLEMENT_BATCH_FALLBACK_SECONDS,
+    SETTLEMENT_DELAYS_FILE, SETTLEMENT_DEFAULT_WAITS, SETTLEMENT_DELAY_MIN_SAMPLES, SETTLEMENT_DELAY_MAX_SAMPLES,
+    SETTLEMENT_BALANCE_CHECK_MIN, SETTLEMENT_RETRY_BASE_SECONDS, SETTLEMENT_RETRY_MAX_SECONDS,
+    PAYOUT_REFRESH_SECONDS, PAYOUT_MAX_AGE_SECONDS, MIN_PAYOUT_PERCENT, TRADE_LEDGER_FILE,
+    RECONCILE_INTERVAL_SECONDS, RECONCILE_EVERY_N_SETTLEMENTS, RECONCILE_TOLERANCE,
+    BACKUP_STORE_DIR, BACKUP_INTERVAL_SECONDS, LOG_QUEUE_SIZE, EVENTS_FILE, EVENTS_MAX_BYTES,
+    EVENTS_BUFFER_SIZE, EVENTS_SOCKET_FILE,
+    STATE_JOURNAL_FILE, STATE_JOURNAL_FSYNC, STATE_CHECKPOINT_RECORDS, STATE_SNAPSHOT_GENERATIONS,
+    STATE_CODEC,
     POSITION_HISTORY_TIMEOUT, DEBUG_ORDER_RESULTS,
     # NUEVAS IMPORTACIONES
     get_asset_group, get_rsi_levels_for_asset, get_min_momentum_for_asset,
@@ -38,10 +46,80 @@ from config import (
     MAX_SIMULTANEOUS_TRADES
 )
 from utils import calculate_rsi, is_market_open, format_currency, calculate_win_rate, setup_logger
+from worker_pool import AbandonAwareWorkerPool
+from session_manager import SessionManager
+from order_fast_path import PreArmedOrderBook, OrderLatencyTracker
+from order_index import OrderResultIndex
+from settlement_engine import SettlementEngine
+from settlement_delays import SettlementDelayModel
+from settlement_queue import PendingSettlementQueue
+from payout_cache import PayoutCache
+from trade_ledger import TradeLedger
+from reconciliation import PnLReconciler
+from state_journal import StateJournal
+from state_snapshots import SnapshotWriter
+from state_codec import get_codec, normalize_state
+from state_hydration import StateHydrator, ColdField
+from data_dir import UserDataDir
+from log_pipeline import get_pipeline
+from event_ipc import RecentEvents, RecentEventsHandler, EventSocketServer
+from event_stream import EventStream
+from hot_log import HotLogger
+from backup_store import BackupStore
+
+# Campos del estado persistido (checkpoint + journal), en el orden del archivo
+STATE_FIELDS = (
+    "active_options", "last_signal_time", "consecutive_losses", "daily_lockouts",
+    "wins", "losses", "ties", "total_profit", "daily_profit", "monthly_profits",
+    "monthly_starting_capital", "monthly_stop_loss", "stop_loss_triggered_month",
+    "absolute_stop_loss_activated", "min_capital", "last_date", "current_month",
+    "daily_consecutive_wins", "daily_consecutive_losses", "daily_lock", "daily_lock_time",
+    "daily_lock_reason", "max_daily_consecutive", "recent_results", "day_start_balance",
+    "rsi_history",
+)
+# Secciones del estado para el seguimiento de cambios (dirty tracking)
+STATE_SECTIONS = {
+    "orders": ("active_options", "last_signal_time"),
+    "counters": (
+        "consecutive_losses", "daily_lockouts", "wins", "losses", "ties", "total_profit", "daily_profit",
+        "monthly_profits", "monthly_starting_capital", "min_capital", "last_date", "current_month",
+        "daily_consecutive_wins", "daily_consecutive_losses", "max_daily_consecutive", "recent_results",
+        "day_start_balance",
+    ),
+    "locks": (
+        "monthly_stop_loss", "stop_loss_triggered_month", "absolute_stop_loss_activated",
+        "daily_lock", "daily_lock_time", "daily_lock_reason",
+    ),
+    "histories": ("rsi_history",),
+}
+FIELD_SECTIONS = {field: section for section, fields in STATE_SECTIONS.items() for field in fields}
+# Campos que cambian al liquidar una orden (además de los contadores del activo)
+SETTLED_FIELDS = (
+    "total_profit", "daily_profit", "daily_consecutive_wins", "daily_consecutive_losses", "recent_results",
+)
+# Campos que resetea on_new_day
+NEW_DAY_FIELDS = (
+    "day_start_balance", "daily_lock", "daily_lock_time", "daily_lock_reason", "daily_consecutive_wins",
+    "daily_consecutive_losses", "recent_results", "consecutive_losses", "monthly_profits", "daily_profit",
+    "last_date",
+)
 
 class MultiAssetRSIBinaryOptionsStrategy:
+    # Campos fríos del estado: se hidratan en segundo plano tras cargar la parte
+    # caliente, o al primer acceso si se necesitan antes (ver load_state)
+    last_signal_time = ColdField()
+    consecutive_losses = ColdField()
+    daily_lockouts = ColdField()
+    rsi_history = ColdField()          # Últimas 5 lecturas por activo
+    wins = ColdField()
+    losses = ColdField()
+    ties = ColdField()                 # Contador de empates
+    monthly_profits = ColdField()
+    recent_results = ColdField()       # Solo necesitamos las últimas 2
+    
     def __init__(self, email, password, account_type="PRACTICE", selected_pairs=None, selected_crypto=None, 
-                 position_size=None, pairs_position_size=None, crypto_position_size=None, aggressiveness=None):
+                 position_size=None, pairs_position_size=None, crypto_position_size=None, aggressiveness=None,
+                 standby_connection=None, client_factory=None, data_dir=None, background_refresh=True):
         """
         Inicializar la estrategia de opciones con Algoritmo
         Adaptado de QuantConnect para IQ Option - Multi-Activos
@@ -56,9 +134,36 @@ class MultiAssetRSIBinaryOptionsStrategy:
             pairs_position_size: Tamaño de posición para pares (1-15%)
             crypto_position_size: Tamaño de posición para crypto (1-5%)
             aggressiveness: Nivel de agresividad ("conservador", "balanceado", "agresivo")
+            standby_connection: Mantener conexión de reserva (None = usar config)
+            client_factory: Callable (email, password) -> cliente IQ Option (ej: SimulatedIQOption)
+            data_dir: UserDataDir con los archivos del usuario (None = directorio actual)
+            background_refresh: Refrescar balance de órdenes pre-armadas y payouts en threads
+                propios (False = el llamador llama a refresh(), ej: replay determinista)
         """
+        # Directorio de datos del usuario (estado, journal, ledger, log)
+        self.data_dir = (data_dir or UserDataDir()).ensure()
+        
         # Configurar logger
-        self.logger = setup_logger(__name__, LOG_FILE, getattr(logging, LOG_LEVEL))
+        self.process_start_time = time.time()
+        self.startup_seconds = None  # Hasta el primer ciclo evaluado
+        self.logger = setup_logger(__name__, self.data_dir.path(LOG_FILE))
+        self.log_pipeline = get_pipeline()
+        self.hot_log = HotLogger(self.logger)  # Mensajes por activo/ciclo (formato diferido)
+        
+        # Eventos estructurados (JSONL) para consumidores: API, resumen, análisis
+        # Los más recientes (y las líneas del log) quedan además en memoria y se
+        # sirven por un socket local: la API no lee ni parsea archivos
+        self.recent_events = RecentEvents(EVENTS_BUFFER_SIZE)
+        self.recent_log_handler = RecentEventsHandler(self.recent_events)
+        if self.log_pipeline:
+            self.log_pipeline.add_handler(self.recent_log_handler)
+        self.events = EventStream(self.data_dir.path(EVENTS_FILE), queue_size=LOG_QUEUE_SIZE,
+                                  max_bytes=EVENTS_MAX_BYTES, logger=self.logger,
+                                  recent=self.recent_events).start()
+        self.error_event_handler = self.events.error_handler()
+        self.logger.addHandler(self.error_event_handler)
+        self.event_server = EventSocketServer(self.data_dir.path(EVENTS_SOCKET_FILE), self.recent_events,
+                                              logger=self.logger).start()
         self.logger.info("🎯 INICIANDO ESTRATEGIA ALGEBRA MULTI-ACTIVOS (LÓGICA INVERTIDA)")
         self.logger.info("📊 Configuración: Niveles Algebra Inversa dinámicos por grupo de activos")
         self.logger.info("⚡ LÓGICA INVERTIDA: PUT en sobreventa, CALL en sobrecompra")
@@ -165,8 +270,33 @@ class MultiAssetRSIBinaryOptionsStrategy:
         
         self.logger.info(f"📊 Timeframe: {self.candle_timeframe//60} min | Expiración: {self.expiry_minutes} min | Fuerza mínima: {self.min_strength}%")
         
+        # Journal de cambios de estado (los checkpoints completos son periódicos)
+        self.state_journal = StateJournal(self.data_dir.path(STATE_JOURNAL_FILE), fsync=STATE_JOURNAL_FSYNC, logger=self.logger)
+        
+        # Secciones del estado modificadas desde el último checkpoint
+        self.dirty_sections = set(STATE_SECTIONS)
+        self._state_sections = {}
+        self.state_writes_performed = 0
+        self.state_writes_skipped = 0
+        
+        # Checkpoints en segundo plano (tmp + fsync + rename, con generaciones para rollback)
+        # y backup deduplicado del checkpoint cada BACKUP_INTERVAL_SECONDS
+        self.backup_store = BackupStore(self.data_dir.path(BACKUP_STORE_DIR), logger=self.logger)
+        self.snapshot_writer = SnapshotWriter(
+            self.data_dir.path(STATE_FILE), generations=STATE_SNAPSHOT_GENERATIONS,
+            on_durable=self.state_journal.compact, codec=get_codec(STATE_CODEC), logger=self.logger,
+            backup_store=self.backup_store, backup_interval=BACKUP_INTERVAL_SECONDS
+        )
+        self.snapshot_writer.start()
+        
+        # Leer el estado en segundo plano mientras se conecta (ver load_state)
+        self.state_hydrator = StateHydrator(self._read_state, self._hydrate_cold_state, self.logger)
+        self.state_hydrator.start_read()
+        
         # Conexión a IQ Option
-        self._connect_to_iq_option(email, password, account_type)
+        if standby_connection is None:
+            standby_connection = USE_STANDBY_CONNECTION
+        self._connect_to_iq_option(email, password, account_type, standby_connection, client_factory)
         
         # Capital inicial y gestión de riesgo
         self.initial_capital = self.iqoption.get_balance()
@@ -192,13 +322,10 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Los niveles se obtienen dinámicamente por activo
         
         # Gestión de operaciones activas
+        # (last_signal_time, consecutive_losses, daily_lockouts y rsi_history son
+        # campos fríos: ver _hydrate_cold_state)
         self.active_options = defaultdict(list)
-        self.last_signal_time = defaultdict(lambda: datetime.min)
-        self.consecutive_losses = defaultdict(int)
-        self.daily_lockouts = defaultdict(lambda: False)
-        
-        # Historial de RSI para validación de momentum
-        self.rsi_history = defaultdict(lambda: deque(maxlen=5))  # Últimas 5 lecturas
+        self.last_signal_strength = {}  # Fuerza de la última señal válida por activo
         
         # Stop loss mensual
         self.monthly_stop_loss = False
@@ -206,13 +333,9 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.monthly_starting_capital = {}
         self.current_month = None
         
-        # Estadísticas de trading
-        self.wins = defaultdict(int)
-        self.losses = defaultdict(int)
-        self.ties = defaultdict(int)  # Contador de empates
+        # Estadísticas de trading (wins/losses/ties y monthly_profits son campos fríos)
         self.total_profit = 0.0
         self.daily_profit = 0.0
-        self.monthly_profits = defaultdict(float)
         self.last_date = None
         self.min_capital = self.initial_capital
         
@@ -228,14 +351,47 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.daily_lock_reason = None  # "wins" o "losses"
         self.max_daily_consecutive = 2  # 2 consecutivas para activar lock
         
-        # Historial de resultados recientes (para tracking global)
-        self.recent_results = deque(maxlen=2)  # Solo necesitamos las últimas 2
-        
         # Control de sistema
-        self.executor = ThreadPoolExecutor(max_workers=3)
+        self.executor = AbandonAwareWorkerPool(base_workers=API_WORKERS, max_workers=API_MAX_WORKERS)
         self.last_activity_time = time.time()
         self.start_time = time.time()
         
+        # Índice de resultados de órdenes por ID
+        self.order_index = OrderResultIndex(ORDER_INDEX_MAX_ENTRIES, ORDER_INDEX_MAX_AGE_SECONDS)
+        
+        # Liquidación por eventos de cierre del broker (polling como respaldo)
+        self.settlement = SettlementEngine(self.order_index, self.logger)
+        self.settlement_push_active = self.settlement.attach(self.iqoption)
+        if self.settlement_push_active:
+            subscribed = " (position-changed suscrito)" if self.settlement.subscribed else ""
+            self.logger.info(f"📡 Liquidación por eventos de cierre activada{subscribed}")
+        else:
+            self.logger.info("📡 Eventos de cierre no disponibles, liquidación por polling")
+        
+        # Esperas de liquidación aprendidas (reemplazan los 45/90/120s fijos)
+        self.settlement_delays = SettlementDelayModel(
+            self.data_dir.path(SETTLEMENT_DELAYS_FILE), SETTLEMENT_DEFAULT_WAITS,
+            min_samples=SETTLEMENT_DELAY_MIN_SAMPLES, max_samples=SETTLEMENT_DELAY_MAX_SAMPLES,
+            balance_check_min=SETTLEMENT_BALANCE_CHECK_MIN, logger=self.logger
+        )
+        
+        # Cola de órdenes pendientes: cada una con su próximo intento y backoff
+        self.settlement_queue = PendingSettlementQueue(SETTLEMENT_RETRY_BASE_SECONDS, SETTLEMENT_RETRY_MAX_SECONDS)
+        self.settlement.add_listener(self.settlement_queue.expedite)
+        
+        # Registro de operaciones liquidadas (SQLite)
+        self.trade_ledger = TradeLedger(self.data_dir.path(TRADE_LEDGER_FILE))
+        
+        # Conciliación periódica del P&L contra el balance del broker
+        self.reconciler = PnLReconciler(
+            self.trade_ledger,
+            fetch_balance=lambda: self.api_call_with_timeout(self.iqoption.get_balance),
+            interval_seconds=RECONCILE_INTERVAL_SECONDS,
+            every_n_settlements=RECONCILE_EVERY_N_SETTLEMENTS,
+            tolerance=RECONCILE_TOLERANCE,
+            logger=self.logger
+        )
+        
         # Cache para optimización
         self.opcode_cache = {}
         self.opcode_cache_timestamp = 0
@@ -260,6 +416,33 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Validar activos disponibles
         self.check_valid_assets()
         
+        # Órdenes pre-armadas: balance y monto listos antes de la señal
+        self.order_latency = OrderLatencyTracker()
+        self.order_book = None
+        if ORDER_FAST_PATH:
+            self.order_book = PreArmedOrderBook(
+                fetch_balance=lambda: self.api_call_with_timeout(self.iqoption.get_balance),
+                resolve_asset=self._resolve_order_asset,
+                size_for_balance=self.position_size_for_balance,
+                refresh_seconds=ORDER_ARMING_REFRESH_SECONDS,
+                max_age_seconds=ORDER_ARMING_MAX_AGE,
+                logger=self.logger
+            )
+            if background_refresh:
+                self.order_book.start(self.valid_assets)
+            else:
+                self.order_book.set_assets(self.valid_assets)
+        
+        # Payouts por activo/tipo de opción (refresco en segundo plano)
+        self.payout_cache = PayoutCache(
+            fetch_profits=lambda: self.api_call_with_timeout(self.iqoption.get_all_profit),
+            refresh_seconds=PAYOUT_REFRESH_SECONDS,
+            max_age_seconds=PAYOUT_MAX_AGE_SECONDS,
+            logger=self.logger
+        )
+        if background_refresh:
+            self.payout_cache.start()
+        
         # Mostrar configuración de grupos
         self._print_group_configuration()
         
@@ -311,22 +494,31 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.logger.info(f"  🎯 Máximo trades simultáneos: {MAX_SIMULTANEOUS_TRADES}")
         self.logger.info("=" * 60)
         
-    def _connect_to_iq_option(self, email, password, account_type):
+    def _connect_to_iq_option(self, email, password, account_type, use_standby=False, client_factory=None):
         """Conectar a IQ Option con manejo de errores"""
-        self.logger.info("🔗 Conectando a IQ Option...")
-        self.iqoption = IQ_Option(email, password)
-        login_status, login_reason = self.iqoption.connect()
-        
-        if not login_status:
-            self.logger.error(f"❌ Error al conectar: {login_reason}")
-            if "2FA" in str(login_reason).upper():
-                self.logger.info("🔑 Se requiere autenticación de dos factores (2FA)")
-            raise Exception(f"Error al conectar a IQ Option: {login_reason}")
-        
-        self.logger.info("✅ Conexión exitosa")
-        self.iqoption.change_balance(account_type)
-        balance = self.iqoption.get_balance()
-        self.logger.info(f"💰 Balance actual: {format_currency(balance)}")
+        session_kwargs = {"client_factory": client_factory} if client_factory else {}
+        self.session = SessionManager(email, password, account_type, logger=self.logger,
+                                      use_standby=use_standby, **session_kwargs)
+        self.session.add_reconnect_hook(self._on_reconnected)
+        self.session.connect()
+    
+    def _on_reconnected(self, client):
+        """Re-sincronizar datos dependientes de la sesión tras reconectar"""
+        # Los caches de activos pertenecen a la sesión anterior
+        self.opcode_cache_timestamp = 0
+        self.asset_open_status_timestamp = 0
+        if hasattr(self, 'settlement'):
+            self.settlement_push_active = self.settlement.attach(client)
+        if hasattr(self, 'payout_cache'):
+            self.payout_cache.invalidate()
+        balance = client.get_balance()
+        if balance is not None:
+            self.logger.info(f"💰 Balance tras reconexión ({self.session.account_type}): {format_currency(balance)}")
+    
+    @property
+    def iqoption(self):
+        """Cliente IQ Option de la sesión activa (cambia tras una reconexión)"""
+        return self.session.client
     
     def api_call_with_timeout(self, func, *args, timeout=API_TIMEOUT, **kwargs):
         """Ejecutar llamada API con timeout"""
@@ -336,12 +528,29 @@ class MultiAssetRSIBinaryOptionsStrategy:
             result = future.result(timeout=timeout)
             return result
         except FutureTimeoutError:
-            self.logger.error(f"⚠️ TIMEOUT: {func.__name__} tardó más de {timeout}s")
+            # La llamada sigue corriendo: liberarla para que el pool reponga capacidad
+            self.executor.abandon(future)
+            pool_stats = self.executor.stats()
+            self.logger.error(f"⚠️ TIMEOUT: {func.__name__} tardó más de {timeout}s "
+                              f"(llamadas colgadas: {pool_stats['stuck_calls']}, workers: {pool_stats['workers']})")
             return None
         except Exception as e:
             self.logger.error(f"❌ Error en {func.__name__}: {str(e)}")
             return None
     
+    def log_stuck_api_calls(self):
+        """Reportar llamadas API abandonadas que siguen colgadas"""
+        stuck = self.executor.stuck_calls()
+        if not stuck:
+            return
+        
+        pool_stats = self.executor.stats()
+        self.logger.warning(f"🧵 Llamadas API colgadas: {len(stuck)} | Workers: {pool_stats['workers']}/{self.executor.max_workers} | "
+                            f"Abandonadas: {pool_stats['total_abandoned']} | Recuperadas: {pool_stats['total_recovered']}")
+        for name, seconds in stuck:
+            if seconds >= STUCK_CALL_WARNING_SECONDS:
+                self.logger.warning(f"   {name}: colgada hace {seconds:.0f}s")
+    
     def check_valid_assets(self):
         """Verificar qué activos están disponibles para operar"""
         self.logger.info("🔍 Verificando activos disponibles...")
@@ -431,8 +640,17 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Log resumen
         self.logger.info(f"📊 Total activos disponibles: {len(self.valid_assets)}")
         
+        if getattr(self, 'order_book', None):
+            self.order_book.set_assets(self.valid_assets)
+        
         return self.valid_assets
     
+    def _resolve_order_asset(self, asset):
+        """Nombre en IQ Option y tipo de opción de un activo válido"""
+        if asset not in self.iqoption_assets or asset not in self.asset_option_types:
+            return None
+        return self.iqoption_assets[asset], self.asset_option_types[asset]
+    
     def handle_trading_error(self, asset, error_message):
         """
         Manejar errores de trading y cambiar a activo alternativo si es necesario
@@ -477,6 +695,8 @@ class MultiAssetRSIBinaryOptionsStrategy:
                             self.logger.info(f"✅ Cambiando {asset} de {current_asset} a {alt_asset} ({option_type})")
                             self.iqoption_assets[asset] = alt_asset
                             self.asset_option_types[asset] = option_type
+                            if self.order_book:
+                                self.order_book.rearm(asset)
                             return True
             
             # Si no hay alternativas, eliminar el activo temporalmente
@@ -493,6 +713,10 @@ class MultiAssetRSIBinaryOptionsStrategy:
         if current_capital is None:
             current_capital = self.initial_capital
         
+        return self.position_size_for_balance(asset, current_capital)
+    
+    def position_size_for_balance(self, asset, current_capital):
+        """Calcular tamaño de posición para un capital dado (sin llamadas a la API)"""
         # Determinar si es crypto o par
         is_crypto = False
         if asset:
@@ -557,7 +781,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
             if candles and len(candles) >= self.rsi_period:
                 rsi = calculate_rsi(candles, self.rsi_period)
                 if rsi is not None:
-                    self.logger.debug(f"📊 {asset} - Algebra Inversa({self.candle_timeframe//60}min): {rsi:.2f}")
+                    self.hot_log.debug("📊 %s - Algebra Inversa(%smin): %.2f", asset, self.candle_timeframe // 60, rsi)
                 return rsi
             
             self.logger.warning(f"⚠️ No se pudo calcular Algebra Inversa para {asset}")
@@ -567,8 +791,13 @@ class MultiAssetRSIBinaryOptionsStrategy:
             self.logger.error(f"❌ Error obteniendo Algebra Inversa para {asset}: {str(e)}")
             return None
     
-    def place_option(self, asset, direction, amount):
-        """Colocar una opción binaria con reintentos automáticos"""
+    def place_option(self, asset, direction, amount, timing=None):
+        """
+        Colocar una opción binaria con reintentos automáticos
+        
+        Args:
+            timing: dict opcional donde se guardan 'submit_ts' y 'ack_ts' del envío exitoso
+        """
         max_retries = 2
         retry_count = 0
         
@@ -577,8 +806,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 asset_name = self.iqoption_assets[asset]
                 option_type = self.asset_option_types[asset]
                 
-                self.logger.info(f"📈 Colocando {direction} en {asset} ({asset_name}), cantidad: {format_currency(amount)}")
-                
+                submit_ts = time.time()
                 status, order_id = self.api_call_with_timeout(
                     self.iqoption.buy,
                     int(amount),
@@ -586,8 +814,14 @@ class MultiAssetRSIBinaryOptionsStrategy:
                     direction.lower(),
                     self.expiry_minutes
                 )
+                ack_ts = time.time()
+                
+                self.logger.info(f"📈 {direction} en {asset} ({asset_name}), cantidad: {format_currency(amount)}")
                 
                 if status:
+                    if timing is not None:
+                        timing["submit_ts"] = submit_ts
+                        timing["ack_ts"] = ack_ts
                     self.logger.info(f"✅ Orden colocada exitosamente. ID: {order_id}")
                     return order_id
                 else:
@@ -698,16 +932,16 @@ class MultiAssetRSIBinaryOptionsStrategy:
             for i in range(min(max_candles_back, len(history)-1)):
                 if history[i] > oversold_level and history[i+1] <= oversold_level:
                     cross_found = True
-                    self.logger.debug(f"📉 {asset} - Cruce fresco detectado hace {i+1} nivel(es) dinámico(s): {history[i]:.1f} → {history[i+1]:.1f}")
+                    self.hot_log.debug("📉 %s - Cruce fresco detectado hace %s nivel(es) dinámico(s): %.1f → %.1f", asset, i+1, history[i], history[i+1])
                     break
             
             # Si el RSI actual cruza el nivel, también es válido
             if len(history) > 0 and history[-1] > oversold_level and current_rsi <= oversold_level:
                 cross_found = True
-                self.logger.debug(f"📉 {asset} - Cruce fresco ACTUAL: {history[-1]:.1f} → {current_rsi:.1f}")
+                self.hot_log.debug("📉 %s - Cruce fresco ACTUAL: %.1f → %.1f", asset, history[-1], current_rsi)
             
             if not cross_found:
-                self.logger.debug(f"⏭️ {asset} - Algebra Inversa en sobreventa pero sin cruce fresco (señal gastada)")
+                self.hot_log.debug("⏭️ %s - Algebra Inversa en sobreventa pero sin cruce fresco (señal gastada)", asset)
                 return False
             
             # Verificar tendencia con tolerancia a rebotes
@@ -719,11 +953,11 @@ class MultiAssetRSIBinaryOptionsStrategy:
                         if history[i + 1] - history[i] <= rebound_tolerance:
                             rebounds += 1
                             if rebounds > max_rebounds:
-                                self.logger.debug(f"📉 {asset} - Demasiados rebotes ({rebounds})")
+                                self.hot_log.debug("📉 %s - Demasiados rebotes (%s)", asset, rebounds)
                                 return False
                         else:
                             # Rebote grande, no es tendencia válida
-                            self.logger.debug(f"📉 {asset} - Rebote muy grande ({history[i + 1] - history[i]:.1f} puntos)")
+                            self.hot_log.debug("📉 %s - Rebote muy grande (%.1f puntos)", asset, history[i + 1] - history[i])
                             return False
             else:
                 # Modo conservador: no permitir rebotes
@@ -734,17 +968,18 @@ class MultiAssetRSIBinaryOptionsStrategy:
             # Verificar magnitud mínima del movimiento
             total_drop = history[0] - current_rsi
             if total_drop < min_momentum_points:
-                self.logger.debug(f"📉 {asset} - Caída insuficiente: {total_drop:.1f} puntos (mínimo: {min_momentum_points})")
+                self.hot_log.debug("📉 %s - Caída insuficiente: %.1f puntos (mínimo: %s)", asset, total_drop, min_momentum_points)
                 return False
             
             # Calcular fuerza de la señal
             signal_strength = self.calculate_signal_strength(asset, current_rsi, direction, history, oversold_level, 0)
             
             if signal_strength < min_strength:
-                self.logger.debug(f"📉 {asset} - Señal débil: {signal_strength:.0f}% (mínimo: {min_strength}%)")
+                self.hot_log.debug("📉 %s - Señal débil: %.0f%% (mínimo: %s%%)", asset, signal_strength, min_strength)
                 return False
             
             # Momentum válido
+            self.last_signal_strength[asset] = signal_strength
             self.logger.info(f"✅ {asset} - Momentum PUT confirmado: {history[0]:.1f} → {current_rsi:.1f}")
             self.logger.info(f"   Caída: {total_drop:.1f} puntos | Fuerza: {signal_strength:.0f}% | Cruce FRESCO ✓")
             return True
@@ -758,16 +993,16 @@ class MultiAssetRSIBinaryOptionsStrategy:
             for i in range(min(max_candles_back, len(history)-1)):
                 if history[i] < overbought_level and history[i+1] >= overbought_level:
                     cross_found = True
-                    self.logger.debug(f"📈 {asset} - Cruce fresco detectado hace {i+1} nivel(es) dinámico(s): {history[i]:.1f} → {history[i+1]:.1f}")
+                    self.hot_log.debug("📈 %s - Cruce fresco detectado hace %s nivel(es) dinámico(s): %.1f → %.1f", asset, i+1, history[i], history[i+1])
                     break
             
             # Si el RSI actual cruza el nivel, también es válido
             if len(history) > 0 and history[-1] < overbought_level and current_rsi >= overbought_level:
                 cross_found = True
-                self.logger.debug(f"📈 {asset} - Cruce fresco ACTUAL: {history[-1]:.1f} → {current_rsi:.1f}")
+                self.hot_log.debug("📈 %s - Cruce fresco ACTUAL: %.1f → %.1f", asset, history[-1], current_rsi)
             
             if not cross_found:
-                self.logger.debug(f"⏭️ {asset} - Algebra Inversa en sobrecompra pero sin cruce fresco (señal gastada)")
+                self.hot_log.debug("⏭️ %s - Algebra Inversa en sobrecompra pero sin cruce fresco (señal gastada)", asset)
                 return False
             
             # Verificar tendencia con tolerancia a rebotes
@@ -779,11 +1014,11 @@ class MultiAssetRSIBinaryOptionsStrategy:
                         if history[i] - history[i + 1] <= rebound_tolerance:
                             rebounds += 1
                             if rebounds > max_rebounds:
-                                self.logger.debug(f"📈 {asset} - Demasiados rebotes ({rebounds})")
+                                self.hot_log.debug("📈 %s - Demasiados rebotes (%s)", asset, rebounds)
                                 return False
                         else:
                             # Rebote grande, no es tendencia válida
-                            self.logger.debug(f"📈 {asset} - Rebote muy grande ({history[i] - history[i + 1]:.1f} puntos)")
+                            self.hot_log.debug("📈 %s - Rebote muy grande (%.1f puntos)", asset, history[i] - history[i + 1])
                             return False
             else:
                 # Modo conservador: no permitir rebotes
@@ -794,17 +1029,18 @@ class MultiAssetRSIBinaryOptionsStrategy:
             # Verificar magnitud mínima del movimiento
             total_rise = current_rsi - history[0]
             if total_rise < min_momentum_points:
-                self.logger.debug(f"📈 {asset} - Subida insuficiente: {total_rise:.1f} puntos (mínimo: {min_momentum_points})")
+                self.hot_log.debug("📈 %s - Subida insuficiente: %.1f puntos (mínimo: %s)", asset, total_rise, min_momentum_points)
                 return False
             
             # Calcular fuerza de la señal
             signal_strength = self.calculate_signal_strength(asset, current_rsi, direction, history, 0, overbought_level)
             
             if signal_strength < min_strength:
-                self.logger.debug(f"📈 {asset} - Señal débil: {signal_strength:.0f}% (mínimo: {min_strength}%)")
+                self.hot_log.debug("📈 %s - Señal débil: %.0f%% (mínimo: %s%%)", asset, signal_strength, min_strength)
                 return False
             
             # Momentum válido
+            self.last_signal_strength[asset] = signal_strength
             self.logger.info(f"✅ {asset} - Momentum CALL confirmado: {history[0]:.1f} → {current_rsi:.1f}")
             self.logger.info(f"   Subida: {total_rise:.1f} puntos | Fuerza: {signal_strength:.0f}% | Cruce FRESCO ✓")
             return True
@@ -821,7 +1057,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
             # Solo logear cada cierto tiempo para no llenar los logs
             if hasattr(self, '_last_max_trades_log') and time.time() - self._last_max_trades_log < 60:
                 return
-            self.logger.debug(f"⏭️ {asset} - Señal ignorada: {total_active_trades} trades activos (máximo: {MAX_SIMULTANEOUS_TRADES})")
+            self.hot_log.debug("⏭️ %s - Señal ignorada: %s trades activos (máximo: %s)", asset, total_active_trades, MAX_SIMULTANEOUS_TRADES)
             self._last_max_trades_log = time.time()
             return
         
@@ -834,6 +1070,13 @@ class MultiAssetRSIBinaryOptionsStrategy:
         if time_since_last < self.min_time_between_signals:
             return
         
+        # Saltar activos con payout bajo (dato cacheado, sin llamada de red)
+        if MIN_PAYOUT_PERCENT:
+            payout = self.get_payout_percent(asset)
+            if payout is not None and payout < MIN_PAYOUT_PERCENT:
+                self.hot_log.debug("⏭️ %s - Payout %.0f%% por debajo del mínimo (%s%%)", asset, payout, MIN_PAYOUT_PERCENT)
+                return
+        
         # Obtener RSI actual
         current_rsi = self.get_rsi(asset)
         if current_rsi is None:
@@ -853,15 +1096,19 @@ class MultiAssetRSIBinaryOptionsStrategy:
             if (all_oversold and current_rsi <= oversold_level) or \
                (all_overbought and current_rsi >= overbought_level):
                 # RSI ha estado en zona extrema por mucho tiempo, limpiar historial
-                self.logger.debug(f"🔄 {asset} - Algebra Inversa en zona extrema por mucho tiempo, limpiando historial")
+                self.hot_log.debug("🔄 %s - Algebra Inversa en zona extrema por mucho tiempo, limpiando historial", asset)
                 self.rsi_history[asset].clear()
         
         # Actualizar historial de RSI
         self.rsi_history[asset].append(current_rsi)
+        self.journal_state("rsi", asset_fields=("rsi_history",), asset=asset)
+        zone = "oversold" if current_rsi <= oversold_level else "overbought" if current_rsi >= overbought_level else None
+        self.events.emit("rsi_reading", asset=asset, rsi=current_rsi, oversold=oversold_level,
+                         overbought=overbought_level, zone=zone, history=len(self.rsi_history[asset]))
         
         # Si no tenemos suficiente historial, esperar
         if len(self.rsi_history[asset]) < 3:
-            self.logger.debug(f"📊 {asset} ({group}) - Construyendo historial Algebra Inversa: {len(self.rsi_history[asset])}/3")
+            self.hot_log.debug("📊 %s (%s) - Construyendo historial Algebra Inversa: %s/3", asset, group, len(self.rsi_history[asset]))
             return
         
         # Detectar señales con validación de momentum
@@ -873,7 +1120,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 signal = "PUT"
                 self.logger.info(f"🔴 {asset} ({group}) - Señal PUT con momentum válido (Algebra Inversa: {current_rsi:.2f} ≤ {oversold_level})")
             else:
-                self.logger.debug(f"⏭️ {asset} ({group}) - Algebra Inversa en sobreventa ({current_rsi:.2f} ≤ {oversold_level}) pero sin señal válida")
+                self.hot_log.debug("⏭️ %s (%s) - Algebra Inversa en sobreventa (%.2f ≤ %s) pero sin señal válida", asset, group, current_rsi, oversold_level)
         
         # Verificar condiciones para CALL
         elif current_rsi >= overbought_level:
@@ -881,33 +1128,67 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 signal = "CALL"
                 self.logger.info(f"🟢 {asset} ({group}) - Señal CALL con momentum válido (Algebra Inversa: {current_rsi:.2f} ≥ {overbought_level})")
             else:
-                self.logger.debug(f"⏭️ {asset} ({group}) - Algebra Inversa en sobrecompra ({current_rsi:.2f} ≥ {overbought_level}) pero sin señal válida")
+                self.hot_log.debug("⏭️ %s (%s) - Algebra Inversa en sobrecompra (%.2f ≥ %s) pero sin señal válida", asset, group, current_rsi, overbought_level)
         
         # Si hay señal válida, operar
         if signal:
+            signal_ts = time.time()
+            self.events.emit("signal", asset=asset, direction=signal, rsi=current_rsi,
+                             level=oversold_level if signal == "PUT" else overbought_level,
+                             strength=self.last_signal_strength.get(asset))
             # Log del estado de trades activos antes de abrir nueva posición
             self.logger.info(f"📊 Trades activos antes de abrir: {total_active_trades}/{MAX_SIMULTANEOUS_TRADES}")
             
-            self.create_binary_option(asset, signal, current_rsi)
+            self.create_binary_option(asset, signal, current_rsi, signal_ts)
             self.last_signal_time[asset] = datetime.now()
             # Limpiar historial después de operar para esperar nueva tendencia
             self.rsi_history[asset].clear()
+            self.journal_state("signal", asset_fields=("last_signal_time", "rsi_history"), asset=asset)
+    
+    def get_payout_percent(self, asset, order=None):
+        """Payout (%) cacheado del activo, o None si no hay dato"""
+        asset_name = self.iqoption_assets.get(asset)
+        option_type = (order or {}).get("option_type") or self.asset_option_types.get(asset)
+        if not asset_name or not option_type:
+            return None
+        return self.payout_cache.get(asset_name, option_type)
     
-    def create_binary_option(self, asset, direction, rsi_value):
+    def create_binary_option(self, asset, direction, rsi_value, signal_ts=None):
         """Crear una opción binaria"""
-        # Calcular tamaño de posición específico para el activo
-        bet_size = self.calculate_position_size(asset)
+        if signal_ts is None:
+            signal_ts = time.time()
+        
+        # Camino rápido: balance y monto ya calculados en segundo plano
+        ticket = self.order_book.ticket(asset) if self.order_book else None
+        if ticket is not None:
+            bet_size = ticket.amount
+            current_balance = ticket.balance
+        else:
+            # Calcular tamaño de posición específico para el activo
+            bet_size = self.calculate_position_size(asset)
+            
+            # Verificar capital disponible
+            current_balance = self.api_call_with_timeout(self.iqoption.get_balance)
         
-        # Verificar capital disponible
-        current_balance = self.api_call_with_timeout(self.iqoption.get_balance)
         if current_balance is None or current_balance < bet_size:
             self.logger.warning(f"⚠️ Capital insuficiente para {asset}")
             return
         
         # Colocar orden
-        order_id = self.place_option(asset, direction, bet_size)
+        timing = {}
+        order_id = self.place_option(asset, direction, bet_size, timing)
         
         if order_id:
+            if self.order_book:
+                self.order_book.consume(bet_size)
+            
+            submit_ts = timing.get("submit_ts", signal_ts)
+            ack_ts = timing.get("ack_ts", submit_ts)
+            self.order_latency.record(order_id, signal_ts, submit_ts, ack_ts)
+            self.logger.info(f"⚡ Latencia señal→envío: {(submit_ts - signal_ts) * 1000:.0f}ms | "
+                             f"envío→confirmación: {(ack_ts - submit_ts) * 1000:.0f}ms "
+                             f"({'pre-armada' if ticket else 'normal'})")
+            
             # Registrar orden activa
             order_info = {
                 "id": order_id,
@@ -918,69 +1199,181 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 "expiry_time": datetime.now() + timedelta(minutes=self.expiry_minutes),
                 "rsi": rsi_value,
                 "balance_before": current_balance,  # Guardar balance antes
-                "asset_group": get_asset_group(asset)  # Guardar grupo del activo
+                "asset_group": get_asset_group(asset),  # Guardar grupo del activo
+                "option_type": self.asset_option_types.get(asset, "turbo"),
+                "strength": self.last_signal_strength.pop(asset, None),
+                "signal_ts": signal_ts,
+                "submit_ts": submit_ts,
+                "ack_ts": ack_ts
             }
             self.active_options[asset].append(order_info)
+            self.settlement_queue.add(asset, order_info)
+            self.journal_state("order_opened", asset=asset, add_order=dict(order_info))
+            self.events.emit("order_placed", asset=asset, order_id=order_id, direction=direction, size=bet_size,
+                             rsi=rsi_value, strength=order_info["strength"], balance=current_balance,
+                             expiry_ts=order_info["expiry_time"].timestamp(),
+                             signal_to_submit_ms=(submit_ts - signal_ts) * 1000,
+                             submit_to_ack_ms=(ack_ts - submit_ts) * 1000)
             
             # Log del total de trades activos después de abrir
             total_active_trades = sum(len(trades) for trades in self.active_options.values())
             self.logger.info(f"📝 Orden registrada para {asset} - Total trades activos: {total_active_trades}/{MAX_SIMULTANEOUS_TRADES}")
     
     def check_active_orders(self):
-        """Verificar el estado de las órdenes activas"""
-        current_time = datetime.now()
+        """Verificar el estado de las órdenes activas (solo las que tienen su turno vencido)"""
+        now = time.time()
+        
+        # Reunir las órdenes cuyo próximo intento ya venció
+        due_orders = []
+        for asset, order, attempts in self.settlement_queue.due(now):
+            expiry_ts = order["expiry_time"].timestamp()
+            first_check_at = expiry_ts + self.settlement_thresholds(asset, order)["first_check"]
+            
+            # Antes de la espera aprendida solo se revisan resultados ya recibidos
+            if now <= first_check_at and not self.has_local_result(order):
+                self.settlement_queue.defer(order['id'], min(now + SETTLEMENT_RETRY_BASE_SECONDS, first_check_at))
+                continue
+            due_orders.append((asset, order, attempts))
+        
+        if not due_orders:
+            return
         
-        for asset in list(self.active_options.keys()):
-            remaining_orders = []
-            
-            for order in self.active_options[asset]:
-                # Calcular tiempo desde expiración
-                time_since_expiry = (current_time - order["expiry_time"]).total_seconds()
-                
-                # Si la orden expiró hace más de 15 segundos, procesarla
-                if time_since_expiry > 45:
-                    self.process_expired_order(asset, order)
-                # Si expiró pero es muy reciente, esperar un poco más
-                elif order["expiry_time"] <= current_time:
-                    self.logger.debug(f"⏳ Orden {order['id']} expiró hace {time_since_expiry:.0f}s, esperando...")
-                    remaining_orders.append(order)
-                else:
-                    remaining_orders.append(order)
-            
+        # Una sola consulta de historial para todo el lote
+        batch_mode = self.fetch_settlement_batch([(asset, order) for asset, order, _ in due_orders])
+        
+        settled = 0
+        for asset, order, attempts in due_orders:
+            if not self.process_expired_order(asset, order, batch_mode=batch_mode, attempt=attempts):
+                # Sin resultado todavía: backoff hasta el próximo umbral
+                self.settlement_queue.reschedule(order['id'], now, not_after=self._next_settlement_boundary(asset, order, now))
+                continue
+            settled += 1
+            self.settlement_queue.remove(order['id'])
+            remaining_orders = [o for o in self.active_options[asset] if o['id'] != order['id']]
             if remaining_orders:
                 self.active_options[asset] = remaining_orders
             else:
                 del self.active_options[asset]
-    
-    def verify_and_recalculate_daily_profit(self):
-        """Verificar y recalcular el profit diario basado en el balance real"""
-        current_balance = self.api_call_with_timeout(self.iqoption.get_balance)
-        if current_balance is None:
+        
+        if not settled:
             return
         
-        # Calcular el profit real del día
-        real_daily_profit = current_balance - self.day_start_balance
+        if self.order_book:
+            self.order_book.invalidate()
+    
+    def _next_settlement_boundary(self, asset, order, now):
+        """Próximo umbral (balance, get_async_order, pérdida) para no pasarlo de largo con el backoff"""
+        expiry_ts = order["expiry_time"].timestamp()
+        thresholds = self.settlement_thresholds(asset, order)
+        boundaries = [
+            expiry_ts + thresholds["async_order"],
+            expiry_ts + thresholds["balance_check"],
+            expiry_ts + SETTLEMENT_BATCH_FALLBACK_SECONDS,
+            expiry_ts + self.settlement_loss_timeout(thresholds),
+        ]
+        upcoming = [b + 0.5 for b in boundaries if b + 0.5 > now]
+        return min(upcoming) if upcoming else None
+    
+    def settlement_loss_timeout(self, thresholds):
+        """Segundos sin resultado antes de asumir pérdida"""
+        # Se espera más solo si en esta conexión ya llegaron eventos de cierre: con
+        # el hook instalado pero sin eventos, un push faltante bloquearía el cupo de trades
+        if self.settlement_push_active and self.settlement.confirmed:
+            return max(thresholds["assume_loss"], SETTLEMENT_PUSH_LOSS_TIMEOUT)
+        return thresholds["assume_loss"]
+    
+    def settlement_thresholds(self, asset, order):
+        """Umbrales de espera (segundos desde la expiración) para una orden"""
+        option_type = order.get("option_type") or self.asset_option_types.get(asset, "turbo")
+        return self.settlement_delays.thresholds(self.session.account_type, option_type, asset)
+    
+    def has_local_result(self, order):
+        """Verificar si el resultado ya llegó (evento, listinfodata u order_binary) sin consultar al broker"""
+        self.order_index.ingest_listinfodata(getattr(self.iqoption.api, 'listinfodata', None))
+        if self.order_index.get(order['id']) is not None:
+            return True
+        order_binary = getattr(self.iqoption.api, 'order_binary', None) or {}
+        order_data = order_binary.get(order['id'])
+        return isinstance(order_data, dict) and 'result' in order_data
+    
+    def _record_settlement_delay(self, asset, order, observed_at):
+        """Registrar cuánto tardó el resultado en aparecer tras la expiración"""
+        delay = observed_at - order["expiry_time"].timestamp()
+        option_type = order.get("option_type") or self.asset_option_types.get(asset, "turbo")
+        self.settlement_delays.record(self.session.account_type, option_type, asset, delay)
+    
+    def fetch_settlement_batch(self, due_orders):
+        """
+        Consultar el historial de opciones una vez para todas las órdenes pendientes
+        
+        Args:
+            due_orders: Lista de (asset, order) listas para liquidar
+        
+        Returns:
+            bool: True si el lote está cubierto (sin consultas individuales por orden)
+        """
+        if not USE_POSITION_HISTORY:
+            return False
+        
+        order_binary = getattr(self.iqoption.api, 'order_binary', None) or {}
+        missing = [order for _, order in due_orders
+                   if self.order_index.get(order['id']) is None and order['id'] not in order_binary]
+        if not missing:
+            return True
+        
+        if not hasattr(self.iqoption, 'get_optioninfo_v2'):
+            return False
+        
+        limit = max(SETTLEMENT_BATCH_HISTORY_LIMIT, len(missing) * 2)
+        history = self.api_call_with_timeout(
+            self.iqoption.get_optioninfo_v2,
+            limit,
+            timeout=POSITION_HISTORY_TIMEOUT
+        )
+        if history is None:
+            self.logger.debug("📚 Historial de opciones no disponible, liquidación orden por orden")
+            return False
         
-        # Si hay discrepancia significativa, ajustar
-        if abs(real_daily_profit - self.daily_profit) > 1.0:
-            self.logger.warning(f"⚠️ Discrepancia detectada en profit diario")
-            self.logger.warning(f"   Calculado: ${self.daily_profit:,.2f}")
-            self.logger.warning(f"   Real: ${real_daily_profit:,.2f}")
-            self.logger.warning(f"   Ajustando al valor real...")
-            self.daily_profit = real_daily_profit
+        indexed = self.settlement.ingest_option_history(history)
+        self.logger.debug(f"📚 Historial de opciones: {indexed} resultados para {len(missing)} órdenes pendientes")
+        return True
+    
+    def reconcile_pnl(self):
+        """Conciliar el P&L del día contra el balance real (una llamada, sin sobrescribir contadores)"""
+        now = datetime.now()
+        # Órdenes ya expiradas pero sin liquidar distorsionan el balance: conciliar después
+        if any(order["expiry_time"] <= now for orders in self.active_options.values() for order in orders):
+            return None
+        open_exposure = sum(order["size"] for orders in self.active_options.values() for order in orders)
+        return self.reconciler.reconcile(self.day_start_balance, self.daily_profit, open_exposure)
     
-    def process_expired_order(self, asset, order):
-        """Procesar una orden expirada - VERSIÓN CORREGIDA"""
+    def process_expired_order(self, asset, order, batch_mode=False, attempt=0):
+        """
+        Procesar una orden expirada - VERSIÓN CORREGIDA
+        
+        Args:
+            batch_mode: El resultado se buscó en la consulta de historial del lote;
+                no se consulta balance/orden individual (salvo órdenes muy atrasadas)
+                ni se verifica el balance por orden
+            attempt: Intentos previos sin resultado (a partir del segundo se loguea en DEBUG)
+        
+        Returns:
+            bool: True si la orden quedó liquidada
+        """
+        # Solo el primer intento se loguea en INFO para no repetir líneas mientras se espera
+        log_attempt = self.logger.info if attempt == 0 else self.logger.debug
         try:
-            self.logger.info(f"🔄 Verificando orden {order['id']}...")
+            log_attempt(f"🔄 Verificando orden {order['id']}" + (f" (intento {attempt + 1})..." if attempt else "..."))
             
             # Verificar tiempo desde expiración
             time_since_expiry = (datetime.now() - order["expiry_time"]).total_seconds()
             
-            # Si es muy reciente, esperar
-            if time_since_expiry < 45:
-                self.logger.info(f"⏳ Orden muy reciente ({time_since_expiry:.0f}s), esperando...")
-                return
+            thresholds = self.settlement_thresholds(asset, order)
+            
+            # Si es muy reciente y el resultado aún no llegó, esperar
+            if time_since_expiry < thresholds["first_check"] and not self.has_local_result(order):
+                log_attempt(f"⏳ Orden muy reciente ({time_since_expiry:.0f}s), esperando...")
+                return False
             
             # Variables para resultado
             result_found = False
@@ -996,7 +1389,11 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 # Leer el resultado directamente
                 if 'result' in order_data:
                     result = order_data['result'].lower()
-                    profit_percent = order_data.get('profit_percent', 85)
+                    profit_percent = order_data.get('profit_percent') or self.get_payout_percent(asset, order) or 85
+                    
+                    if result in ('win', 'loose', 'equal'):
+                        pushed = self.order_index.get(order['id'])
+                        self._record_settlement_delay(asset, order, pushed["received_at"] if pushed else time.time())
                     
                     if result == 'win':
                         win_status = 'win'
@@ -1015,42 +1412,41 @@ class MultiAssetRSIBinaryOptionsStrategy:
                         result_found = True
                         self.logger.info(f"   Result: EQUAL")
             
-            # MÉTODO 2: Verificar en api.listinfodata
-            if not result_found and hasattr(self.iqoption.api, 'listinfodata') and isinstance(self.iqoption.api.listinfodata, dict):
-                self.logger.debug("📋 Buscando en listinfodata...")
-                for key, value in self.iqoption.api.listinfodata.items():
-                    if isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, dict) and str(item.get('id')) == str(order['id']):
-                                result_found = True
-                                win_status = str(item.get('win', '')).lower()
-                                win_amount_raw = float(item.get('win_amount', 0))
-                                
-                                # Determinar si win_amount incluye la inversión
-                                if win_status == 'win' and win_amount_raw > order["size"]:
-                                    # win_amount incluye la inversión
-                                    win_amount = win_amount_raw - order["size"]
-                                else:
-                                    # win_amount es solo la ganancia
-                                    win_amount = win_amount_raw
-                                
-                                self.logger.info(f"📋 Orden encontrada en listinfodata:")
-                                self.logger.info(f"   Win: {win_status}")
-                                self.logger.info(f"   Win Amount: {win_amount_raw}")
-                                break
-                    if result_found:
-                        break
+            # MÉTODO 2: Verificar en el índice de resultados (alimentado por api.listinfodata)
+            if not result_found:
+                self.order_index.ingest_listinfodata(getattr(self.iqoption.api, 'listinfodata', None))
+                indexed = self.order_index.get(order['id'])
+                if indexed:
+                    item = indexed["data"]
+                    result_found = True
+                    if indexed["source"] != "option_history":
+                        # El historial se consulta tras la espera: su hora no mide el retraso real
+                        self._record_settlement_delay(asset, order, indexed["received_at"])
+                    win_status = str(item.get('win', '')).lower()
+                    win_amount_raw = float(item.get('win_amount', 0))
+                    
+                    # Determinar si win_amount incluye la inversión
+                    if win_status == 'win' and win_amount_raw > order["size"]:
+                        # win_amount incluye la inversión
+                        win_amount = win_amount_raw - order["size"]
+                    else:
+                        # win_amount es solo la ganancia
+                        win_amount = win_amount_raw
+                    
+                    self.logger.info(f"📋 Orden encontrada en {indexed['source']}:")
+                    self.logger.info(f"   Win: {win_status}")
+                    self.logger.info(f"   Win Amount: {win_amount_raw}")
             
             # MÉTODO 3: Verificar por balance (para cuentas REAL)
-            if not result_found and 'balance_before' in order and time_since_expiry > 90:  # Solo después de 90s
+            if not result_found and not batch_mode and 'balance_before' in order and time_since_expiry > thresholds["balance_check"]:
                 current_balance = self.api_call_with_timeout(self.iqoption.get_balance)
                 if current_balance is not None:
                     balance_diff = current_balance - order['balance_before']
                     
-                    self.logger.info(f"📊 Verificación por balance:")
-                    self.logger.info(f"   Balance antes: ${order['balance_before']:,.2f}")
-                    self.logger.info(f"   Balance ahora: ${current_balance:,.2f}")
-                    self.logger.info(f"   Diferencia: ${balance_diff:+,.2f}")
+                    log_attempt(f"📊 Verificación por balance:")
+                    log_attempt(f"   Balance antes: ${order['balance_before']:,.2f}")
+                    log_attempt(f"   Balance ahora: ${current_balance:,.2f}")
+                    log_attempt(f"   Diferencia: ${balance_diff:+,.2f}")
                     
                     # Solo usar balance si hay cambio significativo
                     if abs(balance_diff) > 0.1:
@@ -1064,8 +1460,9 @@ class MultiAssetRSIBinaryOptionsStrategy:
                             result_found = True
             
             # MÉTODO 4: Intentar get_async_order como último recurso
-            if not result_found and time_since_expiry > 20:
-                self.logger.info("📋 Intentando get_async_order...")
+            per_order_allowed = not batch_mode or time_since_expiry > SETTLEMENT_BATCH_FALLBACK_SECONDS
+            if not result_found and per_order_allowed and time_since_expiry > thresholds["async_order"]:
+                log_attempt("📋 Intentando get_async_order...")
                 order_result = self.api_call_with_timeout(
                     self.iqoption.get_async_order,
                     order["id"],
@@ -1075,11 +1472,12 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 if order_result and isinstance(order_result, dict):
                     # Procesar con la lógica original
                     self._process_order_result(asset, order, order_result)
-                    return
+                    return True
             
             # Procesar resultado si se encontró
             if result_found and win_status:
                 bet_size = order["size"]
+                self.order_index.pop(order['id'])
                 
                 if win_status == 'win':
                     self.logger.info(f"✅ Victoria detectada")
@@ -1099,21 +1497,24 @@ class MultiAssetRSIBinaryOptionsStrategy:
                     else:
                         self.process_loss(asset, order)
                 
-                # Verificar y ajustar profit diario después de procesar
-                self.verify_and_recalculate_daily_profit()
-                return
+                return True
             
-            # Si han pasado más de 2 minutos y no hay resultado, asumir pérdida
-            if time_since_expiry > 120:
+            # Si no hay resultado tras el timeout, asumir pérdida
+            loss_timeout = self.settlement_loss_timeout(thresholds)
+            if time_since_expiry > loss_timeout:
                 self.logger.error(f"❌ No se pudo verificar orden después de {time_since_expiry:.0f}s")
                 self.logger.error(f"❌ Asumiendo pérdida por timeout")
                 self.process_loss(asset, order)
+                return True
+            
+            return False
                 
         except Exception as e:
             self.logger.error(f"❌ Error procesando orden expirada: {str(e)}")
             self.logger.error(f"Detalles: {traceback.format_exc()}")
             # En caso de error, registrar como pérdida para ser conservadores
             self.process_loss(asset, order)
+            return True
     
     def _process_order_result(self, asset, order, order_result):
         """Procesar resultado de orden desde get_async_order"""
@@ -1144,8 +1545,9 @@ class MultiAssetRSIBinaryOptionsStrategy:
                 elif "profit_amount" in order_result:
                     win_amount = float(order_result["profit_amount"])
                 else:
-                    # Asumir 80% payout
-                    win_amount = bet_size * 0.80
+                    # Payout cacheado del activo (80% si no hay dato)
+                    payout_percent = self.get_payout_percent(asset, order) or 80
+                    win_amount = bet_size * (payout_percent / 100)
                     
             elif win_status == "equal":
                 is_tie = True
@@ -1175,6 +1577,21 @@ class MultiAssetRSIBinaryOptionsStrategy:
         else:
             self.process_loss(asset, order)
     
+    def record_trade(self, asset, order, result, profit):
+        """Registrar la orden liquidada en el ledger de operaciones"""
+        if result == "win" and order["size"]:
+            payout_percent = profit / order["size"] * 100
+        else:
+            payout_percent = self.get_payout_percent(asset, order)
+        self.reconciler.note_settlement()
+        self.events.emit("order_settled", asset=asset, order_id=order["id"], direction=order["type"],
+                         size=order["size"], result=result, profit=profit, payout_percent=payout_percent)
+        try:
+            self.trade_ledger.record_trade(order, asset, result, profit, payout_percent,
+                                           account_type=self.session.account_type)
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo registrar la operación {order['id']} en el ledger: {str(e)}")
+    
     def process_win(self, asset, order, win_amount):
         """Procesar una operación ganadora - VERSIÓN CON LÓGICA 2 CONSECUTIVAS"""
         # win_amount ahora es SOLO la ganancia neta (no incluye la inversión)
@@ -1186,6 +1603,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.logger.info(f"✅ {asset} ({group}) - {order['type']} GANADA! Beneficio: {format_currency(profit)}")
         self.logger.info(f"📊 Trades activos restantes: {total_active_trades - 1}/{MAX_SIMULTANEOUS_TRADES}")
         
+        self.record_trade(asset, order, "win", profit)
         self.wins[asset] += 1
         self.total_profit += profit
         self.daily_profit += profit
@@ -1198,6 +1616,11 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Agregar al historial reciente
         self.recent_results.append('win')
         
+        self.journal_state(
+            "order_settled", fields=SETTLED_FIELDS, asset_fields=("wins", "consecutive_losses"),
+            asset=asset, remove_order=order["id"], result="win"
+        )
+        
         self.logger.info(f"📊 Victorias consecutivas del día: {self.daily_consecutive_wins}/{self.max_daily_consecutive}")
         
         # Verificar si alcanzamos el límite
@@ -1214,7 +1637,9 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.logger.info(f"📊 Trades activos restantes: {total_active_trades - 1}/{MAX_SIMULTANEOUS_TRADES}")
         
         # En un empate no se cuentan pérdidas ni victorias consecutivas
+        self.record_trade(asset, order, "tie", 0.0)
         self.ties[asset] += 1
+        self.journal_state("order_settled", asset_fields=("ties",), asset=asset, remove_order=order["id"], result="tie")
         # Los empates NO afectan las consecutivas ni agregan al historial
         # Solo registramos para estadísticas
     
@@ -1228,6 +1653,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.logger.info(f"❌ {asset} ({group}) - {order['type']} PERDIDA. Pérdida: {format_currency(loss)}")
         self.logger.info(f"📊 Trades activos restantes: {total_active_trades - 1}/{MAX_SIMULTANEOUS_TRADES}")
         
+        self.record_trade(asset, order, "loss", -loss)
         self.losses[asset] += 1
         self.total_profit -= loss
         self.daily_profit -= loss
@@ -1240,24 +1666,29 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Agregar al historial reciente
         self.recent_results.append('loss')
         
+        self.journal_state(
+            "order_settled", fields=SETTLED_FIELDS, asset_fields=("losses", "consecutive_losses"),
+            asset=asset, remove_order=order["id"], result="loss"
+        )
+        
         self.logger.info(f"📊 {asset} - Pérdidas consecutivas: {self.consecutive_losses[asset]}")
         self.logger.info(f"📊 Pérdidas consecutivas del día: {self.daily_consecutive_losses}/{self.max_daily_consecutive}")
         
         # Verificar si alcanzamos el límite
         if self.daily_consecutive_losses >= self.max_daily_consecutive and not self.daily_lock:
             self.activate_daily_lock("losses")
-        
-        # Guardar estado después de cada pérdida
-        self.save_state()
     
     def activate_daily_lock(self, reason):
         """Activar el bloqueo diario por 2 consecutivas"""
         self.daily_lock = True
         self.daily_lock_time = datetime.now()
         self.daily_lock_reason = reason
+        self.journal_state("lock", fields=("daily_lock", "daily_lock_time", "daily_lock_reason"))
         
         # Obtener balance actual para mostrar
         current_balance = self.api_call_with_timeout(self.iqoption.get_balance)
+        self.events.emit("lock", reason=reason, daily_profit=self.daily_profit, balance=current_balance,
+                         consecutive=self.daily_consecutive_wins if reason == "wins" else self.daily_consecutive_losses)
         
         self.logger.info("=" * 60)
         if reason == "wins":
@@ -1285,7 +1716,6 @@ class MultiAssetRSIBinaryOptionsStrategy:
                     self.logger.info(f"🔒 Trading pausado - {self.daily_consecutive_wins} victorias consecutivas")
                 else:
                     self.logger.info(f"🔒 Trading pausado - {self.daily_consecutive_losses} pérdidas consecutivas")
-            time.sleep(15)
             return True
         
         # No hacer check si hay posiciones abiertas
@@ -1303,12 +1733,16 @@ class MultiAssetRSIBinaryOptionsStrategy:
         # Actualizar capital mínimo
         if current_capital < self.min_capital:
             self.min_capital = current_capital
+            self.journal_state("stop_loss", fields=("min_capital",))
             loss_percent = ((self.initial_capital - self.min_capital) / self.initial_capital) * 100
             self.logger.info(f"📉 Nuevo mínimo: {format_currency(self.min_capital)} ({loss_percent:.2f}% pérdida)")
         
         # Stop loss absoluto
         if current_capital <= self.absolute_stop_loss_threshold and not self.absolute_stop_loss_activated:
             self.absolute_stop_loss_activated = True
+            self.journal_state("stop_loss", fields=("absolute_stop_loss_activated",))
+            self.events.emit("stop_loss", kind="absolute", capital=current_capital,
+                             threshold=self.absolute_stop_loss_threshold)
             self.logger.critical("🚨 STOP LOSS ABSOLUTO ACTIVADO!")
             self.logger.critical(f"Capital: {format_currency(current_capital)} (75% de pérdida)")
             return False
@@ -1331,6 +1765,8 @@ class MultiAssetRSIBinaryOptionsStrategy:
         if current_capital <= monthly_threshold and not self.monthly_stop_loss:
             self.monthly_stop_loss = True
             self.stop_loss_triggered_month = current_month
+            self.journal_state("stop_loss", fields=("monthly_stop_loss", "stop_loss_triggered_month"))
+            self.events.emit("stop_loss", kind="monthly", capital=current_capital, threshold=monthly_threshold)
             self.logger.critical("🚨 STOP LOSS MENSUAL ACTIVADO!")
             self.logger.critical(f"Pérdida del mes: 40%")
             return False
@@ -1374,6 +1810,7 @@ class MultiAssetRSIBinaryOptionsStrategy:
         
         self.daily_profit = 0
         self.last_date = datetime.now().date()
+        self.journal_state("new_day", fields=NEW_DAY_FIELDS)
         self.logger.info("✅ Variables diarias reseteadas")
     
     def on_new_month(self, new_month, current_capital):
@@ -1387,77 +1824,126 @@ class MultiAssetRSIBinaryOptionsStrategy:
             self.monthly_stop_loss = False
             self.stop_loss_triggered_month = None
             self.logger.info("✅ Stop loss mensual reseteado")
+        
+        self.journal_state("new_month", fields=(
+            "monthly_starting_capital", "current_month", "monthly_stop_loss", "stop_loss_triggered_month"
+        ))
+    
+    def _state_field(self, name, keys=None):
+        """
+        Copia de un campo del estado para persistir (solo las claves indicadas si keys)
+        
+        Las fechas quedan como datetime/date nativos: cada codec decide cómo
+        guardarlas (ver state_codec).
+        """
+        value = getattr(self, name)
+        if keys is not None:
+            value = {key: value[key] for key in keys if key in value}
+        
+        if name == "active_options":
+            return {asset: [dict(order) for order in orders] for asset, orders in value.items()}
+        if name == "rsi_history":
+            return {asset: list(history) for asset, history in value.items()}
+        if isinstance(value, deque):
+            return list(value)
+        if isinstance(value, dict):
+            return dict(value)
+        return value
+    
+    def journal_state(self, kind, fields=(), asset_fields=(), asset=None, **extra):
+        """
+        Registrar un cambio de estado en el journal
+        
+        Args:
+            kind: Tipo de cambio (order_opened, order_settled, lock, rsi...)
+            fields: Campos que se guardan completos
+            asset_fields: Campos por activo de los que solo cambió la clave de asset
+        """
+        self.mark_state_dirty(*fields, *asset_fields)
+        if "add_order" in extra or "remove_order" in extra:
+            self.mark_state_dirty("active_options")
+        if asset is not None:
+            extra["asset"] = asset
+        try:
+            self.state_journal.append(
+                kind,
+                set={name: self._state_field(name) for name in fields},
+                merge={name: self._state_field(name, keys=(asset,)) for name in asset_fields},
+                **extra
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Error escribiendo journal de estado: {str(e)}")
+    
+    def mark_state_dirty(self, *fields):
+        """Marcar como modificadas las secciones de estos campos"""
+        for name in fields:
+            self.dirty_sections.add(FIELD_SECTIONS[name])
     
     def save_state(self):
-        """Guardar estado actual de la estrategia"""
+        """Encolar un checkpoint del estado si algo cambió (se escribe en segundo plano)"""
+        if not self.dirty_sections:
+            self.state_writes_skipped += 1
+            return
+        
         try:
+            # Solo se vuelven a serializar las secciones modificadas; las demás se
+            # reutilizan del checkpoint anterior (nunca se mutan, el thread de escritura
+            # puede leerlas sin compartir estructuras con el loop). Tras reiniciar sobre
+            # un checkpoint vigente el cache está vacío: esas secciones se serializan
+            # una vez en el primer checkpoint
+            dirty = set(self.dirty_sections)
+            for section in dirty | (STATE_SECTIONS.keys() - self._state_sections.keys()):
+                self._state_sections[section] = {name: self._state_field(name) for name in STATE_SECTIONS[section]}
+            fields = {}
+            for section_fields in self._state_sections.values():
+                fields.update(section_fields)
+            
             state = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
                 "strategy_mode": STRATEGY_MODE,
-                "active_options": {
-                    asset: [
-                        {
-                            **order,
-                            "entry_time": order["entry_time"].isoformat(),
-                            "expiry_time": order["expiry_time"].isoformat()
-                        }
-                        for order in orders
-                    ]
-                    for asset, orders in self.active_options.items()
-                },
-                "last_signal_time": {
-                    asset: time.isoformat() if time != datetime.min else "datetime.min"
-                    for asset, time in self.last_signal_time.items()
-                },
-                "consecutive_losses": dict(self.consecutive_losses),
-                "daily_lockouts": dict(self.daily_lockouts),
-                "wins": dict(self.wins),
-                "losses": dict(self.losses),
-                "ties": dict(self.ties),  # Guardar empates
-                "total_profit": self.total_profit,
-                "daily_profit": self.daily_profit,
-                "monthly_profits": dict(self.monthly_profits),
-                "monthly_starting_capital": self.monthly_starting_capital,
-                "monthly_stop_loss": self.monthly_stop_loss,
-                "stop_loss_triggered_month": self.stop_loss_triggered_month,
-                "absolute_stop_loss_activated": self.absolute_stop_loss_activated,
-                "min_capital": self.min_capital,
-                "last_date": self.last_date.isoformat() if self.last_date else None,
-                "current_month": self.current_month,
-                "daily_consecutive_wins": self.daily_consecutive_wins,
-                "daily_consecutive_losses": self.daily_consecutive_losses,
-                "daily_lock": self.daily_lock,
-                "daily_lock_time": self.daily_lock_time.isoformat() if self.daily_lock_time else None,
-                "daily_lock_reason": self.daily_lock_reason,
-                "max_daily_consecutive": self.max_daily_consecutive,
-                "recent_results": list(self.recent_results),
-                "day_start_balance": self.day_start_balance,
-                # Guardar historial de RSI
-                "rsi_history": {asset: list(history) for asset, history in self.rsi_history.items()},
-                "aggressiveness_mode": self.custom_aggressiveness or AGGRESSIVENESS_MODE  # Guardar modo actual (personalizado o por defecto)
+                **{name: fields[name] for name in STATE_FIELDS},
+                "aggressiveness_mode": self.custom_aggressiveness or AGGRESSIVENESS_MODE,  # Guardar modo actual (personalizado o por defecto)
+                "journal_seq": self.state_journal.seq  # Registros del journal ya incluidos
             }
             
-            with open(STATE_FILE, "w") as f:
-                json.dump(state, f, indent=4)
+            self.snapshot_writer.submit(state)
+            self.state_journal.mark_checkpoint(state["journal_seq"])
+            self.dirty_sections -= dirty
+            self.state_writes_performed += 1
             
-            self.logger.debug("💾 Estado guardado correctamente")
+            self.logger.debug(f"💾 Checkpoint de estado encolado (secciones: {', '.join(sorted(dirty))})")
             
         except Exception as e:
             self.logger.error(f"❌ Error guardando estado: {str(e)}")
     
+    def _read_state(self):
+        """Leer checkpoint + journal (corre en segundo plano mientras se conecta)"""
+        state, generation = self.snapshot_writer.load()
+        state = state or {}
+        replayed = self.state_journal.replay(state)
+        if state:
+            # Fechas a tipos nativos (el codec JSON y el journal las guardan en ISO)
+            normalize_state(state)
+        return state, generation, replayed
+    
     def load_state(self):
-        """Cargar estado previo si existe"""
+        """
+        Cargar la parte caliente del estado previo si existe
+        
+        Bloqueos, órdenes activas, stop loss y contadores del día se aplican
+        acá; las estadísticas por activo, historiales y profits mensuales se
+        hidratan en segundo plano (o al primer acceso, ver ColdField).
+        """
         try:
-            if not os.path.exists(STATE_FILE):
+            state, generation, replayed = self.state_hydrator.hot_state()
+            
+            if not state:
                 self.logger.info("📂 No hay archivo de estado previo")
                 self.last_date = datetime.now().date()
                 self.current_month = f"{datetime.now().year}-{datetime.now().month:02d}"
                 self.monthly_starting_capital[self.current_month] = self.initial_capital
                 return
             
-            with open(STATE_FILE, "r") as f:
-                state = json.load(f)
-            
             # Verificar si el modo de agresividad cambió
             saved_mode = state.get("aggressiveness_mode", None)
             current_mode = self.custom_aggressiveness or AGGRESSIVENESS_MODE
@@ -1471,30 +1957,15 @@ class MultiAssetRSIBinaryOptionsStrategy:
             self.active_options = defaultdict(list)
             for asset, orders in state.get("active_options", {}).items():
                 for order in orders:
-                    order["entry_time"] = datetime.fromisoformat(order["entry_time"])
-                    order["expiry_time"] = datetime.fromisoformat(order["expiry_time"])
                     # Compatibilidad: cambiar 'pair' a 'asset' si existe
                     if 'pair' in order and 'asset' not in order:
                         order['asset'] = order.pop('pair')
                     self.active_options[asset].append(order)
+            self.settlement_queue.rebuild(self.active_options)
             
-            # Cargar tiempos de última señal
-            self.last_signal_time = defaultdict(lambda: datetime.min)
-            for asset, time_str in state.get("last_signal_time", {}).items():
-                if time_str == "datetime.min":
-                    self.last_signal_time[asset] = datetime.min
-                else:
-                    self.last_signal_time[asset] = datetime.fromisoformat(time_str)
-            
-            # Cargar estadísticas
-            self.consecutive_losses = defaultdict(int, state.get("consecutive_losses", {}))
-            self.daily_lockouts = defaultdict(bool, state.get("daily_lockouts", {}))
-            self.wins = defaultdict(int, state.get("wins", {}))
-            self.losses = defaultdict(int, state.get("losses", {}))
-            self.ties = defaultdict(int, state.get("ties", {}))  # Cargar empates
+            # Cargar profit y stop loss
             self.total_profit = state.get("total_profit", 0)
             self.daily_profit = state.get("daily_profit", 0)
-            self.monthly_profits = defaultdict(float, state.get("monthly_profits", {}))
             self.monthly_starting_capital = state.get("monthly_starting_capital", {})
             self.monthly_stop_loss = state.get("monthly_stop_loss", False)
             self.stop_loss_triggered_month = state.get("stop_loss_triggered_month", None)
@@ -1506,39 +1977,46 @@ class MultiAssetRSIBinaryOptionsStrategy:
             self.daily_consecutive_wins = state.get("daily_consecutive_wins", 0)
             self.daily_consecutive_losses = state.get("daily_consecutive_losses", 0)
             self.daily_lock = state.get("daily_lock", False)
-            lock_time = state.get("daily_lock_time")
-            if lock_time:
-                self.daily_lock_time = datetime.fromisoformat(lock_time)
-            else:
-                self.daily_lock_time = None
+            self.daily_lock_time = state.get("daily_lock_time")
             self.daily_lock_reason = state.get("daily_lock_reason", None)
             self.max_daily_consecutive = state.get("max_daily_consecutive", 2)
             
-            # Cargar historial reciente
-            recent_results_data = state.get("recent_results", [])
-            self.recent_results = deque(recent_results_data, maxlen=2)
-            
-            # Cargar historial de RSI
-            rsi_history_data = state.get("rsi_history", {})
-            for asset, history in rsi_history_data.items():
-                self.rsi_history[asset] = deque(history, maxlen=5)
-            
             # Cargar fechas
-            last_date_str = state.get("last_date")
-            if last_date_str:
-                self.last_date = datetime.fromisoformat(last_date_str).date()
-            else:
-                self.last_date = datetime.now().date()
-            
+            self.last_date = state.get("last_date") or datetime.now().date()
             self.current_month = state.get("current_month", f"{datetime.now().year}-{datetime.now().month:02d}")
             
-            self.logger.info(f"✅ Estado cargado desde {state.get('timestamp', 'N/A')}")
+            # El resto queda para la hidratación fría
+            self.state_hydrator.set_cold_state(state)
+            
+            self.logger.info(f"✅ Estado cargado desde {state.get('timestamp', 'N/A')} (+{replayed} cambios del journal)")
+            
+            # Si el checkpoint vigente ya refleja todo, no hace falta reescribirlo
+            if generation == 0 and not replayed and (not saved_mode or saved_mode == current_mode):
+                self.dirty_sections.clear()
             
         except Exception as e:
             self.logger.error(f"❌ Error cargando estado: {str(e)}")
             self.last_date = datetime.now().date()
             self.current_month = f"{datetime.now().year}-{datetime.now().month:02d}"
             self.monthly_starting_capital[self.current_month] = self.initial_capital
+        finally:
+            self.state_hydrator.start_cold()
+    
+    def _hydrate_cold_state(self, state):
+        """Asignar los campos fríos del estado (estadísticas por activo, historiales, profits mensuales)"""
+        rsi_history = defaultdict(lambda: deque(maxlen=5))
+        for asset, history in state.get("rsi_history", {}).items():
+            rsi_history[asset] = deque(history, maxlen=5)
+        
+        self.last_signal_time = defaultdict(lambda: datetime.min, state.get("last_signal_time", {}))
+        self.consecutive_losses = defaultdict(int, state.get("consecutive_losses", {}))
+        self.daily_lockouts = defaultdict(bool, state.get("daily_lockouts", {}))
+        self.wins = defaultdict(int, state.get("wins", {}))
+        self.losses = defaultdict(int, state.get("losses", {}))
+        self.ties = defaultdict(int, state.get("ties", {}))  # Cargar empates
+        self.monthly_profits = defaultdict(float, state.get("monthly_profits", {}))
+        self.recent_results = deque(state.get("recent_results", []), maxlen=2)
+        self.rsi_history = rsi_history
     
     def print_summary(self):
         """Imprimir resumen de la estrategia"""
@@ -1575,6 +2053,45 @@ class MultiAssetRSIBinaryOptionsStrategy:
         self.logger.info(f"💵 Beneficio Neto: {format_currency(self.total_profit)}")
         self.logger.info(f"📉 Capital Mínimo: {format_currency(self.min_capital)}")
         
+        # Historial del ledger (consultas indexadas)
+        if hasattr(self, 'trade_ledger'):
+            try:
+                today = self.trade_ledger.summary(day=datetime.now().date().isoformat())
+                history = self.trade_ledger.summary()
+                self.logger.info(f"📚 Hoy: {today['total']} operaciones ({today['wins']}W/{today['losses']}L/{today['ties']}T) | "
+                                 f"Profit: {format_currency(today['profit'])}")
+                self.logger.info(f"📚 Histórico: {history['total']} operaciones | Tasa de éxito: {history['win_rate']:.1f}% | "
+                                 f"Profit: {format_currency(history['profit'])}")
+                for row in self.trade_ledger.by_asset()[:5]:
+                    self.logger.info(f"   {row['asset']}: {row['total']} ops ({row['wins']}W/{row['losses']}L/{row['ties']}T) "
+                                     f"{format_currency(row['profit'])}")
+                if hasattr(self, 'reconciler'):
+                    self.logger.info(f"🧾 Conciliaciones: {self.reconciler.runs} | Discrepancias registradas: {self.reconciler.discrepancies}")
+            except Exception as e:
+                self.logger.warning(f"⚠️ No se pudo leer el ledger de operaciones: {str(e)}")
+        
+        # Latencia de órdenes de la sesión
+        latency = self.order_latency.summary() if hasattr(self, 'order_latency') else None
+        if latency and latency["orders"]:
+            self.logger.info(f"⚡ Latencia señal→confirmación ({latency['orders']} órdenes): "
+                             f"p50 {latency['signal_to_ack']['p50']:.0f}ms | p95 {latency['signal_to_ack']['p95']:.0f}ms | "
+                             f"envío→confirmación p50 {latency['submit_to_ack']['p50']:.0f}ms")
+
+        # Persistencia del estado (checkpoints en segundo plano + journal)
+        if hasattr(self, 'snapshot_writer'):
+            snapshots = self.snapshot_writer.metrics()
+            self.logger.info(f"💾 Checkpoints: {snapshots['writes']} ({snapshots['failures']} fallidos, {snapshots['coalesced']} combinados) | "
+                             f"latencia prom {snapshots['avg_latency_ms']:.1f}ms / máx {snapshots['max_latency_ms']:.1f}ms | "
+                             f"último {snapshots['last_size_bytes'] / 1024:.1f} KB | journal: {self.state_journal.appended} registros | "
+                             f"backups: {snapshots['backups']}")
+            self.logger.info(f"💾 Escrituras de estado: {self.state_writes_performed} realizadas | "
+                             f"{self.state_writes_skipped} omitidas (sin cambios)")
+            log_metrics = self.log_pipeline.metrics()
+            self.logger.info(f"📝 Logs: {log_metrics['enqueued']} encolados | {log_metrics['dropped']} descartados | "
+                             f"cola máx {log_metrics['max_depth']}")
+            event_metrics = self.events.metrics()
+            self.logger.info(f"📝 Eventos: {event_metrics['written']} escritos | {event_metrics['dropped']} descartados")
+
         # Stop losses activados
         if self.absolute_stop_loss_activated:
             self.logger.info("🚨 Stop Loss Absoluto: ACTIVADO")
@@ -1627,6 +2144,88 @@ class MultiAssetRSIBinaryOptionsStrategy:
         
         self.logger.info("=" * 60)
     
+    def log_startup_time(self):
+        """Loguear el tiempo desde el inicio hasta el primer ciclo evaluado"""
+        self.startup_seconds = time.time() - self.process_start_time
+        hydration = self.state_hydrator.metrics()
+        read_ms = hydration["read_ms"] or 0.0
+        cold_ms = hydration["cold_ms"] or 0.0
+        self.logger.info(f"⏱️ Primer ciclo evaluado a {self.startup_seconds:.2f}s del inicio | "
+                         f"lectura de estado {read_ms:.1f}ms (en paralelo a la conexión) | "
+                         f"hidratación fría {cold_ms:.1f}ms ({hydration['cold_trigger'] or 'pendiente'})")
+    
+    def run_cycle(self, cycle_count):
+        """
+        Ejecutar un ciclo de trading
+        
+        Args:
+            cycle_count: Número de ciclo (para tareas periódicas)
+        
+        Returns:
+            float: Segundos a esperar antes del siguiente ciclo
+        """
+        cycle_start = time.time()
+        
+        # Log periódico del estado de trades
+        if cycle_count % 10 == 0:
+            total_active_trades = sum(len(trades) for trades in self.active_options.values())
+            self.logger.info(f"🔄 Ciclo #{cycle_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Trades activos: {total_active_trades}/{MAX_SIMULTANEOUS_TRADES}")
+            self.log_stuck_api_calls()
+        
+        # Verificar conexión
+        if not self.session.is_connected():
+            self.logger.warning("🔌 Reconectando...")
+            if not self.session.reconnect():
+                return 5
+            return 0
+        
+        # Verificar stop loss
+        if not self.check_stop_loss():
+            self.logger.info("🛑 Stop loss activo. Esperando...")
+            return 300  # Esperar 5 minutos
+        
+        # Verificar daily lock (2 consecutivas)
+        if self.check_daily_lock():
+            return 15
+        
+        # Verificar órdenes activas
+        self.check_active_orders()
+        
+        # Verificar nuevo día
+        current_date = datetime.now().date()
+        if self.last_date != current_date:
+            self.on_new_day()
+        
+        # Conciliar el P&L contra el broker (periódico o cada N liquidaciones)
+        if self.reconciler.due():
+            self.reconcile_pnl()
+        
+        # Procesar cada activo disponible
+        for asset in self.valid_assets:
+            try:
+                self.process_asset(asset)
+            except Exception as e:
+                self.logger.error(f"❌ Error procesando {asset}: {str(e)}")
+        
+        # Checkpoint periódico o cuando el journal creció demasiado
+        if cycle_count % SAVE_STATE_INTERVAL == 0 or self.state_journal.pending >= STATE_CHECKPOINT_RECORDS:
+            self.save_state()
+        
+        # Re-verificar activos periódicamente
+        if cycle_count % 100 == 0:
+            self.logger.info("🔄 Re-verificando activos disponibles...")
+            self.check_valid_assets()
+        
+        # Tiempo de arranque hasta el primer ciclo evaluado
+        if self.startup_seconds is None:
+            self.log_startup_time()
+        
+        # Control de tiempo del ciclo
+        cycle_duration = time.time() - cycle_start
+        self.events.emit("cycle", cycle=cycle_count, duration_ms=cycle_duration * 1000, assets=len(self.valid_assets),
+                         active_orders=sum(len(trades) for trades in self.active_options.values()))
+        return max(5.0, 15.0 - cycle_duration)  # Mínimo 5 segundos entre ciclos
+    
     def run(self):
         """Ejecutar la estrategia principal"""
         # Obtener configuración activa (personalizada o por defecto)
@@ -1648,59 +2247,22 @@ class MultiAssetRSIBinaryOptionsStrategy:
         
         try:
             while True:
-                cycle_start = time.time()
                 cycle_count += 1
+                sleep_time = self.run_cycle(cycle_count)
                 
-                # Log periódico del estado de trades
-                if cycle_count % 10 == 0:
-                    total_active_trades = sum(len(trades) for trades in self.active_options.values())
-                    self.logger.info(f"🔄 Ciclo #{cycle_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Trades activos: {total_active_trades}/{MAX_SIMULTANEOUS_TRADES}")
-                
-                # Verificar conexión
-                if not self.iqoption.check_connect():
-                    self.logger.warning("🔌 Reconectando...")
-                    self._connect_to_iq_option(IQ_EMAIL, IQ_PASSWORD, ACCOUNT_TYPE)
-                    time.sleep(5)
-                    continue
-                
-                # Verificar stop loss
-                if not self.check_stop_loss():
-                    self.logger.info("🛑 Stop loss activo. Esperando...")
-                    time.sleep(300)  # Esperar 5 minutos
-                    continue
-                
-                # Verificar daily lock (2 consecutivas)
-                if self.check_daily_lock():
-                    continue
-                
-                # Verificar órdenes activas
-                self.check_active_orders()
-                
-                # Verificar nuevo día
-                current_date = datetime.now().date()
-                if self.last_date != current_date:
-                    self.on_new_day()
-                
-                # Procesar cada activo disponible
-                for asset in self.valid_assets:
-                    try:
-                        self.process_asset(asset)
-                    except Exception as e:
-                        self.logger.error(f"❌ Error procesando {asset}: {str(e)}")
-                
-                # Guardar estado periódicamente
-                if cycle_count % SAVE_STATE_INTERVAL == 0:
-                    self.save_state()
-                
-                # Re-verificar activos periódicamente
-                if cycle_count % 100 == 0:
-                    self.logger.info("🔄 Re-verificando activos disponibles...")
-                    self.check_valid_assets()
-                
-                # Control de tiempo del ciclo
-                cycle_duration = time.time() - cycle_start
-                sleep_time = max(5.0, 15.0 - cycle_duration)  # Mínimo 5 segundos entre ciclos
-                time.sleep(sleep_time)
+                # Dormir hasta el próximo ciclo, liquidando en cuanto llegue un resultado
+                # o venza el próximo intento de la cola de pendientes
+                deadline = time.time() + sleep_time
+                while True:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    next_due = self.settlement_queue.next_due_in()
+                    if next_due is not None and next_due < remaining:
+                        self.settlement.wait(next_due)
+                        self.check_active_orders()
+                    elif self.settlement.wait(remaining):
+                        self.check_active_orders()
                 
         except KeyboardInterrupt:
             self.logger.info("⏹️ Estrategia detenida por el usuario")
@@ -1708,15 +2270,37 @@ class MultiAssetRSIBinaryOptionsStrategy:
             self.logger.critical(f"🚨 Error crítico: {str(e)}")
             self.logger.critical(traceback.format_exc())
         finally:
-            self.logger.info("🏁 Finalizando estrategia...")
-            self.save_state()
-            self.print_summary()
-            
-            # Cerrar executor
-            if hasattr(self, 'executor'):
-                self.executor.shutdown(wait=True)
-            
-            self.logger.info("👋 Estrategia finalizada")
+            self.shutdown()
+    
+    def shutdown(self):
+        """Guardar estado, imprimir el resumen y detener threads, conexión y archivos"""
+        self.logger.info("🏁 Finalizando estrategia...")
+        self.save_state()
+        self.snapshot_writer.stop(timeout=API_TIMEOUT)
+        self.print_summary()
+        self.logger.removeHandler(self.error_event_handler)
+        self.events.stop(timeout=API_TIMEOUT)
+        self.event_server.stop()
+        if self.log_pipeline:
+            self.log_pipeline.remove_handler(self.recent_log_handler)
+        
+        # Cerrar executor (sin bloquear por llamadas colgadas)
+        if hasattr(self, 'executor'):
+            self.executor.shutdown(wait=True, timeout=API_TIMEOUT)
+        
+        if getattr(self, 'order_book', None):
+            self.order_book.stop()
+        
+        if hasattr(self, 'payout_cache'):
+            self.payout_cache.stop()
+        
+        if hasattr(self, 'trade_ledger'):
+            self.trade_ledger.close()
+        
+        if hasattr(self, 'session'):
+            self.session.close()
+        
+        self.logger.info("👋 Estrategia finalizada")
     
     def __del__(self):
         """Limpieza al destruir el objeto"""
@@ -6,6 +6,19 @@ import os
 import signal
 import time
 
+from collections import deque
+
+from config import TRADE_LEDGER_FILE, LOG_FILE, EVENTS_FILE, EVENTS_SOCKET_FILE
+from trade_ledger import TradeLedger
+from data_dir import UserDataDir
+from event_stream import EVENT_TYPES, read_events
+from event_ipc import fetch_recent_events
+from log_pipeline import read_log_tail
+
+# Salida de error de los procesos lanzados (tracebacks fuera del logger)
+PROCESS_STDERR_FILE = "strategy_stderr.log"
+LOGS_SOCKET_TIMEOUT = 1.0  # Segundos esperando al proceso antes de caer al archivo de log
+
 app = FastAPI(title="Trading Strategy API")
 
 # Configure CORS
@@ -39,8 +52,13 @@ async def start_strategy(user_id: str, pairs: str = None):
             del active_processes[user_id]
     
     try:
+        # Cada usuario en su directorio de datos (estado, ledger y log propios)
+        data_dir = UserDataDir.for_user(user_id)
+        if data_dir.is_locked():
+            return {"error": "Strategy already running for this user (data directory locked)"}
+        
         # Preparar comando con pares seleccionados
-        cmd = ['python3', 'main.py']
+        cmd = ['python3', 'main.py', '--user-id', data_dir.user_id]
         
         # Si se especifican pares, agregarlos como argumento
         if pairs:
@@ -49,12 +67,14 @@ async def start_strategy(user_id: str, pairs: str = None):
             cmd.extend(['--pairs'] + selected_pairs)
         
         # Ejecutar tu main.py con los pares seleccionados
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # El log va al archivo del usuario: stdout se descarta (un PIPE que nadie
+        # lee bloquea al proceso cuando se llena) y stderr queda en un archivo
+        with open(data_dir.ensure().path(PROCESS_STDERR_FILE), 'ab') as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr_file
+            )
         
         # Guardar referencia del proceso
         active_processes[user_id] = process
@@ -86,7 +106,12 @@ async def start_strategy_post(user_id: str, request: Request):
         config = await request.json()
         print(f"🔧 Configuración recibida desde dashboard: {config}")
         
-        cmd = ['python3', 'main.py']
+        # Cada usuario en su directorio de datos (estado, ledger y log propios)
+        data_dir = UserDataDir.for_user(user_id)
+        if data_dir.is_locked():
+            return {"error": "Strategy already running for this user (data directory locked)"}
+        
+        cmd = ['python3', 'main.py', '--user-id', data_dir.user_id]
         
         # Procesar configuración del dashboard
         if 'selectedPairs' in config and config['selectedPairs']:
@@ -134,12 +159,14 @@ async def start_strategy_post(user_id: str, request: Request):
         
         print(f"🚀 Ejecutando comando: {' '.join(cmd)}")
         
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # El log va al archivo del usuario: stdout se descarta (un PIPE que nadie
+        # lee bloquea al proceso cuando se llena) y stderr queda en un archivo
+        with open(data_dir.ensure().path(PROCESS_STDERR_FILE), 'ab') as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr_file
+            )
         
         active_processes[user_id] = process
         
@@ -229,6 +256,13 @@ async def reset_strategy(user_id: str):
                     "message": "Detén el algoritmo antes de hacer reset"
                 }
         
+        data_dir = UserDataDir.for_user(user_id)
+        if data_dir.is_locked():
+            return {
+                "error": "Cannot reset while strategy is running. Stop the strategy first.",
+                "message": "Detén el algoritmo antes de hacer reset"
+            }
+        
         # Verificar que existe el archivo reset_strategy.py
         reset_script = "reset_strategy.py"
         if not os.path.exists(reset_script):
@@ -239,7 +273,7 @@ async def reset_strategy(user_id: str):
         
         # Ejecutar reset_strategy.py con input automático 's'
         reset_process = subprocess.Popen(
-            ['python3', reset_script],
+            ['python3', reset_script, '--user-id', data_dir.user_id],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -277,10 +311,90 @@ async def reset_strategy(user_id: str):
             "message": f"Error inesperado durante el reset: {str(e)}"
         }
 
+@app.get("/strategy/trades/{user_id}")
+async def get_trades(user_id: str, day: str = None, asset: str = None, limit: int = 50):
+    """
+    Historial de operaciones liquidadas desde el ledger (consultas indexadas)
+    """
+    try:
+        ledger_file = UserDataDir.for_user(user_id).path(TRADE_LEDGER_FILE)
+    except ValueError as e:
+        return {"error": str(e)}
+    if not os.path.exists(ledger_file):
+        return {"user_id": user_id, "summary": None, "by_asset": [], "trades": []}
+    
+    ledger = TradeLedger(ledger_file, readonly=True)
+    try:
+        return {
+            "user_id": user_id,
+            "summary": ledger.summary(day=day, asset=asset),
+            "by_asset": ledger.by_asset(day=day),
+            "by_day": ledger.by_day(),
+            "trades": ledger.recent(limit=limit, day=day, asset=asset),
+            "reconciliation_events": ledger.reconciliation_events(day=day)
+        }
+    except Exception as e:
+        return {"error": f"Failed to read trade ledger: {str(e)}"}
+    finally:
+        ledger.close()
+
+@app.get("/strategy/events/{user_id}")
+async def get_events(user_id: str, types: str = None, since: float = None, limit: int = 200):
+    """
+    Eventos estructurados del usuario (cycle, rsi_reading, signal, order_placed,
+    order_settled, lock, stop_loss, error), del más viejo al más nuevo
+    
+    types: tipos separados por comas; since: epoch mínimo
+    """
+    try:
+        events_file = UserDataDir.for_user(user_id).path(EVENTS_FILE)
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    selected = types.split(',') if types else None
+    unknown = [t for t in (selected or []) if t not in EVENT_TYPES]
+    if unknown:
+        return {"error": f"Unknown event types: {', '.join(unknown)}", "types": list(EVENT_TYPES)}
+    
+    events = deque(read_events(events_file, types=selected, since=since), maxlen=limit)
+    return {"user_id": user_id, "events": list(events)}
+
+def format_log_entry(timestamp_str, level, message):
+    """Entrada de log para el dashboard: nivel normalizado y emoji según el nivel"""
+    level = level.lower()
+    
+    # Mapear niveles de log y agregar emojis
+    if level in ['info', 'debug']:
+        level = 'info'
+        if 'error' not in message.lower():
+            message = f"ℹ️ {message}"
+    elif level in ['warn', 'warning']:
+        level = 'warning'
+        message = f"⚠️ {message}"
+    elif level in ['err', 'error', 'critical']:
+        level = 'error'
+        message = f"❌ {message}"
+    elif level in ['success']:
+        level = 'success'
+        message = f"✅ {message}"
+    else:
+        level = 'info'
+        message = f"📊 {message}"
+    
+    return {
+        "timestamp": timestamp_str,
+        "level": level,
+        "message": message
+    }
+
 @app.get("/strategy/logs/{user_id}")
-async def get_logs(user_id: str, limit: int = 50):
+def get_logs(user_id: str, limit: int = 50):
     """
     Obtiene los logs más recientes del proceso de trading
+    
+    Sin async: el pedido al socket del proceso (y la lectura del archivo) son
+    bloqueantes; FastAPI corre el endpoint en su threadpool y un proceso lento
+    no frena el event loop de la API.
     """
     try:
         # Verificar si hay proceso activo
@@ -310,7 +424,7 @@ async def get_logs(user_id: str, limit: int = 50):
         
         # Verificar si el proceso está vivo
         if process.poll() is not None:
-            del active_processes[user_id]
+            active_processes.pop(user_id, None)  # Ya corre en el threadpool: otro pedido pudo quitarlo
             return {
                 "logs": [
                     {
@@ -321,62 +435,34 @@ async def get_logs(user_id: str, limit: int = 50):
                 ]
             }
         
-        # Leer logs del archivo de log si existe
-        log_file = "iqoption_strategy.log"
+        data_dir = UserDataDir.for_user(user_id)
+        log_file = data_dir.path(LOG_FILE)
         logs = []
         
-        if os.path.exists(log_file):
+        # Primero desde la memoria del proceso (socket local): sin disco ni parseo
+        try:
+            recent = fetch_recent_events(data_dir.path(EVENTS_SOCKET_FILE), limit=limit, types=("log",),
+                                         timeout=LOGS_SOCKET_TIMEOUT)
+        except (OSError, ValueError, KeyError):
+            recent = None
+        
+        if recent is not None:
+            for event in recent:
+                timestamp_str = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(event["ts"]))
+                logs.append(format_log_entry(timestamp_str, event["level"], event["message"]))
+        elif os.path.exists(log_file):
+            # Proceso sin socket (versión anterior o arrancando): últimas líneas del archivo
             try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    
-                # Tomar las últimas 'limit' líneas
-                recent_lines = lines[-limit:] if len(lines) > limit else lines
-                
-                for line in recent_lines:
+                for line in read_log_tail(log_file, limit):
                     line = line.strip()
                     if line:
-                        # Parsear formato básico de log
+                        # Parsear formato del log: 'fecha | NIVEL | mensaje'
                         try:
-                            if ' - ' in line:
-                                parts = line.split(' - ', 2)
-                                if len(parts) >= 3:
-                                    timestamp_str = parts[0]
-                                    level = parts[1].lower()
-                                    message = parts[2]
-                                    
-                                    # Mapear niveles de log y agregar emojis
-                                    if level in ['info', 'debug']:
-                                        level = 'info'
-                                        if 'error' not in message.lower():
-                                            message = f"ℹ️ {message}"
-                                    elif level in ['warn', 'warning']:
-                                        level = 'warning'
-                                        message = f"⚠️ {message}"
-                                    elif level in ['err', 'error']:
-                                        level = 'error'
-                                        message = f"❌ {message}"
-                                    elif level in ['success']:
-                                        level = 'success'
-                                        message = f"✅ {message}"
-                                    else:
-                                        level = 'info'
-                                        message = f"📊 {message}"
-                                    
-                                    logs.append({
-                                        "timestamp": timestamp_str,
-                                        "level": level,
-                                        "message": message
-                                    })
-                                else:
-                                    # Línea sin formato, tratarla como info
-                                    logs.append({
-                                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
-                                        "level": "info",
-                                        "message": f"📝 {line}"
-                                    })
+                            parts = line.split(' | ', 2)
+                            if len(parts) == 3:
+                                logs.append(format_log_entry(parts[0].replace(' ', 'T'), parts[1], parts[2]))
                             else:
-                                # Línea sin formato, tratarla como info
+                                # Línea sin formato (ej. traceback), tratarla como info
                                 logs.append({
                                     "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
                                     "level": "info",
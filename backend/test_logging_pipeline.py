@@ -0,0 +1,106 @@
+# test_logging_pipeline.py
+# Tests del logging central: un solo pipeline por proceso, cada evento escrito una vez
+
+import logging
+import queue
+from logging.handlers import QueueHandler
+
+import pytest
+
+from log_pipeline import BoundedQueueHandler, configure_logging, get_pipeline, shutdown_logging
+from utils import setup_logger
+
+
+@pytest.fixture(autouse=True)
+def clean_logging():
+    shutdown_logging()
+    yield
+    shutdown_logging()
+    for name in ("main", "strategy", "ruidoso"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def count(lines, message):
+    return sum(1 for line in lines if line.endswith(f"| {message}"))
+
+
+def test_setup_logger_repetido_escribe_cada_evento_una_vez(tmp_path):
+    log_file = str(tmp_path / "strategy.log")
+
+    # Como main.py + estrategia, y una segunda estrategia en el mismo proceso
+    main_logger = setup_logger("main", log_file)
+    strategy_logger = setup_logger("strategy", log_file)
+    setup_logger("strategy", log_file)
+    setup_logger("main", log_file)
+
+    main_logger.info("evento main")
+    strategy_logger.info("evento estrategia")
+    strategy_logger.warning("aviso estrategia")
+
+    queue_handlers = [h for h in logging.getLogger().handlers if isinstance(h, QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert not main_logger.handlers and not strategy_logger.handlers
+
+    shutdown_logging()
+    lines = read_lines(log_file)
+    assert count(lines, "evento main") == 1
+    assert count(lines, "evento estrategia") == 1
+    assert count(lines, "aviso estrategia") == 1
+    assert len(lines) == 3
+
+
+def test_niveles_por_modulo(tmp_path):
+    log_file = str(tmp_path / "strategy.log")
+    configure_logging(log_file, logging.INFO, {"ruidoso": "WARNING"}, console=False)
+
+    logging.getLogger("ruidoso").info("info ruidoso")
+    logging.getLogger("ruidoso").warning("warning ruidoso")
+    logging.getLogger("strategy").debug("debug estrategia")
+    logging.getLogger("strategy").info("info estrategia")
+
+    shutdown_logging()
+    lines = read_lines(log_file)
+    assert count(lines, "info ruidoso") == 0
+    assert count(lines, "warning ruidoso") == 1
+    assert count(lines, "debug estrategia") == 0
+    assert count(lines, "info estrategia") == 1
+
+
+def test_reconfigurar_con_otro_archivo_no_duplica(tmp_path):
+    first = str(tmp_path / "a.log")
+    second = str(tmp_path / "b.log")
+    configure_logging(first, console=False)
+    logging.getLogger("strategy").warning("antes")
+    configure_logging(second, console=False)
+    configure_logging(second, console=False)
+    logging.getLogger("strategy").warning("después")
+
+    assert get_pipeline().log_file == second
+    shutdown_logging()
+    assert count(read_lines(first), "antes") == 1
+    assert count(read_lines(first), "después") == 0
+    assert count(read_lines(second), "después") == 1
+    assert len(read_lines(second)) == 1
+
+
+def test_cola_llena_descarta_info_y_conserva_warning():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_cola_llena")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        for i in range(3):
+            logger.info(f"info {i}")
+        logger.error("error importante")
+    finally:
+        logger.removeHandler(handler)
+
+    queued = [handler.queue.get_nowait().getMessage() for _ in range(handler.queue.qsize())]
+    assert queued == ["info 1", "error importante"]
+    assert handler.dropped == 2
@@ -0,0 +1,57 @@
+# test_state_restart.py
+# Tests del checkpoint de estado tras reiniciar sobre el mismo directorio de datos
+
+import pytest
+
+pytest.importorskip("iqoptionapi")
+
+from data_dir import UserDataDir
+from iqoption_simulator import SimulatedIQOption
+from log_pipeline import shutdown_logging
+from strategy import MultiAssetRSIBinaryOptionsStrategy
+
+
+def build_strategy(path):
+    strategy = MultiAssetRSIBinaryOptionsStrategy(
+        "test", "test", client_factory=lambda e, p: SimulatedIQOption(e, p, latency=0.0),
+        data_dir=UserDataDir(str(path))
+    )
+    strategy.load_state()
+    return strategy
+
+
+@pytest.fixture(autouse=True)
+def clean_logging():
+    yield
+    shutdown_logging()
+
+
+def test_restart_with_one_dirty_section_writes_checkpoint(tmp_path):
+    first = build_strategy(tmp_path)
+    first.total_profit = 12.5
+    first.save_state()
+    first.shutdown()
+
+    # Checkpoint vigente y journal vacío: el reinicio no deja secciones pendientes
+    second = build_strategy(tmp_path)
+    try:
+        assert not second.dirty_sections
+        writes = second.snapshot_writer.metrics()["writes"]
+
+        second.daily_lock_reason = "prueba"
+        second.journal_state("lock", fields=("daily_lock_reason",))
+        second.save_state()
+        second.snapshot_writer.flush(5)
+
+        assert not second.dirty_sections
+        assert second.snapshot_writer.metrics()["writes"] == writes + 1
+        assert second.state_journal.pending == 0
+    finally:
+        second.shutdown()
+
+    third = build_strategy(tmp_path)
+    try:
+        assert third.total_profit == 12.5
+        assert third.daily_lock_reason == "prueba"
+    finally:
+        third.shutdown()
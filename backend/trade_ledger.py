@@ -0,0 +1,211 @@
+# trade_ledger.py
+# Registro de operaciones en SQLite (solo inserción, modo WAL)
+
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL UNIQUE,
+    account_type TEXT,
+    asset TEXT NOT NULL,
+    asset_group TEXT,
+    option_type TEXT,
+    direction TEXT,
+    size REAL NOT NULL,
+    payout_percent REAL,
+    rsi REAL,
+    strength REAL,
+    entry_time TEXT,
+    expiry_time TEXT,
+    settle_time TEXT NOT NULL,
+    day TEXT NOT NULL,
+    result TEXT NOT NULL CHECK (result IN ('win', 'loss', 'tie')),
+    profit REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_asset ON trades (asset);
+CREATE INDEX IF NOT EXISTS idx_trades_day ON trades (day);
+CREATE INDEX IF NOT EXISTS idx_trades_result ON trades (result);
+CREATE TRIGGER IF NOT EXISTS trades_no_update BEFORE UPDATE ON trades
+BEGIN
+    SELECT RAISE(ABORT, 'trades es solo inserción');
+END;
+CREATE TRIGGER IF NOT EXISTS trades_no_delete BEFORE DELETE ON trades
+BEGIN
+    SELECT RAISE(ABORT, 'trades es solo inserción');
+END;
+CREATE TABLE IF NOT EXISTS reconciliation_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    day TEXT NOT NULL,
+    broker_balance REAL NOT NULL,
+    expected_balance REAL NOT NULL,
+    ledger_profit REAL NOT NULL,
+    counter_profit REAL,
+    open_exposure REAL NOT NULL,
+    difference REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reconciliation_day ON reconciliation_events (day);
+CREATE TRIGGER IF NOT EXISTS reconciliation_no_update BEFORE UPDATE ON reconciliation_events
+BEGIN
+    SELECT RAISE(ABORT, 'reconciliation_events es solo inserción');
+END;
+CREATE TRIGGER IF NOT EXISTS reconciliation_no_delete BEFORE DELETE ON reconciliation_events
+BEGIN
+    SELECT RAISE(ABORT, 'reconciliation_events es solo inserción');
+END;
+"""
+
+
+def _iso(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class TradeLedger:
+    """
+    Una fila por orden liquidada: tiempos, RSI, fuerza, monto, payout y resultado
+
+    La tabla es solo de inserción (triggers impiden UPDATE/DELETE) e indexada
+    por activo, día y resultado, así los resúmenes son consultas indexadas en
+    lugar de recorrer el log.
+    """
+
+    def __init__(self, path, readonly=False):
+        """
+        Args:
+            path: Archivo SQLite
+            readonly: Abrir solo para consultas (resumen_rapido, API)
+        """
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        self._conn.row_factory = sqlite3.Row
+
+    def record_trade(self, order, asset, result, profit, payout_percent=None, account_type=None, settle_time=None):
+        """
+        Registrar una orden liquidada
+
+        Args:
+            order: dict de la orden activa (id, type, size, rsi, strength, entry/expiry_time...)
+            result: "win", "loss" o "tie"
+            profit: Ganancia neta (negativa en pérdidas)
+
+        Returns:
+            bool: True si se insertó (False si la orden ya estaba registrada)
+        """
+        settle_time = settle_time or datetime.now()
+        row = (
+            str(order["id"]),
+            account_type,
+            asset,
+            order.get("asset_group"),
+            order.get("option_type"),
+            order.get("type"),
+            float(order["size"]),
+            payout_percent,
+            order.get("rsi"),
+            order.get("strength"),
+            _iso(order.get("entry_time")),
+            _iso(order.get("expiry_time")),
+            settle_time.isoformat(),
+            settle_time.date().isoformat(),
+            result,
+            float(profit),
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO trades (order_id, account_type, asset, asset_group, option_type, direction, "
+                "size, payout_percent, rsi, strength, entry_time, expiry_time, settle_time, day, result, profit) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _filters(day=None, asset=None, since=None):
+        clauses, params = [], []
+        if day:
+            clauses.append("day = ?")
+            params.append(day)
+        if asset:
+            clauses.append("asset = ?")
+            params.append(asset)
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def summary(self, day=None, asset=None, since=None):
+        """Totales de operaciones y profit (opcionalmente de un día o activo)"""
+        where, params = self._filters(day, asset, since)
+        row = self._query(
+            "SELECT COUNT(*) AS total, "
+            "COALESCE(SUM(result = 'win'), 0) AS wins, "
+            "COALESCE(SUM(result = 'loss'), 0) AS losses, "
+            "COALESCE(SUM(result = 'tie'), 0) AS ties, "
+            f"COALESCE(SUM(profit), 0) AS profit FROM trades{where}",
+            params
+        )[0]
+        decided = row["wins"] + row["losses"]
+        row["win_rate"] = (row["wins"] / decided * 100) if decided else 0.0
+        return row
+
+    def by_asset(self, day=None, since=None):
+        """Resultados agrupados por activo, de mayor a menor profit"""
+        where, params = self._filters(day, None, since)
+        return self._query(
+            "SELECT asset, COUNT(*) AS total, "
+            "SUM(result = 'win') AS wins, SUM(result = 'loss') AS losses, SUM(result = 'tie') AS ties, "
+            f"SUM(profit) AS profit FROM trades{where} GROUP BY asset ORDER BY profit DESC",
+            params
+        )
+
+    def by_day(self, limit=30):
+        """Resultados por día (los más recientes primero)"""
+        return self._query(
+            "SELECT day, COUNT(*) AS total, SUM(result = 'win') AS wins, SUM(result = 'loss') AS losses, "
+            "SUM(result = 'tie') AS ties, SUM(profit) AS profit FROM trades GROUP BY day ORDER BY day DESC LIMIT ?",
+            (limit,)
+        )
+
+    def recent(self, limit=20, day=None, asset=None):
+        """Últimas operaciones liquidadas"""
+        where, params = self._filters(day, asset)
+        return self._query(f"SELECT * FROM trades{where} ORDER BY id DESC LIMIT ?", params + [limit])
+
+    def record_reconciliation(self, result):
+        """Registrar una discrepancia de conciliación (ver reconciliation.PnLReconciler)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO reconciliation_events (created_at, day, broker_balance, expected_balance, "
+                "ledger_profit, counter_profit, open_exposure, difference) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(), result["day"], result["broker_balance"], result["expected_balance"],
+                 result["ledger_profit"], result["counter_profit"], result["open_exposure"], result["difference"])
+            )
+            self._conn.commit()
+
+    def reconciliation_events(self, limit=20, day=None):
+        """Últimas discrepancias registradas"""
+        where, params = self._filters(day)
+        return self._query(f"SELECT * FROM reconciliation_events{where} ORDER BY id DESC LIMIT ?", params + [limit])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -6,26 +6,26 @@ from datetime import datetime
 import pytz
 import logging
 
-def setup_logger(name, log_file, level=logging.INFO):
-    """Configurar logger con formato personalizado"""
-    formatter = logging.Formatter(
-        '%(asctime)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Handler para archivo
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    
-    # Configurar logger
+from config import LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_SIZE
+from log_pipeline import configure_logging
+
+def setup_logger(name, log_file, level=None):
+    """
+    Logger de un módulo sobre el logging central del proceso
+
+    configure_logging es idempotente: llamar a setup_logger varias veces
+    (main, estrategia) no agrega handlers. El logger no tiene handlers propios
+    y propaga al raíz, que encola hacia el thread de escritura (ver
+    log_pipeline.py): loguear nunca bloquea el loop de trading.
+
+    Args:
+        level: Nivel de este logger (None = el de LOG_LEVELS o LOG_LEVEL)
+    """
+    configure_logging(log_file, getattr(logging, LOG_LEVEL), LOG_LEVELS, LOG_QUEUE_SIZE)
+    
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if level is not None and name not in LOG_LEVELS:
+        logger.setLevel(level)
     
     return logger
 
@@ -0,0 +1,207 @@
+# worker_pool.py
+# Pool de workers para llamadas a la API que tolera llamadas colgadas
+
+import threading
+import time
+import queue
+from concurrent.futures import Future
+
+
+class _Task:
+    """Llamada pendiente o en curso dentro del pool"""
+
+    __slots__ = ("future", "func", "args", "kwargs", "name", "started_at", "abandoned_at")
+
+    def __init__(self, func, args, kwargs):
+        self.future = Future()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.name = getattr(func, "__name__", repr(func))
+        self.started_at = None
+        self.abandoned_at = None
+
+
+class AbandonAwareWorkerPool:
+    """
+    Pool de threads que sigue funcionando aunque algunas llamadas se cuelguen
+
+    Cuando una llamada excede su timeout el llamador la marca como abandonada.
+    El worker que la ejecuta sigue ocupado, así que el pool crea un worker de
+    reemplazo (hasta max_workers) para que las siguientes llamadas no queden
+    en cola detrás de la llamada colgada. Cuando la llamada abandonada termina,
+    el worker sobrante se retira.
+    """
+
+    def __init__(self, base_workers=3, max_workers=8, name="api-worker"):
+        """
+        Args:
+            base_workers: Workers disponibles en condiciones normales
+            max_workers: Límite total de workers, incluyendo los que están colgados
+            name: Prefijo para el nombre de los threads
+        """
+        self.base_workers = base_workers
+        self.max_workers = max(base_workers, max_workers)
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._running = {}          # thread -> _Task en curso
+        self._abandoned = set()     # _Task abandonadas que siguen en curso
+        self._shutdown = False
+        self._worker_seq = 0
+
+        # Estadísticas
+        self.total_abandoned = 0
+        self.total_recovered = 0    # Abandonadas que terminaron tarde
+        self.max_stuck_seconds = 0.0
+        self.replacement_workers_started = 0
+
+        with self._lock:
+            for _ in range(base_workers):
+                self._start_worker_locked()
+
+    def _start_worker_locked(self):
+        """Crear un worker nuevo (requiere self._lock)"""
+        self._worker_seq += 1
+        thread = threading.Thread(
+            target=self._worker_loop,
+            name=f"{self.name}-{self._worker_seq}",
+            daemon=True  # Un worker colgado nunca debe impedir la salida del proceso
+        )
+        self._workers.add(thread)
+        thread.start()
+        return thread
+
+    def _required_workers_locked(self):
+        """Workers necesarios: los base más uno por cada llamada abandonada en curso"""
+        return min(self.max_workers, self.base_workers + len(self._abandoned))
+
+    def _worker_loop(self):
+        current = threading.current_thread()
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+
+            with self._lock:
+                if task.future.cancelled():
+                    continue
+                task.started_at = time.time()
+                self._running[current] = task
+
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.func(*task.args, **task.kwargs)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+
+            with self._lock:
+                self._running.pop(current, None)
+                if task in self._abandoned:
+                    self._abandoned.discard(task)
+                    self.total_recovered += 1
+                    stuck = time.time() - task.abandoned_at
+                    self.max_stuck_seconds = max(self.max_stuck_seconds, stuck)
+
+                # Retirar workers de reemplazo que ya no hacen falta
+                if self._shutdown or len(self._workers) > self._required_workers_locked():
+                    self._workers.discard(current)
+                    break
+
+    def submit(self, func, *args, **kwargs):
+        """Encolar una llamada y devolver su Future"""
+        task = _Task(func, args, kwargs)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("No se pueden enviar llamadas después de shutdown")
+            # Recuperar capacidad si algún worker se retiró de más
+            while len(self._workers) < self._required_workers_locked():
+                self._start_worker_locked()
+        task.future._pool_task = task
+        self._queue.put(task)
+        return task.future
+
+    def abandon(self, future):
+        """
+        Marcar como abandonada la llamada de un Future que excedió su timeout
+
+        Si todavía no empezó se cancela; si está en curso se crea un worker de
+        reemplazo para mantener la capacidad del pool.
+        """
+        task = getattr(future, "_pool_task", None)
+        if task is None or future.cancel():
+            return
+
+        with self._lock:
+            if future.done() or task.started_at is None or task in self._abandoned:
+                return
+            task.abandoned_at = time.time()
+            self._abandoned.add(task)
+            self.total_abandoned += 1
+            if self._shutdown:
+                return
+            if len(self._workers) < self._required_workers_locked():
+                self._start_worker_locked()
+                self.replacement_workers_started += 1
+
+    def stuck_calls(self):
+        """Lista de llamadas abandonadas que siguen en curso: [(nombre, segundos)]"""
+        now = time.time()
+        with self._lock:
+            return sorted(
+                ((task.name, now - task.started_at) for task in self._abandoned),
+                key=lambda item: item[1],
+                reverse=True
+            )
+
+    def stats(self):
+        """Estadísticas del pool para logging/diagnóstico"""
+        stuck = self.stuck_calls()
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "busy": len(self._running),
+                "queued": self._queue.qsize(),
+                "stuck_calls": len(stuck),
+                "oldest_stuck_seconds": stuck[0][1] if stuck else 0.0,
+                "total_abandoned": self.total_abandoned,
+                "total_recovered": self.total_recovered,
+                "max_stuck_seconds": self.max_stuck_seconds,
+                "replacement_workers_started": self.replacement_workers_started,
+            }
+
+    def shutdown(self, wait=True, timeout=None):
+        """
+        Detener el pool
+
+        Con wait=True espera a los workers que no están atascados en una
+        llamada abandonada; nunca bloquea por una llamada colgada.
+        """
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+            stuck_threads = {thread for thread, task in self._running.items() if task in self._abandoned}
+
+        # Cancelar lo que quede en cola
+        while True:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None:
+                task.future.cancel()
+
+        for _ in workers:
+            self._queue.put(None)
+
+        if wait:
+            deadline = None if timeout is None else time.time() + timeout
+            for thread in workers:
+                if thread in stuck_threads or thread is threading.current_thread():
+                    continue
+                remaining = None if deadline is None else max(0.0, deadline - time.time())
+                thread.join(remaining)
@@ -5,6 +5,7 @@ import time
 from datetime import datetime
 from iqoptionapi.stable_api import IQ_Option
 from config import *
+from order_index import OrderResultIndex
 
 class OrderTracker:
     """Clase para rastrear órdenes y sus resultados"""
@@ -12,6 +13,7 @@ class OrderTracker:
     def __init__(self, iq):
         self.iq = iq
         self.orders = {}  # Almacenar órdenes activas
+        self.index = OrderResultIndex()  # Resultados por ID
         
     def add_order(self, order_id, amount, asset, direction):
         """Registrar una nueva orden"""
@@ -76,14 +78,11 @@ class OrderTracker:
         return result
         
     def _find_in_listinfodata(self, order_id):
-        """Buscar orden en listinfodata"""
-        if hasattr(self.iq.api, 'listinfodata') and isinstance(self.iq.api.listinfodata, dict):
-            for key, value in self.iq.api.listinfodata.items():
-                if isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict) and item.get('id') == order_id:
-                            return item
-        return None
+        """Buscar orden en listinfodata (vía índice incremental)"""
+        if hasattr(self.iq.api, 'listinfodata'):
+            self.index.ingest_listinfodata(self.iq.api.listinfodata)
+        entry = self.index.get(order_id)
+        return entry["data"] if entry else None
 
 # PRUEBA
 print("🧪 SOLUCIÓN FUNCIONAL - SIN DEPENDENCIA DE get_position_history")